@@ -27,6 +27,14 @@ Usage:
     # Returns: {'plain_text': ..., 'latex': ..., 'version': 1}
     # Saves to WritingHistory.txt with version number
     
+    # Async usage: write several paragraphs concurrently
+    # Each task is a TempMemory-style dict; TempMemory.txt is not modified.
+    results = asyncio.run(writer.generate_many([
+        {"Topic Sentence": ["..."], "Bullet Points": ["...", "..."]},
+        {"Topic Sentence": ["..."], "Bullet Points": ["..."]},
+    ]))
+    # anew_paragraph(), arevise_paragraph() and aask_professor_review() are also available
+    
     # Inline Comments Feature:
     # You can add inline comments in curly braces {} within your text.
     # Example: "This is a sentence. {Improve this sentence to be more concise.}"
@@ -48,20 +56,35 @@ Memory Files:
           * Example: "This sentence needs work. {Make it more concise.}"
         - Revision Feedback: Feedback on what needs to be changed (for revision)
         - Output: The resulting paragraph (at the bottom, written by the writer)
+    
+    TempMemory.json (in Memory/ folder):
+        - Same sections as TempMemory.txt, written alongside it for fast loading.
+          TempMemory.txt remains the file to edit; the JSON copy is ignored once it is older.
 
 Output Files:
     - WritingHistory.txt: Plain text history of all writing (with version numbers for revisions)
     - Output/Latex.txt: Latest LaTeX formatted output
     - Output/Plaintext.txt: Latest plain text output
-    - Intermediate/prompt.txt: Log of the exact prompts sent to the AI (per mode run)
+    - Intermediate/prompt.txt: Log of the exact prompts sent to the AI (per mode run, newest last;
+      read the latest ones with writer.list_prompts(limit=n))
+    - Intermediate/prompt.txt.idx: Binary index of prompt.txt entries used by list_prompts
+    - Intermediate/prompt_cache.sqlite: Cached AI responses (only with use_cache=True / --cache)
 """
 
 import os
 import sys
 import re
+import json
+import asyncio
+import mmap
+import struct
+import threading
+import time
+import weakref
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, List, Any, Union
-from datetime import datetime
+from typing import Optional, Dict, List, Any, Union, Tuple, Callable
+from collections import deque
 
 # Handle imports when run as script or module
 try:
@@ -71,8 +94,291 @@ except ImportError:
     sys.path.insert(0, str(Path(__file__).parent.parent))
     from tools.MemoryManager import MemoryManager
 
-from tools.CloudAIWrapper import CloudAIWrapper
-from tools.Professor import Professor
+from tools.CloudAIWrapper import ResponseSchemaError
+from tools.PromptCache import PromptCache
+from tools.RateLimiter import RateLimiter, is_retriable_error
+
+# Asks the model for the paragraph and its LaTeX rendering in one completion,
+# so a mode run costs a single round-trip instead of generate + convert.
+PARAGRAPH_RESPONSE_FORMAT = [
+    "Respond with a single JSON object and nothing else, using exactly these keys:",
+    '{"plain_text": "<the paragraph as plain text>", "latex": "<the same paragraph formatted as LaTeX>"}',
+    "In the LaTeX version, escape special characters (e.g., \\&, \\%, \\$, \\#, \\_) and use appropriate LaTeX formatting commands.",
+    "Both values must be valid JSON strings: write every backslash as \\\\ and every newline as \\n.",
+]
+
+# JSON schema for the same object, passed to providers that support native
+# structured output so the response is guaranteed to parse
+PARAGRAPH_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "plain_text": {"type": "string"},
+        "latex": {"type": "string"},
+    },
+    "required": ["plain_text", "latex"],
+}
+
+
+def _format_prompt_section(title: str, content: Optional[Union[str, List[str]]],
+                           bulletize: bool = False) -> str:
+    """
+    Format one "===== Title =====" prompt section.
+
+    Args:
+        title: Section title
+        content: Section body; a string is split into lines, a list gives one entry per item
+        bulletize: Prefix entries with "- " unless they already start with a bullet
+
+    Returns:
+        The section text followed by a blank line, or "" if there is no content
+    """
+    if content is None:
+        return ""
+
+    if isinstance(content, list):
+        entries = [entry for entry in (str(item).strip() for item in content) if entry]
+        if not entries:
+            return ""
+    else:
+        content_str = str(content).strip()
+        if not content_str:
+            return ""
+        entries = content_str.splitlines()
+
+    if bulletize:
+        entries = [entry if entry.startswith(("-", "•")) else f"- {entry}" for entry in entries]
+    return f"===== {title} =====\n" + "\n".join(entries) + "\n\n"
+
+
+def _prompt_template(role: str, requirements: List[str], slots: List[str]) -> str:
+    """Bake the fixed role line and Output Requirements into a format_map template."""
+    fixed = role + "\n" + _format_prompt_section("Output Requirements", [f"- {req}" for req in requirements])
+    return fixed.replace("{", "{{").replace("}", "}}") + "".join(f"{{{slot}}}" for slot in slots)
+
+
+def _paragraph_templates(role: str, requirements: List[str], paragraph_requirements: Dict[bool, str],
+                         slots: List[str]) -> Dict[bool, str]:
+    """
+    Build a paragraph prompt template for each response_format setting.
+
+    paragraph_requirements maps response_format to the last Output Requirement: where the
+    paragraph goes in the JSON response (True) or that only the paragraph is returned
+    (False, the streamed plain-text response).
+    """
+    return {response_format: _prompt_template(role, requirements + [requirement], slots)
+            for response_format, requirement in paragraph_requirements.items()}
+
+
+@lru_cache(maxsize=8)
+def _project_memory_sections(key_ideas: Tuple[str, ...], recent_content: Tuple[str, ...]) -> Tuple[str, str]:
+    """Render the ProjectMemory prompt sections (cached: a batch shares one ProjectMemory)."""
+    return (_format_prompt_section("Project Key Ideas", list(key_ideas), bulletize=True),
+            _format_prompt_section("Recent Project Content", list(recent_content), bulletize=True))
+
+
+# Prompt templates: the fixed instructions are resolved once at import time and
+# only the per-request sections are filled in. Sections are ordered from most to
+# least stable (fixed instructions, project memory, template, then per-request
+# input) so consecutive runs share a long prompt prefix that providers can serve
+# from their prompt cache.
+_RESPONSE_FORMAT_SECTION = _format_prompt_section("Response Format", PARAGRAPH_RESPONSE_FORMAT)
+
+# How much project memory goes into each prompt
+_MAX_KEY_IDEAS = 5
+_MAX_RECENT_CONTENT = 3
+
+_NEW_PARAGRAPH_TEMPLATES = _paragraph_templates(
+    "You are an expert research writer. Produce exactly one cohesive academic paragraph using only the information below.",
+    [
+        "Write a new standalone paragraph (ignore any previously drafted text).",
+        "Maintain scholarly tone, smooth transitions, and precise language.",
+    ],
+    {
+        True: "Put only the finalized paragraph in plain_text and latex (no explanations or lists).",
+        False: "Return only the finalized paragraph (no explanations or lists).",
+    },
+    ["response_format", "key_ideas", "recent_content", "template_flow",
+     "writing_context", "topic_sentence", "bullet_points", "additional_requirements"],
+)
+
+_REVISE_PARAGRAPH_TEMPLATES = _paragraph_templates(
+    "You are revising an academic paragraph (given below). Apply the feedback carefully and return one improved paragraph.",
+    [
+        "Resolve every item in the revision feedback before returning the paragraph.",
+        "Preserve the original meaning and claims while improving clarity and flow.",
+    ],
+    {
+        True: "Put only the revised paragraph text in plain_text and latex (no explanations).",
+        False: "Return only the revised paragraph text (no explanations).",
+    },
+    ["response_format", "key_ideas", "recent_content", "template_flow",
+     "writing_context", "topic_sentence", "bullet_points", "current_paragraph",
+     "revision_feedback", "inline_comments", "additional_requirements"],
+)
+
+# First per-request section header of a built prompt; everything before it (instructions,
+# project memory, template flow) is the stable prefix shared across requests
+_VOLATILE_SECTION_RE = re.compile(
+    r'^===== (?:Writing Context|Topic Sentence|Bullet Points|Current Paragraph|Revision Feedback'
+    r'|Inline Comments \(sentence-specific\)|Additional Requirements) =====$',
+    re.MULTILINE
+)
+
+# Plain-text character -> LaTeX escape, applied in one str.translate pass so the
+# braces inserted by one replacement are never escaped again by another.
+_LATEX_ESCAPES = {
+    '\\': r'\textbackslash{}',
+    '&': r'\&',
+    '%': r'\%',
+    '$': r'\$',
+    '#': r'\#',
+    '^': r'\textasciicircum{}',
+    '_': r'\_',
+    '{': r'\{',
+    '}': r'\}',
+    '~': r'\textasciitilde{}',
+}
+_LATEX_ESCAPE_TABLE = str.maketrans(_LATEX_ESCAPES)
+# Text without any of these characters is already valid LaTeX
+_LATEX_SPECIAL_RE = re.compile('[' + re.escape(''.join(_LATEX_ESCAPES)) + ']')
+
+# Patterns used on every mode run, compiled once at import
+_INLINE_COMMENT_RE = re.compile(r'\{([^}]*)\}')
+# Runs of spaces -> one space, blank-line runs -> one blank line, in a single pass
+_EXTRA_WHITESPACE_RE = re.compile(r'(\n\s*\n+)| +')
+# Matched against raw bytes so it can run over an mmap
+_VERSION_RE = re.compile(rb'Version\s+(\d+)', re.IGNORECASE)
+
+# Last (second, formatted timestamp) pair; entries written within the same second share it
+_timestamp_cache: Tuple[int, str] = (-1, "")
+
+
+def _timestamp() -> str:
+    """Current local time as "YYYY-MM-DD HH:MM:SS", formatted at most once per second."""
+    global _timestamp_cache
+    second = int(time.time())
+    cached_second, formatted = _timestamp_cache
+    if second != cached_second:
+        formatted = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))
+        _timestamp_cache = (second, formatted)
+    return formatted
+
+
+# Files at least this large are read through mmap instead of being loaded into a str
+_MMAP_MIN_SIZE = 64 * 1024
+
+# One prompt.txt.idx record per logged prompt: (byte offset, byte length, mode id)
+_PROMPT_INDEX_RECORD = struct.Struct('<QII')
+# Mode ids stored in the index (0 = any other mode)
+_PROMPT_MODES = ("NewParagraph", "ReviseParagraph")
+_PROMPT_SEPARATOR = '=' * 80
+
+
+def _collapse_whitespace(match: re.Match) -> str:
+    """Replacement for _EXTRA_WHITESPACE_RE matches."""
+    return '\n\n' if match.group(1) else ' '
+
+
+def _close_fds(fds: Dict[Path, Tuple[int, int]]):
+    """Close the append descriptors held by a _FileWriter."""
+    for fd, _ in fds.values():
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+    fds.clear()
+
+
+class _FileWriter:
+    """
+    Stages file writes in memory and flushes them with one write per file.
+    
+    Appends use O_APPEND with a single os.write per file, through a descriptor
+    that stays open across flushes (reopened if the file is replaced or removed);
+    overwrites replace the whole file. Parent directories are created once per
+    directory.
+    """
+    
+    def __init__(self):
+        # path -> (overwrite, chunks); an overwrite followed by appends stays an overwrite
+        self._pending: Dict[Path, Tuple[bool, List[bytes]]] = {}
+        self._created_dirs: set = set()
+        # path -> (O_APPEND descriptor, inode it was opened on)
+        self._append_fds: Dict[Path, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, _close_fds, self._append_fds)
+    
+    def append(self, path: Path, data: Union[str, bytes]):
+        """Stage text (UTF-8 encoded) or bytes to append to path."""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        with self._lock:
+            overwrite, chunks = self._pending.setdefault(Path(path), (False, []))
+            chunks.append(data)
+    
+    def write(self, path: Path, data: Union[str, bytes]):
+        """Stage text (UTF-8 encoded) or bytes to replace the contents of path (drops earlier staged writes to it)."""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        with self._lock:
+            self._pending[Path(path)] = (True, [data])
+    
+    def flush(self):
+        """Write everything staged so far."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            for path, (overwrite, chunks) in pending.items():
+                self._ensure_parent(path)
+                
+                data = b''.join(chunks)
+                if overwrite:
+                    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                    try:
+                        self._write_all(fd, data)
+                    finally:
+                        os.close(fd)
+                else:
+                    self._write_all(self._append_fd(path), data)
+    
+    def ensure_parent(self, path: Path):
+        """Create the parent directory of a file written outside the writer (once per directory)."""
+        with self._lock:
+            self._ensure_parent(Path(path))
+    
+    def close(self):
+        """Close the descriptors kept open for appends."""
+        with self._lock:
+            _close_fds(self._append_fds)
+    
+    def _ensure_parent(self, path: Path):
+        """Create the parent directory of path unless this writer already did."""
+        if path.parent not in self._created_dirs:
+            os.makedirs(path.parent, exist_ok=True)
+            self._created_dirs.add(path.parent)
+    
+    def _append_fd(self, path: Path) -> int:
+        """Return the open O_APPEND descriptor for path, reopening it if the file changed identity."""
+        try:
+            inode = os.stat(path).st_ino
+        except FileNotFoundError:
+            inode = None
+        
+        cached = self._append_fds.get(path)
+        if cached is not None:
+            if cached[1] == inode:
+                return cached[0]
+            os.close(cached[0])
+        
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._append_fds[path] = (fd, os.fstat(fd).st_ino)
+        return fd
+    
+    def _write_all(self, fd: int, data: bytes):
+        """Write all of data to fd."""
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
 
 
 class Writer:
@@ -81,7 +387,10 @@ class Writer:
     def __init__(self, project_path: str,
                  api_provider: str = "gemini",
                  gemini_api_key: Optional[str] = None,
-                 openai_api_key: Optional[str] = None):
+                 openai_api_key: Optional[str] = None,
+                 use_cache: bool = False,
+                 stream_output: bool = False,
+                 use_ai_latex: bool = False):
         """
         Initialize Writer.
         
@@ -91,6 +400,15 @@ class Writer:
             api_provider: "gemini" or "openai" (default: "gemini")
             gemini_api_key: Optional Gemini API key
             openai_api_key: Optional OpenAI API key
+            use_cache: Serve repeated identical prompts from Intermediate/prompt_cache.sqlite
+                       instead of calling the AI again (default: False)
+            stream_output: Stream the paragraph as it is generated (to Output/Plaintext.txt.partial
+                           and on_stream_chunk) instead of waiting for the full response.
+                           The LaTeX version is then produced separately (default: False)
+            use_ai_latex: When the LaTeX version is not returned with the paragraph (streaming,
+                          or a response that is not the expected JSON), ask the AI to convert
+                          it with a second request instead of escaping special characters
+                          locally (default: False)
         """
         # Automatically prepend "projects/" if not already present
         if not project_path.startswith("projects/"):
@@ -98,16 +416,14 @@ class Writer:
         
         self.project_path = Path(project_path)
         self.memory_manager = MemoryManager()
-        self.ai_wrapper = CloudAIWrapper(
-            provider=api_provider,
-            gemini_api_key=gemini_api_key,
-            openai_api_key=openai_api_key
-        )
-        self.professor = Professor(
-            api_provider=api_provider,
-            gemini_api_key=gemini_api_key,
-            openai_api_key=openai_api_key
-        )
+        
+        # AI clients are created on first use (see the ai_wrapper and professor properties),
+        # so a Writer used only for local file/LaTeX work never configures the SDKs
+        self.api_provider = api_provider
+        self._gemini_api_key = gemini_api_key
+        self._openai_api_key = openai_api_key
+        self._ai_wrapper = None
+        self._professor = None
         
         # Project file paths (updated to match new structure)
         self.project_memory_file = self.project_path / "Memory" / "ProjectMemory.txt"
@@ -115,10 +431,98 @@ class Writer:
         self.writing_history_file = self.project_path / "Intermediate" / "WritingHistory.txt"
         self.todo_history_file = self.project_path / "Intermediate" / "TodoHistory.txt"
         self.prompt_history_file = self.project_path / "Intermediate" / "prompt.txt"
+        self.prompt_index_file = self.project_path / "Intermediate" / "prompt.txt.idx"
         self.output_plaintext = self.project_path / "Output" / "Plaintext.txt"
         self.output_latex = self.project_path / "Output" / "Latex.txt"
         # Legacy: kept for backward compatibility but not used in new modes
         self.output_file = self.project_path / "Output" / "output.txt"
+        self.prompt_cache_file = self.project_path / "Intermediate" / "prompt_cache.sqlite"
+        self.version_cache_file = self.project_path / "Intermediate" / ".version"
+        
+        # Highest version in WritingHistory.txt and the file size it was read from
+        self._cached_max_version: Optional[int] = None
+        self._version_scanned_size = 0
+        
+        self._version_cache_dirty = False
+        
+        # Last parse of each memory file with the (path, mtime_ns, size) it was read at
+        self._memory_cache: Dict[Path, Tuple[Tuple[str, Optional[int], Optional[int]], Dict[str, List[str]]]] = {}
+        self._pending_temp_memory: Optional[Dict[str, List[str]]] = None
+        
+        # Output writes of a mode run are staged here and flushed together
+        self._file_writer = _FileWriter()
+        
+        # Optional response cache in front of the AI wrapper (paragraphs and LaTeX conversion)
+        self.prompt_cache: Optional[PromptCache] = None
+        if use_cache:
+            self.prompt_cache = PromptCache(self.prompt_cache_file)
+        
+        # Streaming (sync modes only); on_stream_chunk is called with each text chunk
+        self.stream_output = stream_output
+        self.on_stream_chunk: Optional[Callable[[str], None]] = None
+        
+        # Separate LaTeX conversions use an AI request only when enabled
+        self.use_ai_latex = use_ai_latex
+        
+        # Cleared if the provider/model rejects a structured-output request (ResponseSchemaError)
+        self._structured_output = True
+        
+        # Serializes file writes from concurrent async mode runs (recreated for each event loop)
+        self._file_lock: Optional[asyncio.Lock] = None
+        self._file_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    @property
+    def ai_wrapper(self):
+        """
+        CloudAIWrapper for the configured provider (wrapped by the prompt cache if enabled).
+        
+        The wrapper is shared with other Writers using the same provider and keys,
+        so they reuse its HTTP connections.
+        """
+        if self._ai_wrapper is None:
+            from tools.CloudAIWrapper import get_ai_wrapper
+            ai_wrapper = get_ai_wrapper(
+                provider=self.api_provider,
+                gemini_api_key=self._gemini_api_key,
+                openai_api_key=self._openai_api_key
+            )
+            if self.prompt_cache is not None:
+                ai_wrapper = self.prompt_cache.wrap(ai_wrapper)
+            self._ai_wrapper = ai_wrapper
+        return self._ai_wrapper
+    
+    @ai_wrapper.setter
+    def ai_wrapper(self, value):
+        self._ai_wrapper = value
+    
+    @property
+    def professor(self):
+        """Professor used by ask_professor_review."""
+        if self._professor is None:
+            from tools.Professor import Professor
+            self._professor = Professor(
+                api_provider=self.api_provider,
+                gemini_api_key=self._gemini_api_key,
+                openai_api_key=self._openai_api_key,
+                prompt_cache=self.prompt_cache
+            )
+        return self._professor
+    
+    @professor.setter
+    def professor(self, value):
+        self._professor = value
+    
+    def close(self):
+        """Close the files kept open for appends and the prompt cache database."""
+        self._file_writer.close()
+        if self.prompt_cache is not None:
+            self.prompt_cache.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
     
     def new_paragraph(self) -> Dict[str, str]:
         """
@@ -139,74 +543,22 @@ class Writer:
             Dictionary with 'plain_text' and 'latex' keys containing the generated text
         """
         # Load memory from TempMemory.txt
-        temp_memory = self.memory_manager.load_temp_memory(str(self.temp_memory_file))
+        temp_memory = self._load_temp_memory()
         
         # Load project memory for context
-        project_memory = self.memory_manager.load_project_memory(str(self.project_memory_file))
-        
-        # Extract components from TempMemory
-        writing_context_items = temp_memory.get("Writing Context", [])
-        writing_context = "\n".join(writing_context_items) if writing_context_items else None
+        project_memory = self._load_project_memory()
         
-        topic_sentence_items = temp_memory.get("Topic Sentence", [])
-        topic_sentence = topic_sentence_items[0] if topic_sentence_items else None
-        
-        bullet_points = [point.strip() for point in temp_memory.get("Bullet Points", []) if point.strip()]
-        
-        template_flow_items = [item for item in temp_memory.get("Template Flow", []) if item.strip()]
-        template = "\n".join(template_flow_items) if template_flow_items else None
-
-        # Get key ideas from project memory for context
-        project_key_ideas = project_memory.get("Key Ideas", [])
-        project_previous_content = project_memory.get("Previous Content", [])
-        
-        # Build prompt with minimal redundancy
-        prompt_parts: List[str] = [
-            "You are an expert research writer. Produce exactly one cohesive academic paragraph using only the information below."
-        ]
-        
-        self._append_prompt_section(prompt_parts, "Writing Context", writing_context)
-        self._append_prompt_section(prompt_parts, "Project Key Ideas", project_key_ideas[:5], bulletize=True)
-        self._append_prompt_section(prompt_parts, "Topic Sentence", topic_sentence)
-        self._append_prompt_section(prompt_parts, "Bullet Points", bullet_points, bulletize=True)
-        self._append_prompt_section(prompt_parts, "Template Flow", template)
-        
-        self._append_prompt_section(prompt_parts, "Recent Project Content", project_previous_content[:3], bulletize=True)
-        
-        requirements: List[str] = []
-        requirements.append("Write a new standalone paragraph (ignore any previously drafted text).")
-        
-        if topic_sentence:
-            requirements.append("Incorporate the provided topic sentence (or a refined variant) near the beginning.")
-        if bullet_points:
-            requirements.append("Cover every bullet point with specific evidence or reasoning.")
-        if template:
-            requirements.append("Follow the template flow order when developing the paragraph.")
-        requirements.append("Maintain scholarly tone, smooth transitions, and precise language.")
-        requirements.append("Return only the finalized paragraph (no explanations or lists).")
-        
-        self._append_prompt_section(prompt_parts, "Output Requirements", [f"- {req}" for req in requirements])
-        
-        prompt = "\n".join(prompt_parts).strip() + "\n"
+        prompt = self._build_new_paragraph_prompt(temp_memory, project_memory,
+                                                  response_format=not self.stream_output)
         
         # Save prompt for auditing/debugging
         self._save_prompt(prompt, mode="NewParagraph")
         
-        # Generate plain text paragraph
-        plain_text = self.ai_wrapper.generate(prompt)
+        # Generate plain text paragraph and its LaTeX version (in one request unless streaming)
+        plain_text, latex_text = self._produce_paragraph(prompt)
         
-        # Remove any inline comments that might have been generated (shouldn't happen, but just in case)
-        plain_text, _ = self._extract_inline_comments(plain_text)
-        
-        # Convert to LaTeX format
-        latex_text = self._convert_to_latex(plain_text)
-        
-        # Save to files
-        self._append_to_history(plain_text)
-        self._save_latex(latex_text)
-        
-        # Save output to TempMemory.txt Output section
-        self._save_output_to_temp_memory(plain_text)
+        # Save to WritingHistory.txt, Latex.txt and the TempMemory.txt Output section
+        self._save_mode_outputs(plain_text, latex_text)
         
         return {
             'plain_text': plain_text,
@@ -234,11 +586,228 @@ class Writer:
             Dictionary with 'plain_text', 'latex', and 'version' keys
         """
         # Load memory from TempMemory.txt
-        temp_memory = self.memory_manager.load_temp_memory(str(self.temp_memory_file))
+        temp_memory = self._load_temp_memory()
         
         # Load project memory for context
-        project_memory = self.memory_manager.load_project_memory(str(self.project_memory_file))
+        project_memory = self._load_project_memory()
+        
+        prompt = self._build_revise_paragraph_prompt(temp_memory, project_memory,
+                                                     response_format=not self.stream_output)
+        
+        # Save prompt for auditing/debugging
+        self._save_prompt(prompt, mode="ReviseParagraph")
+        
+        # Generate revised paragraph and its LaTeX version (in one request unless streaming)
+        plain_text, latex_text = self._produce_paragraph(prompt)
         
+        # Save to WritingHistory.txt (with version number), Latex.txt and the TempMemory.txt Output section
+        version = self._save_mode_outputs(plain_text, latex_text, version_mode="ReviseParagraph")
+        
+        return {
+            'plain_text': plain_text,
+            'latex': latex_text,
+            'version': version
+        }
+    
+    async def anew_paragraph(self, temp_memory: Optional[Dict[str, List[str]]] = None,
+                             rate_limiter: Optional[RateLimiter] = None,
+                             project_memory: Optional[Dict[str, List[str]]] = None) -> Dict[str, str]:
+        """
+        Async version of new_paragraph.
+        
+        Args:
+            temp_memory: Optional TempMemory-style dictionary to write from. If omitted,
+                         TempMemory.txt is loaded and its Output section is updated as in
+                         new_paragraph; if given, TempMemory.txt is left untouched.
+            rate_limiter: Optional RateLimiter that AI requests go through
+            project_memory: Optional parsed ProjectMemory (loaded from ProjectMemory.txt if omitted)
+        
+        Returns:
+            Dictionary with 'plain_text' and 'latex' keys containing the generated text
+        """
+        update_temp_memory = temp_memory is None
+        if temp_memory is None:
+            temp_memory = self._load_temp_memory()
+        if project_memory is None:
+            project_memory = self._load_project_memory()
+        
+        prompt = self._build_new_paragraph_prompt(temp_memory, project_memory)
+        # The prompt is logged while the request is in flight
+        _, (plain_text, latex_text) = await asyncio.gather(
+            self._run_file_io(self._save_prompt, prompt, mode="NewParagraph"),
+            self._agenerate_paragraph(prompt, rate_limiter)
+        )
+        
+        await self._run_file_io(self._save_mode_outputs, plain_text, latex_text,
+                                update_temp_memory=update_temp_memory)
+        
+        return {
+            'plain_text': plain_text,
+            'latex': latex_text
+        }
+    
+    async def arevise_paragraph(self, temp_memory: Optional[Dict[str, List[str]]] = None,
+                                rate_limiter: Optional[RateLimiter] = None,
+                                project_memory: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+        """
+        Async version of revise_paragraph.
+        
+        Args:
+            temp_memory: Optional TempMemory-style dictionary to revise from. If omitted,
+                         TempMemory.txt is loaded and its Output section is updated as in
+                         revise_paragraph; if given, TempMemory.txt is left untouched.
+            rate_limiter: Optional RateLimiter that AI requests go through
+            project_memory: Optional parsed ProjectMemory (loaded from ProjectMemory.txt if omitted)
+        
+        Returns:
+            Dictionary with 'plain_text', 'latex', and 'version' keys
+        """
+        update_temp_memory = temp_memory is None
+        if temp_memory is None:
+            temp_memory = self._load_temp_memory()
+        if project_memory is None:
+            project_memory = self._load_project_memory()
+        
+        prompt = self._build_revise_paragraph_prompt(temp_memory, project_memory)
+        # The prompt is logged while the request is in flight
+        _, (plain_text, latex_text) = await asyncio.gather(
+            self._run_file_io(self._save_prompt, prompt, mode="ReviseParagraph"),
+            self._agenerate_paragraph(prompt, rate_limiter)
+        )
+        
+        version = await self._run_file_io(self._save_mode_outputs, plain_text, latex_text,
+                                          version_mode="ReviseParagraph",
+                                          update_temp_memory=update_temp_memory)
+        
+        return {
+            'plain_text': plain_text,
+            'latex': latex_text,
+            'version': version
+        }
+    
+    def new_paragraphs(self, items: List[Dict[str, List[str]]],
+                       max_concurrent: int = 10,
+                       rpm: int = 500,
+                       tpm: int = 200_000,
+                       max_attempts: int = 5) -> List[Dict[str, str]]:
+        """
+        Write several new paragraphs concurrently within the provider's rate limits.
+        
+        Blocking entry point for scripts; from inside an event loop, await
+        generate_many with a RateLimiter instead.
+        
+        Args:
+            items: List of TempMemory-style dictionaries, one per paragraph (see generate_many)
+            max_concurrent: Maximum number of requests in flight (default: 10)
+            rpm: Provider requests-per-minute limit (default: 500)
+            tpm: Provider tokens-per-minute limit (default: 200,000)
+            max_attempts: Attempts per request before giving up (default: 5)
+        
+        Returns:
+            List of {'plain_text': ..., 'latex': ...} results, in the same order as items
+        """
+        rate_limiter = RateLimiter(max_concurrent=max_concurrent, rpm=rpm, tpm=tpm,
+                                   max_attempts=max_attempts)
+        return asyncio.run(self.generate_many(items, rate_limiter=rate_limiter))
+    
+    async def generate_many(self, tasks: List[Dict[str, List[str]]],
+                            rate_limiter: Optional[RateLimiter] = None) -> List[Dict[str, str]]:
+        """
+        Write several new paragraphs concurrently.
+        
+        Args:
+            tasks: List of TempMemory-style dictionaries (Writing Context, Topic Sentence,
+                   Bullet Points, Template Flow), one per paragraph
+            rate_limiter: Optional RateLimiter that bounds concurrency and request/token rates
+        
+        Returns:
+            List of {'plain_text': ..., 'latex': ...} results, in the same order as tasks
+        """
+        # Every task shares one read of ProjectMemory.txt
+        project_memory = self._load_project_memory()
+        return await asyncio.gather(*[self.anew_paragraph(task, rate_limiter, project_memory) for task in tasks])
+    
+    async def revise_many(self, tasks: List[Dict[str, List[str]]],
+                          rate_limiter: Optional[RateLimiter] = None) -> List[Dict[str, Any]]:
+        """
+        Revise several paragraphs concurrently.
+        
+        Args:
+            tasks: List of TempMemory-style dictionaries (Current Paragraph, Revision Feedback,
+                   and optionally Writing Context, Topic Sentence, Bullet Points, Template Flow),
+                   one per paragraph
+            rate_limiter: Optional RateLimiter that bounds concurrency and request/token rates
+        
+        Returns:
+            List of {'plain_text': ..., 'latex': ..., 'version': ...} results, in the same order
+            as tasks (versions are numbered in the order the revisions finish)
+            
+        Raises:
+            ValueError: If a task has no Current Paragraph or Revision Feedback
+        """
+        project_memory = self._load_project_memory()
+        return await asyncio.gather(*[self.arevise_paragraph(task, rate_limiter, project_memory) for task in tasks])
+    
+    def _build_new_paragraph_prompt(self, temp_memory: Dict[str, List[str]],
+                                    project_memory: Dict[str, List[str]],
+                                    response_format: bool = True) -> str:
+        """
+        Build the NewParagraph prompt from TempMemory and ProjectMemory contents.
+        
+        Args:
+            temp_memory: TempMemory sections
+            project_memory: ProjectMemory sections
+            response_format: Ask for the JSON plain text + LaTeX response (False asks
+                             for the plain paragraph only, as used when streaming)
+        
+        Returns:
+            The prompt text to send to the AI
+        """
+        # Extract components from TempMemory
+        writing_context_items = temp_memory.get("Writing Context", [])
+        writing_context = "\n".join(writing_context_items) if writing_context_items else None
+        
+        topic_sentence_items = temp_memory.get("Topic Sentence", [])
+        topic_sentence = topic_sentence_items[0] if topic_sentence_items else None
+        
+        bullet_points = [point.strip() for point in temp_memory.get("Bullet Points", []) if point.strip()]
+        
+        template_flow_items = [item for item in temp_memory.get("Template Flow", []) if item.strip()]
+        template = "\n".join(template_flow_items) if template_flow_items else None
+
+        task_requirements: List[str] = []
+        if topic_sentence:
+            task_requirements.append("Incorporate the provided topic sentence (or a refined variant) near the beginning.")
+        if bullet_points:
+            task_requirements.append("Cover every bullet point with specific evidence or reasoning.")
+        if template:
+            task_requirements.append("Follow the template flow order when developing the paragraph.")
+        
+        sections = self._shared_prompt_sections(project_memory, writing_context, topic_sentence,
+                                                bullet_points, template, response_format)
+        sections["additional_requirements"] = _format_prompt_section(
+            "Additional Requirements", [f"- {req}" for req in task_requirements])
+        prompt = _NEW_PARAGRAPH_TEMPLATES[response_format].format_map(sections)
+        # The template starts with the role line, so only the trailing blank line needs trimming
+        return prompt.rstrip() + "\n"
+    
+    def _build_revise_paragraph_prompt(self, temp_memory: Dict[str, List[str]],
+                                       project_memory: Dict[str, List[str]],
+                                       response_format: bool = True) -> str:
+        """
+        Build the ReviseParagraph prompt from TempMemory and ProjectMemory contents.
+        
+        Args:
+            temp_memory: TempMemory sections
+            project_memory: ProjectMemory sections
+            response_format: Ask for the JSON plain text + LaTeX response (see _build_new_paragraph_prompt)
+        
+        Returns:
+            The prompt text to send to the AI
+            
+        Raises:
+            ValueError: If Current Paragraph or Revision Feedback (or inline comments) are missing
+        """
         # Extract components from TempMemory
         writing_context_items = temp_memory.get("Writing Context", [])
         writing_context = "\n".join(writing_context_items) if writing_context_items else None
@@ -277,71 +846,51 @@ class Writer:
         if not revision_feedback or not revision_feedback.strip():
             raise ValueError("Revision Feedback is required in TempMemory.txt for ReviseParagraph mode (or provide inline comments in Current Paragraph using {comment} format)")
         
-        # Get key ideas from project memory for context
-        project_key_ideas = project_memory.get("Key Ideas", [])
-        project_previous_content = project_memory.get("Previous Content", [])
-        
-        # Build concise revision prompt
-        prompt_parts: List[str] = [
-            "You are revising the following academic paragraph. Apply the feedback carefully and return one improved paragraph."
-        ]
-        
-        self._append_prompt_section(prompt_parts, "Writing Context", writing_context)
-        self._append_prompt_section(prompt_parts, "Current Paragraph", current_paragraph)
-        self._append_prompt_section(prompt_parts, "Revision Feedback", revision_feedback)
-        self._append_prompt_section(
-            prompt_parts,
-            "Inline Comments (sentence-specific)",
-            inline_feedback_lines
-        )
-        self._append_prompt_section(prompt_parts, "Project Key Ideas", project_key_ideas[:5], bulletize=True)
-        self._append_prompt_section(prompt_parts, "Topic Sentence", topic_sentence)
         filtered_bullets = [bp.strip() for bp in bullet_points if bp.strip()]
-        self._append_prompt_section(prompt_parts, "Bullet Points", filtered_bullets, bulletize=True)
-        self._append_prompt_section(prompt_parts, "Template Flow", template)
-        self._append_prompt_section(prompt_parts, "Recent Project Content", project_previous_content[:3], bulletize=True)
         
-        requirements: List[str] = [
-            "Resolve every item in the revision feedback before returning the paragraph."
-        ]
+        task_requirements: List[str] = []
         if inline_feedback_lines:
-            requirements.append("Ensure each inline comment's sentence reflects the requested change.")
+            task_requirements.append("Ensure each inline comment's sentence reflects the requested change.")
         if topic_sentence:
-            requirements.append("Keep the topic sentence consistent with the provided guidance.")
+            task_requirements.append("Keep the topic sentence consistent with the provided guidance.")
         if filtered_bullets:
-            requirements.append("Address every bullet point with concrete detail or logic.")
+            task_requirements.append("Address every bullet point with concrete detail or logic.")
         if template:
-            requirements.append("Honor the template flow order when restructuring content.")
-        requirements.append("Preserve the original meaning and claims while improving clarity and flow.")
-        requirements.append("Return only the revised paragraph text (no explanations).")
-        
-        self._append_prompt_section(prompt_parts, "Output Requirements", [f"- {req}" for req in requirements])
-        
-        prompt = "\n".join(prompt_parts).strip() + "\n"
-        
-        # Save prompt for auditing/debugging
-        self._save_prompt(prompt, mode="ReviseParagraph")
-        
-        # Generate revised paragraph
-        plain_text = self.ai_wrapper.generate(prompt)
-        
-        # Remove any inline comments that might have been generated (shouldn't happen, but just in case)
-        plain_text, _ = self._extract_inline_comments(plain_text)
-        
-        # Convert to LaTeX format
-        latex_text = self._convert_to_latex(plain_text)
-        
-        # Save to files with version number
-        version = self._append_to_history_with_version(plain_text, mode="ReviseParagraph")
-        self._save_latex(latex_text)
-        
-        # Save output to TempMemory.txt Output section
-        self._save_output_to_temp_memory(plain_text)
+            task_requirements.append("Honor the template flow order when restructuring content.")
+        
+        sections = self._shared_prompt_sections(project_memory, writing_context, topic_sentence,
+                                                filtered_bullets, template, response_format)
+        sections["current_paragraph"] = _format_prompt_section("Current Paragraph", current_paragraph)
+        sections["revision_feedback"] = _format_prompt_section("Revision Feedback", revision_feedback)
+        sections["inline_comments"] = _format_prompt_section("Inline Comments (sentence-specific)", inline_feedback_lines)
+        sections["additional_requirements"] = _format_prompt_section(
+            "Additional Requirements", [f"- {req}" for req in task_requirements])
+        prompt = _REVISE_PARAGRAPH_TEMPLATES[response_format].format_map(sections)
+        return prompt.rstrip() + "\n"
+    
+    def _shared_prompt_sections(self, project_memory: Dict[str, List[str]],
+                                writing_context: Optional[str],
+                                topic_sentence: Optional[str],
+                                bullet_points: List[str],
+                                template: Optional[str],
+                                response_format: bool) -> Dict[str, str]:
+        """
+        Render the template slots common to the NewParagraph and ReviseParagraph prompts.
         
+        Returns:
+            Slot name -> rendered section ("" for sections without content)
+        """
+        key_ideas, recent_content = _project_memory_sections(
+            tuple(project_memory.get("Key Ideas", [])[:_MAX_KEY_IDEAS]),
+            tuple(project_memory.get("Previous Content", [])[:_MAX_RECENT_CONTENT]))
         return {
-            'plain_text': plain_text,
-            'latex': latex_text,
-            'version': version
+            "response_format": _RESPONSE_FORMAT_SECTION if response_format else "",
+            "key_ideas": key_ideas,
+            "recent_content": recent_content,
+            "template_flow": _format_prompt_section("Template Flow", template),
+            "writing_context": _format_prompt_section("Writing Context", writing_context),
+            "topic_sentence": _format_prompt_section("Topic Sentence", topic_sentence),
+            "bullet_points": _format_prompt_section("Bullet Points", bullet_points, bulletize=True),
         }
     
     def _extract_inline_comments(self, text: str) -> tuple[str, List[Dict[str, str]]]:
@@ -357,12 +906,11 @@ class Writer:
         Returns:
             Tuple of (text_without_comments, list_of_comment_dicts)
         """
-        pattern = r'\{([^}]*)\}'
         comments: List[Dict[str, str]] = []
         cleaned_parts: List[str] = []
         last_index = 0
         
-        for match in re.finditer(pattern, text):
+        for match in _INLINE_COMMENT_RE.finditer(text):
             start, end = match.span()
             cleaned_parts.append(text[last_index:start])
             
@@ -380,8 +928,7 @@ class Writer:
         text_without_comments = ''.join(cleaned_parts)
         
         # Clean up extra whitespace (multiple spaces/newlines)
-        text_without_comments = re.sub(r' +', ' ', text_without_comments)
-        text_without_comments = re.sub(r'\n\s*\n+', '\n\n', text_without_comments)
+        text_without_comments = _EXTRA_WHITESPACE_RE.sub(_collapse_whitespace, text_without_comments)
         text_without_comments = text_without_comments.strip()
         
         return text_without_comments, comments
@@ -391,60 +938,341 @@ class Writer:
         Best-effort extraction of the sentence (or clause) immediately preceding an inline comment.
         This helps the AI model understand exactly which sentence the inline feedback refers to.
         """
-        preceding_text = text[:comment_start]
-        
-        sentence_start = 0
-        for i in range(len(preceding_text) - 1, -1, -1):
-            if preceding_text[i] in '.?!\n':
-                sentence_start = i + 1
-                break
+        # The sentence starts right after the last boundary character before the comment
+        # (rfind returns -1 when there is none, i.e. the sentence starts at 0)
+        sentence_start = max(text.rfind(boundary, 0, comment_start) for boundary in '.?!\n') + 1
         
-        sentence = preceding_text[sentence_start:].strip()
+        sentence = text[sentence_start:comment_start].strip()
         
         if not sentence:
-            sentence = preceding_text[-200:].strip()
+            sentence = text[max(0, comment_start - 200):comment_start].strip()
         
         return sentence
     
+    def _produce_paragraph(self, prompt: str) -> Tuple[str, str]:
+        """Generate the paragraph for a mode run, streaming it if stream_output is enabled."""
+        if self.stream_output:
+            return self._stream_paragraph(prompt)
+        return self._generate_paragraph(prompt)
+    
+    def _stream_paragraph(self, prompt: str) -> Tuple[str, str]:
+        """
+        Stream a plain-text paragraph from the AI, then convert it to LaTeX.
+        
+        Chunks are written to Output/Plaintext.txt.partial (and passed to on_stream_chunk)
+        as they arrive, so progress is visible before the response completes. The final
+        text is staged for Plaintext.txt and the partial file is removed.
+        
+        Args:
+            prompt: Prompt built with response_format=False
+            
+        Returns:
+            Tuple of (plain_text, latex_text)
+        """
+        partial_file = self.output_plaintext.with_name(self.output_plaintext.name + ".partial")
+        self._file_writer.ensure_parent(partial_file)
+        
+        chunks: List[str] = []
+        try:
+            with open(partial_file, 'w', encoding='utf-8') as f:
+                for chunk in self.ai_wrapper.generate_stream(prompt, **self._request_kwargs(prompt)):
+                    f.write(chunk)
+                    f.flush()
+                    chunks.append(chunk)
+                    if self.on_stream_chunk:
+                        self.on_stream_chunk(chunk)
+        finally:
+            if partial_file.exists():
+                partial_file.unlink()
+        
+        # Remove any inline comments that might have been generated
+        plain_text = self._strip_generated_comments(''.join(chunks))
+        self._save_plaintext(plain_text)
+        
+        return plain_text, self._convert_to_latex_with_ai(plain_text)
+    
+    def _generate_paragraph(self, prompt: str) -> Tuple[str, str]:
+        """
+        Generate a paragraph and its LaTeX version with a single AI request.
+        
+        The request uses the provider's structured output (PARAGRAPH_RESPONSE_SCHEMA)
+        and the prompt also describes the JSON object, so providers without it still
+        answer in the same shape. Once the provider rejects the schema
+        (ResponseSchemaError), later requests are sent without it; other errors are
+        raised. If the response cannot be parsed, it is treated as the plain-text
+        paragraph and converted by _convert_to_latex_with_ai (local escaping unless
+        use_ai_latex is set).
+        
+        Args:
+            prompt: Prompt that ends with the PARAGRAPH_RESPONSE_FORMAT section
+            
+        Returns:
+            Tuple of (plain_text, latex_text)
+        """
+        kwargs = self._request_kwargs(prompt)
+        response = None
+        if self._structured_output:
+            try:
+                response = self.ai_wrapper.generate(prompt, response_schema=PARAGRAPH_RESPONSE_SCHEMA, **kwargs)
+            except ResponseSchemaError as e:
+                print(f"Warning: Structured output request failed ({e}); retrying without it")
+                self._structured_output = False
+        if response is None:
+            response = self.ai_wrapper.generate(prompt, **kwargs)
+        plain_text, latex_text = self._split_paragraph_response(response)
+        
+        if latex_text is None:
+            latex_text = self._convert_to_latex_with_ai(plain_text)
+        else:
+            self._remember_conversion(plain_text, latex_text)
+        
+        return plain_text, latex_text
+    
+    async def _agenerate_paragraph(self, prompt: str,
+                                   rate_limiter: Optional[RateLimiter] = None) -> Tuple[str, str]:
+        """Async version of _generate_paragraph (requests go through rate_limiter if given)."""
+        kwargs = self._request_kwargs(prompt)
+        response = None
+        if self._structured_output:
+            try:
+                # Transient errors are retried by rate_limiter; a rejected schema is not
+                response = await self._arequest(prompt, rate_limiter,
+                                                response_schema=PARAGRAPH_RESPONSE_SCHEMA, **kwargs)
+            except ResponseSchemaError as e:
+                print(f"Warning: Structured output request failed ({e}); retrying without it")
+                self._structured_output = False
+        if response is None:
+            response = await self._arequest(prompt, rate_limiter, **kwargs)
+        plain_text, latex_text = self._split_paragraph_response(response)
+        
+        if latex_text is None:
+            latex_text = await self._aconvert_to_latex_with_ai(plain_text, rate_limiter)
+        else:
+            self._remember_conversion(plain_text, latex_text)
+        
+        return plain_text, latex_text
+    
+    def _request_kwargs(self, prompt: str) -> Dict[str, Any]:
+        """
+        Provider prompt-caching hints for a paragraph prompt.
+        
+        Returns:
+            prompt_cache_key (the project name) and stable_prefix_chars, the length of
+            the prompt's stable prefix (everything before the first per-request section)
+        """
+        match = _VOLATILE_SECTION_RE.search(prompt)
+        return {
+            "prompt_cache_key": self.project_path.name,
+            "stable_prefix_chars": match.start() if match else len(prompt),
+        }
+    
+    def _split_paragraph_response(self, response: str) -> Tuple[str, Optional[str]]:
+        """
+        Split an AI paragraph response into plain text and LaTeX.
+        
+        Returns:
+            Tuple of (plain_text, latex_text); latex_text is None if the response
+            was not the expected JSON object and still needs converting
+        """
+        parsed = self._parse_paragraph_response(response)
+        
+        if parsed:
+            plain_text, latex_text = parsed
+        else:
+            plain_text, latex_text = response, None
+        
+        # Remove any inline comments that might have been generated (shouldn't happen, but just in case)
+        plain_text = self._strip_generated_comments(plain_text)
+        
+        return plain_text, latex_text
+    
+    def _strip_generated_comments(self, text: str) -> str:
+        """
+        Remove inline {comments} the model may have copied into its output.
+        
+        The full extraction only runs when the text contains both braces; otherwise
+        no comment can match and the text is just stripped.
+        """
+        if '{' in text and '}' in text:
+            text, _ = self._extract_inline_comments(text)
+            return text
+        return text.strip()
+    
+    def _parse_paragraph_response(self, response: str) -> Optional[Tuple[str, str]]:
+        """
+        Parse a {"plain_text": ..., "latex": ...} response from the AI.
+        
+        Returns:
+            Tuple of (plain_text, latex_text), or None if the response is not valid JSON
+            with non-empty string values for both keys
+        """
+        try:
+            data = json.loads(self._strip_code_fence(response))
+        except (TypeError, ValueError):
+            return None
+        
+        if not isinstance(data, dict):
+            return None
+        
+        plain_text = data.get("plain_text")
+        latex_text = data.get("latex")
+        if not isinstance(plain_text, str) or not isinstance(latex_text, str):
+            return None
+        if not plain_text.strip() or not latex_text.strip():
+            return None
+        
+        return plain_text.strip(), latex_text.strip()
+    
+    def _strip_code_fence(self, text: str) -> str:
+        """Remove a surrounding markdown code block (```...```) from AI output, if present."""
+        text = text.strip()
+        if text.startswith('```'):
+            lines = text.split('\n')
+            text = '\n'.join(lines[1:-1]) if lines[-1].startswith('```') else '\n'.join(lines[1:])
+        return text.strip()
+    
     def _convert_to_latex(self, text: str) -> str:
         """
-        Convert plain text to LaTeX format.
-        This is a basic conversion - can be enhanced with AI if needed.
-        """
-        # Basic LaTeX conversion
-        # Escape LaTeX special characters
-        latex = text.replace('\\', '\\textbackslash{}')
-        latex = latex.replace('&', '\\&')
-        latex = latex.replace('%', '\\%')
-        latex = latex.replace('$', '\\$')
-        latex = latex.replace('#', '\\#')
-        latex = latex.replace('^', '\\textasciicircum{}')
-        latex = latex.replace('_', '\\_')
-        latex = latex.replace('{', '\\{')
-        latex = latex.replace('}', '\\}')
-        latex = latex.replace('~', '\\textasciitilde{}')
-        
-        # Try to use AI for better LaTeX conversion if available
+        Convert plain text to LaTeX format by escaping special characters.
+        Used offline and as the fallback when AI conversion is unavailable.
+        """
+        # Typical prose has no special characters and is returned as is
+        if not _LATEX_SPECIAL_RE.search(text):
+            return text
+        # Escape LaTeX special characters in a single pass
+        return text.translate(_LATEX_ESCAPE_TABLE)
+    
+    def _convert_to_latex_with_ai(self, text: str) -> str:
+        """
+        Convert plain text to LaTeX format using a separate AI request.
+        Only used when the LaTeX version could not be produced alongside the paragraph.
+        Uses _convert_to_latex instead if use_ai_latex is off, the text has no LaTeX
+        special characters (nothing to convert), or the AI request fails. If it failed
+        because of rate limiting, authentication or another error that will not go away,
+        use_ai_latex is turned off for the rest of the session, so a throttled or
+        misconfigured provider is not called again for every paragraph.
+        """
+        if not self.use_ai_latex or not _LATEX_SPECIAL_RE.search(text):
+            return self._convert_to_latex(text)
+        
+        previous_latex, prompt = self._latex_request(text)
+        if previous_latex is not None:
+            return previous_latex
+        
+        try:
+            ai_latex = self.ai_wrapper.generate(prompt)
+        except ValueError as e:
+            # Fallback to basic conversion
+            self._ai_latex_failed(e)
+            return self._convert_to_latex(text)
+        # Clean up AI output (remove markdown code blocks if present)
+        return self._remember_conversion(text, self._strip_code_fence(ai_latex))
+    
+    async def _aconvert_to_latex_with_ai(self, text: str,
+                                         rate_limiter: Optional[RateLimiter] = None) -> str:
+        """Async version of _convert_to_latex_with_ai."""
+        if not self.use_ai_latex or not _LATEX_SPECIAL_RE.search(text):
+            return self._convert_to_latex(text)
+        
+        previous_latex, prompt = self._latex_request(text)
+        if previous_latex is not None:
+            return previous_latex
+        
         try:
-            conversion_prompt = f"""Convert the following academic text to LaTeX format. 
+            ai_latex = await self._arequest(prompt, rate_limiter)
+        except ValueError as e:
+            self._ai_latex_failed(e)
+            return self._convert_to_latex(text)
+        return self._remember_conversion(text, self._strip_code_fence(ai_latex))
+    
+    def _ai_latex_failed(self, error: Exception):
+        """
+        Handle a failed LaTeX conversion request.
+        
+        Rate limiting (429), authentication errors (401/403) and errors that a retry would
+        not fix turn off AI LaTeX conversion for the rest of the session (warns once);
+        after a transient error (timeout, server error) only this paragraph is escaped locally.
+        """
+        status = getattr(error, 'status_code', None)
+        if status not in (401, 403, 429) and is_retriable_error(error):
+            print(f"Warning: LaTeX conversion request failed ({error}); escaping this paragraph locally")
+        elif self.use_ai_latex:
+            print(f"Warning: LaTeX conversion request failed ({error}); "
+                  f"escaping LaTeX locally for the rest of this session")
+            self.use_ai_latex = False
+    
+    def _latex_request(self, text: str) -> Tuple[Optional[str], str]:
+        """
+        Decide how to get the LaTeX version of text.
+        
+        With the prompt cache enabled, a paragraph converted before is answered from
+        the cache, and a close variant of one (e.g., a revision) is converted by asking
+        the AI to update the earlier LaTeX rather than starting from scratch.
+        
+        Returns:
+            Tuple of (cached_latex, prompt); cached_latex is None if a request is needed
+        """
+        if self.prompt_cache is not None:
+            previous = self.prompt_cache.similar_conversion(text, **self._conversion_scope())
+            if previous:
+                previous_text, previous_latex = previous
+                if previous_text == text:
+                    return previous_latex, ""
+                return None, self._latex_update_prompt(previous_text, previous_latex, text)
+        return None, self._latex_conversion_prompt(text)
+    
+    def _remember_conversion(self, text: str, latex_text: str) -> str:
+        """Record a plain text -> LaTeX pair for later _latex_request lookups and return latex_text."""
+        if self.prompt_cache is not None:
+            self.prompt_cache.set_conversion(text, latex_text, **self._conversion_scope())
+        return latex_text
+    
+    def _conversion_scope(self) -> Dict[str, str]:
+        """Provider and model the remembered conversions belong to (another model's LaTeX is not reused)."""
+        return {"provider": self.ai_wrapper.get_provider(), "model": self.ai_wrapper.get_model()}
+    
+    async def _arequest(self, prompt: str, rate_limiter: Optional[RateLimiter] = None, **kwargs) -> str:
+        """
+        Send one async AI request, through rate_limiter if one is given.
+        
+        Args:
+            prompt: Prompt text
+            rate_limiter: Optional RateLimiter (waits for capacity and retries transient failures)
+            **kwargs: Arguments passed to ai_wrapper.agenerate
+            
+        Returns:
+            Generated text
+        """
+        if rate_limiter is None:
+            return await self.ai_wrapper.agenerate(prompt, **kwargs)
+        return await rate_limiter.run(self.ai_wrapper.agenerate, prompt,
+                                      tokens=RateLimiter.estimate_tokens(prompt), **kwargs)
+    
+    def _latex_update_prompt(self, previous_text: str, previous_latex: str, text: str) -> str:
+        """Build the prompt that updates the LaTeX of an earlier, similar version of text."""
+        return f"""The LaTeX below was converted from an earlier version of an academic paragraph.
+Update it so that it matches the new version of the text, changing only what differs and keeping the existing LaTeX formatting.
+
+Earlier text:
+{previous_text}
+
+Earlier LaTeX:
+{previous_latex}
+
+New text:
+{text}
+
+Output only the LaTeX code, without any explanations or markdown formatting."""
+    
+    def _latex_conversion_prompt(self, text: str) -> str:
+        """Build the prompt used for a standalone plain text to LaTeX conversion."""
+        return f"""Convert the following academic text to LaTeX format. 
 Preserve the meaning and structure. Use appropriate LaTeX commands for formatting.
 
 Text:
 {text}
 
 Output only the LaTeX code, without any explanations or markdown formatting."""
-            
-            ai_latex = self.ai_wrapper.generate(conversion_prompt)
-            # Clean up AI output (remove markdown code blocks if present)
-            ai_latex = ai_latex.strip()
-            if ai_latex.startswith('```'):
-                lines = ai_latex.split('\n')
-                ai_latex = '\n'.join(lines[1:-1]) if lines[-1].startswith('```') else '\n'.join(lines[1:])
-            
-            return ai_latex.strip()
-        except Exception:
-            # Fallback to basic conversion
-            return latex
     
     def ask_professor_review(self) -> str:
         """
@@ -465,6 +1293,15 @@ Output only the LaTeX code, without any explanations or markdown formatting."""
         
         return todo_list
     
+    async def aask_professor_review(self) -> str:
+        """
+        Async version of ask_professor_review; runs the review in a worker thread.
+        
+        Returns:
+            Generated todo list
+        """
+        return await asyncio.to_thread(self.ask_professor_review)
+    
     def revise_from_todo(self, paragraph_template: Optional[str] = None) -> str:
         """
         Revise writing based on todo list.
@@ -481,21 +1318,19 @@ Output only the LaTeX code, without any explanations or markdown formatting."""
         if not self.todo_history_file.exists():
             raise ValueError(f"Todo history file not found: {self.todo_history_file}")
         
-        # Read todo list
-        with open(self.todo_history_file, 'r', encoding='utf-8') as f:
-            todo_content = f.read()
+        # Read the latest todo list (the history grows with every professor review)
+        todo_content = self._read_latest_todo()
         
-        # Load writing history for context
+        # Load the end of the writing history for context
         writing_history = ""
         if self.writing_history_file.exists():
-            with open(self.writing_history_file, 'r', encoding='utf-8') as f:
-                writing_history = f.read()
+            writing_history = self._read_tail(self.writing_history_file, 2000)
         
         # Create revision prompt
         prompt = f"""Revise the following paragraph based on the todo list feedback:
 
 ===== Current Writing =====
-{writing_history[-2000:]}  # Last 2000 chars for context
+{writing_history}  # Last 2000 chars for context
 
 ===== Todo List =====
 {todo_content}
@@ -510,45 +1345,227 @@ Please revise the writing to address all items in the todo list.
         
         return revised_text
     
-    def _append_to_history(self, text: str):
-        """Append text to writing history."""
-        self.writing_history_file.parent.mkdir(parents=True, exist_ok=True)
+    async def _run_file_io(self, func, *args, **kwargs):
+        """
+        Run a blocking file helper in a worker thread, one at a time.
         
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(self.writing_history_file, 'a', encoding='utf-8') as f:
-            f.write(f"\n{'='*80}\n")
-            f.write(f"Entry: {timestamp}\n")
-            f.write(f"{'='*80}\n\n")
-            f.write(text)
-            f.write("\n\n")
+        Args:
+            func: File helper to call (e.g., self._save_latex)
+            *args, **kwargs: Arguments passed through to func
+            
+        Returns:
+            Whatever func returns
+        """
+        loop = asyncio.get_running_loop()
+        if self._file_lock is None or self._file_lock_loop is not loop:
+            self._file_lock = asyncio.Lock()
+            self._file_lock_loop = loop
+        async with self._file_lock:
+            return await asyncio.to_thread(func, *args, **kwargs)
+    
+    def _save_mode_outputs(self, plain_text: str, latex_text: str,
+                           version_mode: Optional[str] = None,
+                           update_temp_memory: bool = True) -> Optional[int]:
+        """
+        Write the results of a mode run: history entry, Latex.txt and the TempMemory.txt Output section.
+        
+        The writes are staged and flushed together, one open/write per file.
+        
+        Args:
+            plain_text: Generated paragraph
+            latex_text: LaTeX version of the paragraph
+            version_mode: If given, append a versioned history entry for this mode (e.g., "ReviseParagraph")
+            update_temp_memory: Whether to update the TempMemory.txt Output section
+            
+        Returns:
+            Version number of the history entry, or None for an unversioned entry
+        """
+        version = None
+        if version_mode:
+            version = self._append_to_history_with_version(plain_text, mode=version_mode)
+        else:
+            self._append_to_history(plain_text)
+        self._save_latex(latex_text)
+        if update_temp_memory:
+            self._save_output_to_temp_memory(plain_text)
+        
+        self._flush_writes()
+        return version
+    
+    def _flush_writes(self):
+        """Write all staged output to disk and refresh the caches that depend on file state."""
+        self._file_writer.flush()
+        
+        if self._version_cache_dirty:
+            self._save_version_cache()
+            self._version_cache_dirty = False
+        if self._pending_temp_memory is not None:
+            self._memory_cache[self.temp_memory_file] = (self._file_signature(self.temp_memory_file),
+                                                         self._pending_temp_memory)
+            self._pending_temp_memory = None
+    
+    def _append_to_history(self, text: str):
+        """Stage a writing history entry (written by _flush_writes)."""
+        timestamp = _timestamp()
+        self._file_writer.append(
+            self.writing_history_file,
+            f"\n{'='*80}\nEntry: {timestamp}\n{'='*80}\n\n{text}\n\n"
+        )
     
     def _get_next_version_number(self) -> int:
         """
         Get the next version number for WritingHistory.txt.
         
+        The highest version is cached (in memory and in Intermediate/.version together
+        with the history size it covers), so only text appended since the last lookup
+        is scanned. Without a usable cache, the history is scanned backwards from the end
+        until the latest version entry is found.
+        
         Returns:
             Next version number (starts at 1 if no versions exist)
         """
         if not self.writing_history_file.exists():
+            self._cached_max_version = None
             return 1
         
-        with open(self.writing_history_file, 'r', encoding='utf-8') as f:
-            content = f.read()
+        size = self.writing_history_file.stat().st_size
+        if self._cached_max_version is None:
+            self._load_version_cache()
         
-        # Find all version numbers in the file
-        version_pattern = r'Version\s+(\d+)'
-        versions = re.findall(version_pattern, content, re.IGNORECASE)
+        if self._cached_max_version is None or self._version_scanned_size > size:
+            # No cache, or the history was truncated/replaced: find the latest version
+            self._cached_max_version = self._scan_last_version()
+        elif self._version_scanned_size < size:
+            # Only scan entries appended since the last lookup
+            self._cached_max_version = max(self._cached_max_version,
+                                           self._scan_max_version(self._version_scanned_size))
+        self._version_scanned_size = size
         
-        if not versions:
-            return 1
+        return self._cached_max_version + 1
+    
+    def _scan_max_version(self, offset: int) -> int:
+        """
+        Find the highest version number in WritingHistory.txt from a byte offset onward.
+        
+        Args:
+            offset: Byte offset to start scanning from (0 for the whole file)
+            
+        Returns:
+            Highest version number found, or 0 if none
+        """
+        with open(self.writing_history_file, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size - offset >= _MMAP_MIN_SIZE:
+                # Large histories: let the regex scan the page cache directly
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    versions = _VERSION_RE.findall(mm, offset)
+            else:
+                f.seek(offset)
+                versions = _VERSION_RE.findall(f.read())
         
-        # Return the highest version number + 1
-        max_version = max(int(v) for v in versions)
-        return max_version + 1
+        return max((int(v) for v in versions), default=0)
+    
+    def _scan_last_version(self, window: int = 8192) -> int:
+        """
+        Find the latest version number in WritingHistory.txt by reading it backwards.
+        
+        Versions are appended in increasing order, so the tail holds the highest one.
+        The window starts at the end of the file and doubles until it contains a
+        version entry or reaches the start of the file.
+        
+        Args:
+            window: Initial number of bytes to read from the end (default: 8192)
+            
+        Returns:
+            Highest version number in the first window that has one, or 0 if none
+        """
+        with open(self.writing_history_file, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            while True:
+                start = max(0, size - window)
+                f.seek(start)
+                versions = _VERSION_RE.findall(f.read(size - start))
+                if versions or start == 0:
+                    return max((int(v) for v in versions), default=0)
+                window *= 2
+    
+    def _read_latest_todo(self) -> str:
+        """
+        Read the latest entry of TodoHistory.txt without keeping the whole history in memory.
+        
+        The latest entry is the one with the highest "TODO LIST #" number: new entries
+        are appended, while older histories put the latest entry first. A file without
+        "TODO LIST #" headers is returned in full.
+        
+        Returns:
+            The latest todo list entry (with its header)
+        """
+        separator = '=' * 80 + '\n'
+        latest: List[str] = []
+        latest_num = -1
+        current: List[str] = []
+        current_num: Optional[int] = None
+        with open(self.todo_history_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith("TODO LIST #"):
+                    # The separator line before a header opens the new entry
+                    opening = [current.pop()] if current and current[-1] == separator else []
+                    if current_num is not None and current_num >= latest_num:
+                        latest, latest_num = current, current_num
+                    current = opening
+                    digits = line[len("TODO LIST #"):].strip()
+                    current_num = int(digits) if digits.isdigit() else 0
+                current.append(line)
+        
+        if current_num is None:
+            return ''.join(current)
+        if current_num >= latest_num:
+            latest = current
+        return ''.join(latest)
+    
+    def _read_tail(self, path: Path, max_chars: int) -> str:
+        """
+        Read the last max_chars characters of a UTF-8 text file without loading all of it.
+        
+        Args:
+            path: File to read
+            max_chars: Number of characters to return from the end of the file
+            
+        Returns:
+            Up to max_chars characters from the end of the file
+        """
+        # A UTF-8 character is at most 4 bytes, so this many bytes always covers max_chars;
+        # a character cut in half at the start of the window is dropped by errors='ignore'
+        max_bytes = max_chars * 4
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - max_bytes), os.SEEK_SET)
+            data = f.read()
+        
+        return data.decode('utf-8', errors='ignore')[-max_chars:]
+    
+    def _load_version_cache(self):
+        """Load the cached max version and scanned history size from Intermediate/.version."""
+        try:
+            max_version, scanned_size = self.version_cache_file.read_text(encoding='utf-8').split()
+            self._cached_max_version = int(max_version)
+            self._version_scanned_size = int(scanned_size)
+        except (OSError, ValueError):
+            self._cached_max_version = None
+            self._version_scanned_size = 0
+    
+    def _save_version_cache(self):
+        """Record the cached max version and the history size it covers in Intermediate/.version."""
+        if self._cached_max_version is None:
+            return
+        self._version_scanned_size = self.writing_history_file.stat().st_size
+        self.version_cache_file.write_text(
+            f"{self._cached_max_version} {self._version_scanned_size}\n", encoding='utf-8'
+        )
     
     def _append_to_history_with_version(self, text: str, mode: str = "ReviseParagraph") -> int:
         """
-        Append text to writing history with version number.
+        Stage a writing history entry with version number (written by _flush_writes).
         
         Args:
             text: Text to append
@@ -557,36 +1574,26 @@ Please revise the writing to address all items in the todo list.
         Returns:
             Version number assigned to this entry
         """
-        self.writing_history_file.parent.mkdir(parents=True, exist_ok=True)
-        
         version = self._get_next_version_number()
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = _timestamp()
         
-        with open(self.writing_history_file, 'a', encoding='utf-8') as f:
-            f.write(f"\n{'='*80}\n")
-            f.write(f"Version {version} - {mode} - {timestamp}\n")
-            f.write(f"{'='*80}\n\n")
-            f.write(text)
-            f.write("\n\n")
+        self._file_writer.append(
+            self.writing_history_file,
+            f"\n{'='*80}\nVersion {version} - {mode} - {timestamp}\n{'='*80}\n\n{text}\n\n"
+        )
+        
+        self._cached_max_version = max(version, self._cached_max_version or 0)
+        self._version_cache_dirty = True
         
         return version
     
     def _save_latex(self, latex_text: str):
-        """Save LaTeX text to Latex.txt."""
-        self.output_latex.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Overwrite with latest LaTeX output
-        with open(self.output_latex, 'w', encoding='utf-8') as f:
-            f.write(latex_text)
-            f.write("\n")
+        """Stage the latest LaTeX output for Latex.txt (written by _flush_writes)."""
+        self._file_writer.write(self.output_latex, latex_text + "\n")
     
     def _save_plaintext(self, text: str):
-        """Save plain text to Plaintext.txt."""
-        self.output_plaintext.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Overwrite with latest plain text output
-        with open(self.output_plaintext, 'w', encoding='utf-8') as f:
-            f.write(text)
+        """Stage the latest plain text output for Plaintext.txt (written by _flush_writes)."""
+        self._file_writer.write(self.output_plaintext, text)
     
     def _save_prompt(self, prompt: str, mode: str):
         """
@@ -596,79 +1603,246 @@ Please revise the writing to address all items in the todo list.
             prompt: The prompt text that will be sent to the AI model
             mode: The writer mode (e.g., "NewParagraph", "ReviseParagraph")
         """
-        self.prompt_history_file.parent.mkdir(parents=True, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._file_writer.ensure_parent(self.prompt_history_file)
+        timestamp = _timestamp()
         
         entry = []
-        entry.append(f"{'='*80}")
+        entry.append(_PROMPT_SEPARATOR)
         entry.append(f"Mode: {mode} | Timestamp: {timestamp}")
-        entry.append(f"{'='*80}")
+        entry.append(_PROMPT_SEPARATOR)
         entry.append(prompt.rstrip())
         entry.append("")  # blank line separator
-        entry_text = "\n".join(entry) + "\n"
+        entry_bytes = ("\n".join(entry) + "\n").encode('utf-8')
         
-        existing_content = ""
-        if self.prompt_history_file.exists():
-            with open(self.prompt_history_file, 'r', encoding='utf-8') as f:
-                existing_content = f.read()
+        # Append (newest last) so each save costs O(entry) rather than rewriting the log,
+        # and record where the entry landed so list_prompts can read it back directly
+        with open(self.prompt_history_file, 'ab') as f:
+            offset = f.tell()
+            f.write(entry_bytes)
         
-        with open(self.prompt_history_file, 'w', encoding='utf-8') as f:
-            if existing_content:
-                f.write(entry_text + existing_content)
+        mode_id = _PROMPT_MODES.index(mode) + 1 if mode in _PROMPT_MODES else 0
+        with open(self.prompt_index_file, 'ab') as f:
+            f.write(_PROMPT_INDEX_RECORD.pack(offset, len(entry_bytes), mode_id))
+    
+    def list_prompts(self, limit: int = 1, mode: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        Return the most recent prompts logged in prompt.txt.
+        
+        Entries are located through prompt.txt.idx, so only the returned entries are
+        read from the log. If the index is missing or does not match the log (e.g.,
+        prompt.txt was edited by hand), the whole log is parsed instead.
+        
+        Args:
+            limit: Number of prompts to return (default: 1)
+            mode: Only return prompts logged by this mode (default: any mode)
+            
+        Returns:
+            List of {'mode': ..., 'timestamp': ..., 'prompt': ...} dictionaries, newest first
+        """
+        if limit <= 0 or not self.prompt_history_file.exists():
+            return []
+        
+        entries = self._read_indexed_prompts(limit, mode)
+        if entries is None:
+            recent = deque((entry for entry in self._iter_prompt_entries()
+                            if mode is None or entry['mode'] == mode), maxlen=limit)
+            entries = list(reversed(recent))
+        return entries
+    
+    def tail_prompts(self, n: int = 1) -> List[Dict[str, str]]:
+        """
+        Return the n most recent prompts logged in prompt.txt, newest first.
+        
+        Args:
+            n: Number of prompts to return (default: 1)
+            
+        Returns:
+            Same as list_prompts(limit=n)
+        """
+        return self.list_prompts(limit=n)
+    
+    def _read_indexed_prompts(self, limit: int, mode: Optional[str]) -> Optional[List[Dict[str, str]]]:
+        """
+        Read the latest prompt.txt entries by walking prompt.txt.idx backwards.
+        
+        Returns:
+            Entries newest first, or None if the index cannot be trusted for this log
+        """
+        record_size = _PROMPT_INDEX_RECORD.size
+        try:
+            index_size = os.path.getsize(self.prompt_index_file)
+            log_size = os.path.getsize(self.prompt_history_file)
+        except OSError:
+            return None
+        if index_size == 0 or index_size % record_size:
+            return None
+        
+        mode_id = _PROMPT_MODES.index(mode) + 1 if mode in _PROMPT_MODES else None
+        entries: List[Dict[str, str]] = []
+        with open(self.prompt_index_file, 'rb') as index_file, open(self.prompt_history_file, 'rb') as log_file:
+            if index_size >= _MMAP_MIN_SIZE:
+                index = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
             else:
-                f.write(entry_text)
+                index = index_file.read()
+            try:
+                # The index must cover the log exactly: from its first byte to its last
+                first_offset = _PROMPT_INDEX_RECORD.unpack_from(index, 0)[0]
+                last_offset, last_length, _ = _PROMPT_INDEX_RECORD.unpack_from(index, index_size - record_size)
+                if first_offset != 0 or last_offset + last_length != log_size:
+                    return None
+                
+                for position in range(index_size - record_size, -1, -record_size):
+                    offset, length, entry_mode_id = _PROMPT_INDEX_RECORD.unpack_from(index, position)
+                    if mode_id is not None and entry_mode_id != mode_id:
+                        continue
+                    
+                    log_file.seek(offset)
+                    entry = self._parse_prompt_entry(log_file.read(length))
+                    if entry is None:
+                        return None
+                    if mode is not None and entry['mode'] != mode:
+                        continue
+                    
+                    entries.append(entry)
+                    if len(entries) == limit:
+                        break
+            finally:
+                if isinstance(index, mmap.mmap):
+                    index.close()
+        return entries
+    
+    def _parse_prompt_entry(self, data: bytes) -> Optional[Dict[str, str]]:
+        """Parse one prompt.txt entry (header and prompt), or return None if it is malformed."""
+        try:
+            lines = data.decode('utf-8').split('\n')
+        except UnicodeDecodeError:
+            return None
+        if (len(lines) < 3 or lines[0] != _PROMPT_SEPARATOR or lines[2] != _PROMPT_SEPARATOR
+                or not lines[1].startswith("Mode: ")):
+            return None
+        return self._make_prompt_entry(self._parse_prompt_header(lines[1]), lines[3:])
+    
+    def _parse_prompt_header(self, line: str) -> Dict[str, str]:
+        """Parse a "Mode: ... | Timestamp: ..." prompt.txt header line."""
+        mode_part, _, timestamp_part = line.partition(" | ")
+        return {
+            'mode': mode_part[len("Mode: "):].strip(),
+            'timestamp': timestamp_part.replace("Timestamp:", "", 1).strip()
+        }
+    
+    def _iter_prompt_entries(self):
+        """Yield prompt.txt entries in file order, reading the log line by line."""
+        separator = _PROMPT_SEPARATOR
+        header: Optional[Dict[str, str]] = None
+        lines: List[str] = []
+        pending: List[str] = []  # separator line that may start the next entry
+        
+        with open(self.prompt_history_file, 'r', encoding='utf-8') as f:
+            for raw_line in f:
+                line = raw_line.rstrip('\n')
+                if len(pending) == 1:
+                    if line.startswith("Mode: "):
+                        pending.append(line)
+                        continue
+                    lines.extend(pending)
+                    pending = []
+                elif len(pending) == 2:
+                    if line == separator:
+                        if header is not None:
+                            yield self._make_prompt_entry(header, lines)
+                        header = self._parse_prompt_header(pending[1])
+                        lines = []
+                        pending = []
+                        continue
+                    lines.extend(pending)
+                    pending = []
+                
+                if line == separator:
+                    pending = [line]
+                else:
+                    lines.append(line)
+        
+        lines.extend(pending)
+        if header is not None:
+            yield self._make_prompt_entry(header, lines)
+    
+    def _make_prompt_entry(self, header: Dict[str, str], lines: List[str]) -> Dict[str, str]:
+        """Combine a parsed prompt.txt header with its prompt lines."""
+        return {
+            'mode': header['mode'],
+            'timestamp': header['timestamp'],
+            'prompt': "\n".join(lines).strip()
+        }
     
     def _save_output_to_temp_memory(self, output_text: str):
         """
-        Save the resulting paragraph to TempMemory.txt Output section.
+        Stage the resulting paragraph for the TempMemory.txt Output section (written by _flush_writes).
         
         Args:
             output_text: The paragraph text to save
         """
-        # Load current temp memory
-        temp_memory = self.memory_manager.load_temp_memory(str(self.temp_memory_file))
+        # Current temp memory; served from the cache unless the file was edited since it was read
+        temp_memory = self._load_temp_memory()
         
         # Update the Output section with the new paragraph
         # Split the text into lines and store as list items
         output_lines = [line.strip() for line in output_text.strip().split('\n') if line.strip()]
         temp_memory["Output"] = output_lines
         
-        # Save back to file
-        self.memory_manager.save_temp_memory(str(self.temp_memory_file), temp_memory)
+        # Stage the file contents (text file first, then its JSON sidecar, as in
+        # MemoryManager.save_temp_memory); the cache is refreshed once they are written
+        self._file_writer.write(self.temp_memory_file, self.memory_manager.format_temp_memory(temp_memory))
+        self._file_writer.write(
+            self.memory_manager.json_sidecar_path(self.temp_memory_file),
+            self.memory_manager.dump_memory_json(temp_memory)
+        )
+        self._pending_temp_memory = temp_memory
     
-    def _append_prompt_section(
-        self,
-        prompt_parts: List[str],
-        title: str,
-        content: Optional[Union[str, List[str]]],
-        bulletize: bool = False
-    ):
+    def _load_temp_memory(self) -> Dict[str, List[str]]:
         """
-        Append a formatted section to the prompt if content is provided.
+        Load TempMemory.txt, reusing the last parse while the file is unchanged.
+        
+        Returns:
+            Temp memory dictionary (a fresh dict; the section lists are shared with
+            the cache and should be replaced rather than mutated in place)
         """
-        if content is None:
-            return
+        return self._load_memory_file(self.temp_memory_file, self.memory_manager.load_temp_memory)
+    
+    def _load_project_memory(self) -> Dict[str, List[str]]:
+        """
+        Load ProjectMemory.txt, reusing the last parse while the file is unchanged.
         
-        if isinstance(content, list):
-            entries = [str(item).strip() for item in content if str(item).strip()]
-            if not entries:
-                return
-        else:
-            content_str = str(content).strip()
-            if not content_str:
-                return
-            entries = content_str.splitlines()
-        
-        prompt_parts.append(f"===== {title} =====")
-        for entry in entries:
-            if bulletize:
-                if entry.startswith(("-", "•")):
-                    prompt_parts.append(entry)
-                else:
-                    prompt_parts.append(f"- {entry}")
-            else:
-                prompt_parts.append(entry)
-        prompt_parts.append("")
+        Returns:
+            Project memory dictionary (a fresh dict, see _load_temp_memory)
+        """
+        return self._load_memory_file(self.project_memory_file, self.memory_manager.load_project_memory)
+    
+    def _load_memory_file(self, path: Path,
+                          loader: Callable[[str], Dict[str, List[str]]]) -> Dict[str, List[str]]:
+        """
+        Parse a memory file with loader, or return the cached parse if the file is unchanged.
+        
+        Args:
+            path: Memory file to load
+            loader: MemoryManager method that parses it (called with the path as a string)
+            
+        Returns:
+            A fresh copy of the top-level dictionary
+        """
+        signature = self._file_signature(path)
+        cached = self._memory_cache.get(path)
+        if cached is None or cached[0] != signature:
+            cached = (signature, loader(str(path)))
+            self._memory_cache[path] = cached
+        return dict(cached[1])
+    
+    def _file_signature(self, path: Path) -> Tuple[str, Optional[int], Optional[int]]:
+        """Return (path, mtime_ns, size) used to tell whether a cached parse is still valid."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return (str(path), None, None)
+        return (str(path), stat.st_mtime_ns, stat.st_size)
     
     def _format_inline_feedback(self, inline_comments: List[Dict[str, str]]) -> List[str]:
         """
@@ -696,8 +1870,10 @@ Please revise the writing to address all items in the todo list.
         self._save_plaintext(text)
         
         # Also save LaTeX version
-        latex_text = self._convert_to_latex(text)
+        latex_text = self._convert_to_latex_with_ai(text)
         self._save_latex(latex_text)
+        
+        self._flush_writes()
 
 
 def main():
@@ -714,6 +1890,12 @@ def main():
                        help='Writing mode (default: newparagraph)')
     parser.add_argument('--provider', default='gemini', choices=['gemini', 'openai'],
                        help='API provider (default: gemini)')
+    parser.add_argument('--cache', action='store_true',
+                       help='Reuse cached responses for identical prompts (Intermediate/prompt_cache.sqlite)')
+    parser.add_argument('--stream', action='store_true',
+                       help='Print the paragraph as it is generated')
+    parser.add_argument('--ai-latex', action='store_true',
+                       help='Use an extra AI request for LaTeX when it is not returned with the paragraph')
     
     args = parser.parse_args()
     
@@ -726,12 +1908,19 @@ def main():
         project_path=args.project_path,
         api_provider=args.provider,
         gemini_api_key=gemini_key,
-        openai_api_key=openai_key
+        openai_api_key=openai_key,
+        use_cache=args.cache,
+        stream_output=args.stream,
+        use_ai_latex=args.ai_latex
     )
+    if args.stream:
+        writer.on_stream_chunk = lambda chunk: print(chunk, end='', flush=True)
     
     try:
         if args.mode == 'newparagraph':
             result = writer.new_paragraph()
+            if args.stream:
+                print()  # end the streamed paragraph
             print("✓ Paragraph written!")
             print(f"\nPlain text saved to: {writer.writing_history_file}")
             print(f"LaTeX saved to: {writer.output_latex}")
@@ -741,6 +1930,8 @@ def main():
             print("-" * 80)
         elif args.mode == 'reviseparagraph':
             result = writer.revise_paragraph()
+            if args.stream:
+                print()  # end the streamed paragraph
             print("✓ Paragraph revised!")
             print(f"\nVersion {result['version']} saved to: {writer.writing_history_file}")
             print(f"LaTeX saved to: {writer.output_latex}")
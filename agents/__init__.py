@@ -1,23 +1,38 @@
 """Research Paper Writing Agents Package."""
 
-# Import from root-level modules (for backward compatibility)
 import sys
 import os
+import importlib
 
-# Add parent directory to path if needed for importing root-level modules
-parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-if parent_dir not in sys.path:
-    sys.path.insert(0, parent_dir)
-
-from student_writer import StudentWriterAgent
-from style_analyzer import StyleAnalyzerAgent
-from professor_feedback import ProfessorFeedbackAgent
 from .Writer import Writer
 
+# Root-level agents (kept for backward compatibility) are imported on first use,
+# so importing Writer does not load them or their AI SDKs
+_LAZY_AGENTS = {
+    'StudentWriterAgent': 'student_writer',
+    'StyleAnalyzerAgent': 'style_analyzer',
+    'ProfessorFeedbackAgent': 'professor_feedback',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_AGENTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # The root-level modules live in the parent directory
+    parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if parent_dir not in sys.path:
+        sys.path.insert(0, parent_dir)
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
 __all__ = [
-    'StudentWriterAgent', 
-    'StyleAnalyzerAgent', 
+    'StudentWriterAgent',
+    'StyleAnalyzerAgent',
     'ProfessorFeedbackAgent',
     'Writer'
 ]
-
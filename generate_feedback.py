@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Standalone script to generate professor feedback as actionable to-do list.
-Usage: python generate_feedback.py <heuristics_file> <writinghistory_file> <output_file> [--provider gemini|openai]
+Usage: python generate_feedback.py <heuristics_file> <writinghistory_file> <output_file> [--provider gemini|openai] [--cache] [--stream]
 """
 
 import sys
@@ -14,10 +14,13 @@ def main():
     
     # Parse command line arguments
     if len(sys.argv) < 4:
-        print("Usage: python generate_feedback.py <heuristics_file> <writinghistory_file> <output_file> [--provider gemini|openai]")
+        print("Usage: python generate_feedback.py <heuristics_file> <writinghistory_file> <output_file> [--provider gemini|openai] [--cache] [--stream]")
         print("\nExample:")
         print('  python generate_feedback.py "heuristics.txt" "writinghistory.txt" "todo_list.txt"')
         print('  python generate_feedback.py "heuristics.txt" "writinghistory.txt" "todo_list.txt" --provider openai')
+        print("\n--cache reuses the to-do list for unchanged heuristics and writing")
+        print("  (stored in prompt_cache.sqlite next to the output file)")
+        print("--stream prints the to-do list as it is generated")
         print("\nRequired: Set API key for AI-powered feedback generation")
         print('  export GEMINI_API_KEY="your_api_key_here"')
         print('  or')
@@ -35,6 +38,12 @@ def main():
         if idx + 1 < len(sys.argv):
             api_provider = sys.argv[idx + 1].lower()
     
+    # Optional response cache next to the output file
+    prompt_cache = None
+    if "--cache" in sys.argv:
+        from tools.PromptCache import PromptCache
+        prompt_cache = PromptCache(os.path.join(os.path.dirname(os.path.abspath(output_file)), "prompt_cache.sqlite"))
+    
     # Check if input files exist
     if not os.path.exists(heuristics_file):
         print(f"Error: Heuristics file not found: {heuristics_file}")
@@ -67,8 +76,12 @@ def main():
         expertise="Academic Writing",
         api_provider=api_provider,
         gemini_api_key=api_key if api_provider == "gemini" else None,
-        openai_api_key=api_key if api_provider == "openai" else None
+        openai_api_key=api_key if api_provider == "openai" else None,
+        prompt_cache=prompt_cache,
+        stream_output="--stream" in sys.argv
     )
+    if professor.stream_output:
+        professor.on_stream_chunk = lambda chunk: print(chunk, end='', flush=True)
     
     # Check if API is available
     if not professor.api_available:
@@ -92,7 +105,7 @@ def main():
         print("\n✓ Feedback generation complete!")
         print(f"  - To-do list saved to: {result['output_file']}")
         print(f"  - Latest writing length: {len(result['latest_writing'])} characters")
-        print(f"  - To-do list history maintained (latest at top)")
+        print(f"  - To-do list history maintained (new entries appended)")
         
         # Show history info
         if os.path.exists(output_file):
@@ -6,25 +6,355 @@ Provides academic feedback similar to a professor reviewing a research paper.
 Uses AI APIs to generate actionable to-do lists based on heuristics.
 """
 
-from typing import Dict, List, Optional
-import json
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from collections import deque
+from functools import lru_cache
+import asyncio
+import hashlib
+import importlib.util
+import mmap
 import os
 import re
+import threading
 from datetime import datetime
 
-# Try to import Google Gen AI SDK
+# Check whether the Google Gen AI SDK and the OpenAI API are installed without importing
+# them: the SDKs are imported when a client is created, since importing them takes longer
+# than loading everything else
 try:
-    from google.genai import Client as GenAIClient
-    GEMINI_AVAILABLE = True
+    GEMINI_AVAILABLE = importlib.util.find_spec("google.genai") is not None
 except ImportError:
     GEMINI_AVAILABLE = False
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+
+# Number of recent results kept in ProfessorFeedbackAgent.feedback_history
+_FEEDBACK_HISTORY_LIMIT = 128
+
+# Sections every paper is expected to have, in the order they are reported when missing
+_STANDARD_SECTIONS = ("introduction", "methodology", "results", "discussion", "conclusion")
+
+# Section-specific reviewers by lowercase section name; other sections get _review_generic_section
+_SECTION_REVIEWERS = {
+    "introduction": "_review_introduction",
+    "methodology": "_review_methodology",
+    "results": "_review_results",
+    "discussion": "_review_discussion",
+    "conclusion": "_review_conclusion",
+}
+
+# Separator line of a to-do list history file, with the newlines around it
+_TODO_SEPARATOR = "\n" + "=" * 80 + "\n"
+
+# Header line of a to-do list history entry, matched in the raw bytes of the file
+_TODO_NUMBER_RE = re.compile(rb'^TODO LIST #(\d+)(?=\r?\n)', re.MULTILINE)
+
+# First revision block of a writing history file (see _extract_latest_writing for the format)
+_REVISION_PATTERN = r'={80}\n(?:REVISION #\d+\n.*?\n)={80}\n\n(.*?)(?=\n={80}\n|$)'
+_REVISION_RE = re.compile(_REVISION_PATTERN, re.DOTALL)
+_REVISION_BYTES_RE = re.compile(_REVISION_PATTERN.encode('ascii'), re.DOTALL)
+
+# Metadata lines skipped when a writing history has no revision blocks
+_REVISION_METADATA_MARKERS = ('REVISION #', 'Timestamp:', 'Ideas File:', 'Template File:')
+_REVISION_METADATA_LINE_RE = re.compile(
+    r'^.*(?:' + '|'.join(map(re.escape, _REVISION_METADATA_MARKERS)) + r').*(?:\n|$)', re.MULTILINE)
+
+# Candidate separator lines (80 '=' with anything but '=' around them); the caller checks
+# that the rest is whitespace, the same test as line.strip() == '=' * 80
+_SEPARATOR_PATTERN = r'^[^\n=]*={80}[^\n=]*$'
+_SEPARATOR_RE = re.compile(_SEPARATOR_PATTERN, re.MULTILINE)
+_SEPARATOR_BYTES_RE = re.compile(_SEPARATOR_PATTERN.encode('ascii'), re.MULTILINE)
+
+# Patterns of _clean_todo_list_format (LaTeX and markdown that slipped into a plain-text to-do list)
+_ENUMERATE_OPTIONS_RE = re.compile(r'\\begin\{enumerate\}.*?\[.*?\].*?\n(.*?)\\end\{enumerate\}', re.DOTALL)
+_ENUMERATE_RE = re.compile(r'\\begin\{enumerate\}(.*?)\\end\{enumerate\}', re.DOTALL)
+_ITEMIZE_RE = re.compile(r'\\begin\{itemize\}(.*?)\\end\{itemize\}', re.DOTALL)
+_ENV_ITEM_TERMINATORS = ('\\item', '\\end{enumerate}', '\\end{itemize}')
+_ITEM_TERMINATORS = ('\\item',)
+_LEADING_SPACE_RE = re.compile(r'\s*')
+_ITEM_COMMAND_RE = re.compile(r'\\item\s*')
+_TEXTBF_RE = re.compile(r'\\textbf\{([^}]+)\}')
+_TEXTIT_RE = re.compile(r'\\textit\{([^}]+)\}')
+_EMPH_RE = re.compile(r'\\emph\{([^}]+)\}')
+_TEXTCOLOR_RE = re.compile(r'\\textcolor\{[^}]+\}\{([^}]+)\}')
+_LATEX_COMMAND_RE = re.compile(r'\\[a-zA-Z]+\*?(\{[^}]*\})?')
+# Looser variant used on standalone \item entries (kept as it was: may swallow up to a brace)
+_ITEM_LATEX_COMMAND_RE = re.compile(r'\\[a-zA-Z]+\{?[^}]*\}?')
+_BRACES_RE = re.compile(r'\{([^}]+)\}')
+_LABEL_OPTION_RE = re.compile(r'\[label=[^\]]+\]')
+_ARABIC_STAR_RE = re.compile(r'\\arabic\*')
+_ARABIC_ENUMII_RE = re.compile(r'\\arabic\{enumii\}')
+_MD_BOLD_RE = re.compile(r'\*\*([^*]+)\*\*')
+_MD_ITALIC_RE = re.compile(r'\*([^*]+)\*')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+_SPACES_RE = re.compile(r'[ \t]+')
+_SPACE_BEFORE_NEWLINE_RE = re.compile(r' \n')
+
+# Substitutions of _clean_todo_list_format, applied in order. Formatting commands keep their
+# argument; one pass of the LaTeX cleanup then removes other commands and unwraps orphaned
+# braces, while standalone \item entries use the looser command pattern
+_FORMATTING_SUBS = (
+    (_TEXTBF_RE, r'\1'),
+    (_TEXTIT_RE, r'\1'),
+    (_EMPH_RE, r'\1'),
+    (_TEXTCOLOR_RE, r'\1'),
+)
+_LATEX_CLEANUP_PASS = _FORMATTING_SUBS + ((_LATEX_COMMAND_RE, ''), (_BRACES_RE, r'\1'))
+_ITEM_CLEANUP = _FORMATTING_SUBS + ((_ITEM_LATEX_COMMAND_RE, ''),)
+
+# To-do list prompt shared by all providers, filled in with %-formatting. The fixed instructions
+# come before the heuristics (stable across revisions) and the writing (changes every time),
+# so providers can reuse the cached prompt prefix.
+_TODO_PROMPT_TEMPLATE = """You are a professor providing feedback on a research paper draft. Based on the evaluation heuristics and the student's writing, generate an actionable to-do list.
+
+INSTRUCTIONS:
+1. Carefully review the student's writing against the provided heuristics
+2. Identify specific areas that need improvement
+3. Generate an actionable to-do list with clear, specific tasks
+4. Format as a PLAIN TEXT numbered list (NOT LaTeX, NOT markdown, just plain text)
+5. Use simple formatting:
+   - Number items like: 1. First item, 2. Second item, etc.
+   - Use plain text only (no LaTeX commands, no markdown, no HTML)
+   - Use simple line breaks between items
+6. Each item should be:
+   - Specific and concrete (not vague)
+   - Actionable (the student can directly work on it)
+   - Prioritized (more important issues first)
+   - Include brief explanations where helpful
+7. Focus on the most critical improvements first
+8. Be constructive and clear
+9. Output ONLY plain text - no formatting codes, no LaTeX, no special characters for formatting
+
+EVALUATION HEURISTICS (use these as criteria):
+%s
+
+STUDENT'S LATEST WRITING (review this text):
+%s
+
+Generate the to-do list in PLAIN TEXT format now:"""
+
+# Header of one entry of a to-do list history file: a separator line, "TODO LIST #N" and the
+# Timestamp, Heuristics File and Writing History File lines, another separator line and a blank
+# line. The entry's to-do list runs from the end of the header to the next separator line; new
+# entries are appended, so the latest has the highest number
+_TODO_HEADER_RE = re.compile(
+    r'={80}\nTODO LIST #(\d+)\nTimestamp:(.*)\nHeuristics File:(.*)\nWriting History File:(.*)\n={80}\n\n'
+)
+
+
+# Letter grades by minimum score, highest first (see _estimate_grade)
+_GRADE_TABLE = (
+    (0.93, "A"),
+    (0.90, "A-"),
+    (0.87, "B+"),
+    (0.83, "B"),
+    (0.80, "B-"),
+    (0.77, "C+"),
+    (0.70, "C"),
+)
+
+# Keyword groups of the section checks; a check passes if the lowercased text contains any phrase.
+# Phrases match as substrings ('method' also matches 'methodology', 'interpret' matches
+# 'interpretation'), so the checks cannot be replaced by word-set lookups.
+# Phrases that contain a shorter phrase of the same group ('research design', 'data collection')
+# can never decide a check and are left out.
+_REVIEW_KEYWORDS = {
+    "research_question": ('research question', 'objective', 'aim', 'hypothesis', 'purpose'),
+    "background": ('background', 'context', 'previous research', 'literature'),
+    "organization": ('organized', 'structure'),
+    "design": ('method', 'approach', 'design'),
+    "data": ('data',),
+    "analysis": ('analysis', 'method'),
+    "findings": ('finding', 'result', 'observed', 'showed', 'demonstrated'),
+    "statistics": ('statistical', 'significant'),
+    "interpretation": ('interpret', 'suggest', 'indicate', 'imply', 'mean'),
+    "literature": ('previous', 'literature', 'research', 'compare', 'consist'),
+    "implications": ('implication', 'significance'),
+    "summary": ('summary', 'conclude', 'overall', 'main finding'),
+    "limitations": ('limitation',),
+    "future_work": ('future', 'further research', 'recommend', 'next step'),
+    "informal": ('gonna', 'wanna', 'lol', 'omg'),
+}
+
+
+def _todo_prompt(heuristics: str, writing: str) -> str:
+    """Build the to-do list prompt: fixed instructions, then heuristics, then the writing."""
+    return _TODO_PROMPT_TEMPLATE % (heuristics, writing)
+
+
+def _apply_subs(text: str, subs) -> Tuple[str, int]:
+    """Apply (pattern, replacement) substitutions in order; returns the text and the number of replacements."""
+    changes = 0
+    for pattern, replacement in subs:
+        # subn() prepares the replacement template even when nothing matches, which costs
+        # several times more than the search, and most patterns match nothing in a given item
+        if pattern.search(text) is None:
+            continue
+        text, n = pattern.subn(replacement, text)
+        changes += n
+    return text, changes
+
+
+def _split_items(text: str, terminators: Tuple[str, ...]) -> List[str]:
+    """
+    Text of each \\item, up to the next terminator or the end of the text.
+    
+    Same result as re.findall(r'\\item\\s*(.+?)(?=<terminator>|...|$)', text, re.DOTALL),
+    but each item boundary is found with str.find instead of a lazy match with lookaheads.
+    
+    Args:
+        text: LaTeX list text
+        terminators: Strings that end an item (the first one should be '\\item')
+        
+    Returns:
+        Item texts in order (not stripped)
+    """
+    # Bound once: this loop runs per item
+    find = text.find
+    skip_space = _LEADING_SPACE_RE.match
+    size = len(text)
+    final_newline = text.endswith('\n')
+    
+    items = []
+    pos = find('\\item')
+    while pos != -1:
+        start = skip_space(text, pos + 5).end()
+        if start == size:
+            # An item is at least one character, so trailing whitespace becomes the item
+            if start > pos + 5:
+                items.append(text[-1])
+            break
+        
+        end = size
+        for terminator in terminators:
+            # Only occurrences that start before the current end can move it
+            found = find(terminator, start + 1, end + len(terminator) - 1)
+            if found != -1:
+                end = found
+        if end == size and final_newline and end - 1 > start:
+            end -= 1  # '$' also matches before a final newline
+        items.append(text[start:end])
+        pos = find('\\item', end)
+    return items
+
+
+def _replace_enumerate(match: re.Match) -> str:
+    """Numbered plain-text items for an enumerate/itemize environment (the environment body is group 1)."""
+    content = match.group(1)
+    # Replace \item with numbered items
+    items = _split_items(content, _ENV_ITEM_TERMINATORS)
+    result = []
+    for i, item in enumerate(items, 1):
+        cleaned_item = item.strip()
+        # Clean nested formatting, remaining LaTeX commands and braces from the item
+        if '\\' in cleaned_item or '{' in cleaned_item:
+            cleaned_item = _apply_subs(cleaned_item, _LATEX_CLEANUP_PASS)[0].strip()
+        result.append(f"{i}. {cleaned_item}")
+    return '\n'.join(result)
+
+
+@lru_cache(maxsize=128)
+def _clean_todo_list_text(text: str) -> str:
+    """Body of ProfessorFeedbackAgent._clean_todo_list_format (cached: re-runs on an unchanged response skip the regexes)."""
+    # The model is asked for plain text, so most responses have nothing to clean:
+    # each group of substitutions only runs if the characters it needs are present
+
+    # Remove LaTeX enumerate/itemize environments but keep content
+    if '\\begin{' in text:
+        text = _ENUMERATE_OPTIONS_RE.sub(_replace_enumerate, text)
+        text = _ENUMERATE_RE.sub(_replace_enumerate, text)
+        text = _ITEMIZE_RE.sub(_replace_enumerate, text)
+
+    # Remove standalone LaTeX item commands and convert to numbered list
+    if '\\item' in text:
+        items = _split_items(text, _ITEM_TERMINATORS)
+        if items and len(items) > 0:
+            result = []
+            for i, item in enumerate(items, 1):
+                cleaned = item.strip()
+                # Clean formatting and remove other LaTeX commands
+                if '\\' in cleaned:
+                    cleaned = _apply_subs(cleaned, _ITEM_CLEANUP)[0]
+                result.append(f"{i}. {cleaned}")
+            text = '\n'.join(result)
+        else:
+            # Remove LaTeX item commands inline
+            text = _ITEM_COMMAND_RE.sub('\n', text)
+
+    # Remove LaTeX formatting commands (if not already removed) - apply multiple passes
+    if '\\' in text or '{' in text:
+        for _ in range(3):  # Multiple passes to handle nested commands
+            text, changes = _apply_subs(text, _LATEX_CLEANUP_PASS)
+            # A pass that changed nothing would change nothing when repeated
+            if not changes:
+                break
+
+    # Remove LaTeX labels and options
+    if '[label=' in text:
+        text = _LABEL_OPTION_RE.sub('', text)
+    if '\\arabic' in text:
+        text = _ARABIC_STAR_RE.sub('', text)
+        text = _ARABIC_ENUMII_RE.sub('', text)
+
+    # Remove markdown formatting
+    if '*' in text:
+        text = _MD_BOLD_RE.sub(r'\1', text)
+        text = _MD_ITALIC_RE.sub(r'\1', text)
+    if '`' in text:
+        text = _strip_code_backticks(text)
+    if '#' in text:
+        # Drop every run of '#' and the whitespace after it
+        first, *rest = text.split('#')
+        text = first + ''.join([part.lstrip() for part in rest])
+
+    # Clean up extra whitespace and normalize
+    if '\n\n\n' in text:
+        text = _BLANK_LINES_RE.sub('\n\n', text)
+    if '  ' in text or '\t' in text:
+        text = _SPACES_RE.sub(' ', text)
+    if ' \n' in text:
+        text = _SPACE_BEFORE_NEWLINE_RE.sub('\n', text)  # Remove trailing spaces before newlines
+
+    return text.strip()
+
+
+def _strip_code_backticks(text: str) -> str:
+    """Remove the backticks around `code` spans (same result as re.sub(r'`([^`]+)`', r'\1', text))."""
+    parts = text.split('`')
+    result = [parts[0]]
+    i, last = 1, len(parts) - 1
+    while i <= last:
+        # parts[i] follows a backtick: a span if it is not empty and another backtick closes it
+        if parts[i] and i < last:
+            result.append(parts[i])
+            i += 1
+        else:
+            result.append('`')
+        result.append(parts[i])
+        i += 1
+    return ''.join(result)
+
+
+def _missing_sections(paper: Dict[str, str]) -> List[str]:
+    """Standard sections that are not in the paper (section names compared case-insensitively)."""
+    present = frozenset(section_name.lower() for section_name in paper)
+    return [s for s in _STANDARD_SECTIONS if s not in present]
+
+
+@lru_cache(maxsize=256)
+def _word_count(content: str) -> int:
+    """Number of whitespace-separated words (cached: each section is counted by several checks)."""
+    return len(content.split())
 
-# Try to import OpenAI API
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+
+@lru_cache(maxsize=256)
+def _lowercase(content: str) -> str:
+    """Lowercased section text (cached: shared by the section reviewer and the overall checks)."""
+    return content.lower()
+
+
+def _mentions(lc: str, group: str) -> bool:
+    """Whether lowercased text contains any phrase of a _REVIEW_KEYWORDS group."""
+    return any(phrase in lc for phrase in _REVIEW_KEYWORDS[group])
 
 
 class ProfessorFeedbackAgent:
@@ -34,7 +364,9 @@ class ProfessorFeedbackAgent:
                  expertise: str = "General Academic",
                  api_provider: str = "gemini",
                  gemini_api_key: Optional[str] = None,
-                 openai_api_key: Optional[str] = None):
+                 openai_api_key: Optional[str] = None,
+                 prompt_cache: Optional[Any] = None,
+                 stream_output: bool = False):
         """
         Initialize Professor Feedback Agent.
         
@@ -44,11 +376,22 @@ class ProfessorFeedbackAgent:
             api_provider: AI API provider to use ("gemini" or "openai")
             gemini_api_key: Optional Gemini API key. If not provided, will try GEMINI_API_KEY env variable.
             openai_api_key: Optional OpenAI API key. If not provided, will try OPENAI_API_KEY env variable.
+            prompt_cache: Optional tools.PromptCache. A to-do list for heuristics and writing that
+                          were reviewed before is then served from the cache instead of the API.
+            stream_output: Stream to-do lists as they are generated (to <output file>.partial and
+                           on_stream_chunk) instead of waiting for the full response (default: False)
         """
         self.name = name
         self.expertise = expertise
-        self.feedback_history = []
+        # Most recent results only, so a long-running agent does not keep every review in memory
+        self.feedback_history = deque(maxlen=_FEEDBACK_HISTORY_LIMIT)
         self.api_provider = api_provider.lower()
+        self.prompt_cache = prompt_cache
+        self._todo_write_lock = threading.Lock()
+        
+        # Streaming; on_stream_chunk is called with each text chunk
+        self.stream_output = stream_output
+        self.on_stream_chunk: Optional[Callable[[str], None]] = None
         
         # Setup API based on provider
         self.api_model = None
@@ -74,6 +417,7 @@ class ProfessorFeedbackAgent:
             return
         
         try:
+            from google.genai import Client as GenAIClient
             self.api_model = GenAIClient(api_key=self.api_key)
             self.api_available = True
             print(f"✓ Google Gen AI SDK configured for feedback generation")
@@ -94,6 +438,7 @@ class ProfessorFeedbackAgent:
             return
         
         try:
+            import openai
             self.api_model = openai.OpenAI(api_key=self.api_key)
             self.api_available = True
             print(f"✓ OpenAI API configured for feedback generation")
@@ -124,17 +469,21 @@ class ProfessorFeedbackAgent:
             "specific_comments": []
         }
         
+        # Word counts and missing sections are shared by the overall checks
+        total_words = sum(_word_count(content) for content in paper.values())
+        missing_sections = _missing_sections(paper)
+        
         # Overall assessment
-        feedback["overall_assessment"] = self._provide_overall_assessment(paper, topic)
+        feedback["overall_assessment"] = self._provide_overall_assessment(paper, topic, total_words,
+                                                                          missing_sections)
         
         # Review each section
-        for section_name, content in paper.items():
-            section_fb = self.review_section(section_name, content, topic)
-            feedback["section_feedback"][section_name] = section_fb
+        feedback["section_feedback"] = self.review_sections(paper, topic)
         
         # Aggregate feedback
-        feedback["strengths"] = self._identify_overall_strengths(paper, topic)
-        feedback["weaknesses"] = self._identify_overall_weaknesses(paper, topic)
+        feedback["strengths"] = self._identify_overall_strengths(paper, topic, total_words)
+        feedback["weaknesses"] = self._identify_overall_weaknesses(paper, topic, total_words,
+                                                                   missing_sections)
         feedback["suggestions_for_improvement"] = self._generate_improvement_suggestions(paper, style_analysis)
         feedback["grade_estimate"] = self._estimate_grade(feedback, style_analysis)
         feedback["specific_comments"] = self._generate_specific_comments(paper, topic)
@@ -143,6 +492,50 @@ class ProfessorFeedbackAgent:
         
         return feedback
     
+    async def areview_paper(self, paper: Dict[str, str], topic: str,
+                            style_analysis: Optional[Dict] = None) -> Dict:
+        """
+        Async version of review_paper.
+        
+        The section reviews and the paper-level checks are independent, so they run
+        concurrently in worker threads (asyncio.gather) instead of one after another.
+        
+        Args:
+            paper: Dictionary mapping section names to content
+            topic: The research topic
+            style_analysis: Optional style analysis from StyleAnalyzerAgent
+            
+        Returns:
+            Dictionary containing professor feedback (same as review_paper)
+        """
+        total_words = sum(_word_count(content) for content in paper.values())
+        missing_sections = _missing_sections(paper)
+        (section_feedback, overall_assessment, strengths, weaknesses,
+         suggestions, specific_comments) = await asyncio.gather(
+            asyncio.gather(*[asyncio.to_thread(self.review_section, section_name, content, topic)
+                             for section_name, content in paper.items()]),
+            asyncio.to_thread(self._provide_overall_assessment, paper, topic, total_words, missing_sections),
+            asyncio.to_thread(self._identify_overall_strengths, paper, topic, total_words),
+            asyncio.to_thread(self._identify_overall_weaknesses, paper, topic, total_words, missing_sections),
+            asyncio.to_thread(self._generate_improvement_suggestions, paper, style_analysis),
+            asyncio.to_thread(self._generate_specific_comments, paper, topic),
+        )
+        
+        feedback = {
+            "overall_assessment": overall_assessment,
+            "strengths": strengths,
+            "weaknesses": weaknesses,
+            "section_feedback": dict(zip(paper.keys(), section_feedback)),
+            "suggestions_for_improvement": suggestions,
+            "grade_estimate": "",
+            "specific_comments": specific_comments
+        }
+        feedback["grade_estimate"] = self._estimate_grade(feedback, style_analysis)
+        
+        self.feedback_history.append(feedback)
+        
+        return feedback
+    
     def review_section(self, section_name: str, content: str, topic: str) -> Dict:
         """
         Provide feedback on a specific section.
@@ -167,24 +560,34 @@ class ProfessorFeedbackAgent:
         section_feedback["assessment"] = self._assess_section(section_name, content, topic)
         
         # Section-specific checks
-        if section_name.lower() == "introduction":
-            section_feedback.update(self._review_introduction(content, topic))
-        elif section_name.lower() == "methodology":
-            section_feedback.update(self._review_methodology(content, topic))
-        elif section_name.lower() == "results":
-            section_feedback.update(self._review_results(content, topic))
-        elif section_name.lower() == "discussion":
-            section_feedback.update(self._review_discussion(content, topic))
-        elif section_name.lower() == "conclusion":
-            section_feedback.update(self._review_conclusion(content, topic))
+        reviewer = _SECTION_REVIEWERS.get(section_name.lower())
+        if reviewer:
+            section_feedback.update(getattr(self, reviewer)(content, topic))
         else:
             section_feedback.update(self._review_generic_section(section_name, content, topic))
         
         return section_feedback
     
-    def _provide_overall_assessment(self, paper: Dict[str, str], topic: str) -> str:
+    def review_sections(self, paper: Dict[str, str], topic: str) -> Dict[str, Dict]:
+        """
+        Provide feedback on all sections of a paper in one call.
+        
+        Args:
+            paper: Dictionary mapping section names to content
+            topic: The research topic
+            
+        Returns:
+            Dictionary mapping section names to section-specific feedback
+        """
+        return {section_name: self.review_section(section_name, content, topic)
+                for section_name, content in paper.items()}
+    
+    def _provide_overall_assessment(self, paper: Dict[str, str], topic: str,
+                                    total_words: Optional[int] = None,
+                                    missing_sections: Optional[List[str]] = None) -> str:
         """Provide overall assessment of the paper."""
-        total_words = sum(len(content.split()) for content in paper.values())
+        if total_words is None:
+            total_words = sum(_word_count(content) for content in paper.values())
         section_count = len(paper)
         
         assessment = f"""This paper on '{topic}' presents a {section_count}-section investigation. 
@@ -198,9 +601,8 @@ class ProfessorFeedbackAgent:
             assessment += "The paper has an appropriate length for the scope of research. "
         
         # Check for key sections
-        required_sections = ["introduction", "methodology", "results", "discussion", "conclusion"]
-        present_sections = [s.lower() for s in paper.keys()]
-        missing_sections = [s for s in required_sections if s not in present_sections]
+        if missing_sections is None:
+            missing_sections = _missing_sections(paper)
         
         if missing_sections:
             assessment += f"Note that some standard sections are missing: {', '.join(missing_sections)}. "
@@ -211,7 +613,7 @@ class ProfessorFeedbackAgent:
     
     def _assess_section(self, section_name: str, content: str, topic: str) -> str:
         """Assess a specific section."""
-        word_count = len(content.split())
+        word_count = _word_count(content)
         
         assessment = f"The {section_name} section ({word_count} words) "
         
@@ -231,6 +633,7 @@ class ProfessorFeedbackAgent:
     
     def _review_introduction(self, content: str, topic: str) -> Dict:
         """Review introduction section specifically."""
+        lc = _lowercase(content)
         feedback = {
             "strengths": [],
             "weaknesses": [],
@@ -239,8 +642,7 @@ class ProfessorFeedbackAgent:
         }
         
         # Check for research question/hypothesis
-        has_research_q = any(phrase in content.lower() for phrase in 
-                           ['research question', 'objective', 'aim', 'hypothesis', 'purpose'])
+        has_research_q = _mentions(lc, "research_question")
         
         if has_research_q:
             feedback["strengths"].append("The introduction clearly states research objectives")
@@ -249,8 +651,7 @@ class ProfessorFeedbackAgent:
             feedback["recommendations"].append("Add a clear statement of research objectives or hypotheses")
         
         # Check for context/background
-        has_background = any(phrase in content.lower() for phrase in 
-                           ['background', 'context', 'previous research', 'literature'])
+        has_background = _mentions(lc, "background")
         
         if has_background:
             feedback["strengths"].append("Good contextual background is provided")
@@ -259,13 +660,14 @@ class ProfessorFeedbackAgent:
             feedback["recommendations"].append("Include more background information about the topic")
         
         # Check for paper organization
-        if 'organized' in content.lower() or 'structure' in content.lower():
+        if _mentions(lc, "organization"):
             feedback["strengths"].append("The introduction mentions paper organization, which helps readers")
         
         return feedback
     
     def _review_methodology(self, content: str, topic: str) -> Dict:
         """Review methodology section specifically."""
+        lc = _lowercase(content)
         feedback = {
             "strengths": [],
             "weaknesses": [],
@@ -274,8 +676,7 @@ class ProfessorFeedbackAgent:
         }
         
         # Check for research design
-        has_design = any(phrase in content.lower() for phrase in 
-                        ['research design', 'method', 'approach', 'design'])
+        has_design = _mentions(lc, "design")
         
         if has_design:
             feedback["strengths"].append("The methodology describes the research design")
@@ -284,14 +685,14 @@ class ProfessorFeedbackAgent:
             feedback["recommendations"].append("Elaborate on the specific research design and rationale")
         
         # Check for data collection
-        if 'data collection' in content.lower() or 'data' in content.lower():
+        if _mentions(lc, "data"):
             feedback["strengths"].append("Data collection procedures are mentioned")
         else:
             feedback["weaknesses"].append("More detail on data collection would strengthen the methodology")
             feedback["recommendations"].append("Provide more specific details about data collection procedures")
         
         # Check for analysis methods
-        if 'analysis' in content.lower() or 'method' in content.lower():
+        if _mentions(lc, "analysis"):
             feedback["strengths"].append("Analysis methods are discussed")
         else:
             feedback["recommendations"].append("Describe the analytical methods in more detail")
@@ -300,6 +701,7 @@ class ProfessorFeedbackAgent:
     
     def _review_results(self, content: str, topic: str) -> Dict:
         """Review results section specifically."""
+        lc = _lowercase(content)
         feedback = {
             "strengths": [],
             "weaknesses": [],
@@ -308,8 +710,7 @@ class ProfessorFeedbackAgent:
         }
         
         # Check for findings
-        has_findings = any(phrase in content.lower() for phrase in 
-                         ['finding', 'result', 'observed', 'showed', 'demonstrated'])
+        has_findings = _mentions(lc, "findings")
         
         if has_findings:
             feedback["strengths"].append("Findings are clearly presented")
@@ -318,7 +719,7 @@ class ProfessorFeedbackAgent:
             feedback["recommendations"].append("Make findings more explicit and clear")
         
         # Check for statistics
-        if 'statistical' in content.lower() or 'significant' in content.lower():
+        if _mentions(lc, "statistics"):
             feedback["strengths"].append("Statistical analysis is mentioned")
         else:
             feedback["recommendations"].append("Consider including statistical analysis of the results")
@@ -327,6 +728,7 @@ class ProfessorFeedbackAgent:
     
     def _review_discussion(self, content: str, topic: str) -> Dict:
         """Review discussion section specifically."""
+        lc = _lowercase(content)
         feedback = {
             "strengths": [],
             "weaknesses": [],
@@ -335,8 +737,7 @@ class ProfessorFeedbackAgent:
         }
         
         # Check for interpretation
-        has_interpretation = any(phrase in content.lower() for phrase in 
-                               ['interpret', 'suggest', 'indicate', 'imply', 'mean'])
+        has_interpretation = _mentions(lc, "interpretation")
         
         if has_interpretation:
             feedback["strengths"].append("The discussion interprets the findings")
@@ -345,14 +746,13 @@ class ProfessorFeedbackAgent:
             feedback["recommendations"].append("Add more interpretation and explanation of what the findings mean")
         
         # Check for comparison with literature
-        if any(phrase in content.lower() for phrase in 
-               ['previous', 'literature', 'research', 'compare', 'consist']):
+        if _mentions(lc, "literature"):
             feedback["strengths"].append("The discussion relates findings to previous research")
         else:
             feedback["recommendations"].append("Compare findings with previous literature more explicitly")
         
         # Check for implications
-        if 'implication' in content.lower() or 'significance' in content.lower():
+        if _mentions(lc, "implications"):
             feedback["strengths"].append("Implications are discussed")
         else:
             feedback["recommendations"].append("Discuss the implications of your findings")
@@ -361,6 +761,7 @@ class ProfessorFeedbackAgent:
     
     def _review_conclusion(self, content: str, topic: str) -> Dict:
         """Review conclusion section specifically."""
+        lc = _lowercase(content)
         feedback = {
             "strengths": [],
             "weaknesses": [],
@@ -369,8 +770,7 @@ class ProfessorFeedbackAgent:
         }
         
         # Check for summary
-        has_summary = any(phrase in content.lower() for phrase in 
-                        ['summary', 'conclude', 'overall', 'main finding'])
+        has_summary = _mentions(lc, "summary")
         
         if has_summary:
             feedback["strengths"].append("The conclusion summarizes the work")
@@ -379,14 +779,13 @@ class ProfessorFeedbackAgent:
             feedback["recommendations"].append("Provide a clearer summary of key findings and contributions")
         
         # Check for limitations
-        if 'limitation' in content.lower():
+        if _mentions(lc, "limitations"):
             feedback["strengths"].append("The conclusion acknowledges limitations, which shows academic rigor")
         else:
             feedback["recommendations"].append("Consider discussing limitations of the study")
         
         # Check for future work
-        if any(phrase in content.lower() for phrase in 
-               ['future', 'further research', 'recommend', 'next step']):
+        if _mentions(lc, "future_work"):
             feedback["strengths"].append("Future directions are discussed")
         else:
             feedback["recommendations"].append("Suggest directions for future research")
@@ -402,7 +801,7 @@ class ProfessorFeedbackAgent:
             "recommendations": []
         }
         
-        word_count = len(content.split())
+        word_count = _word_count(content)
         
         if word_count >= 150:
             feedback["strengths"].append(f"The {section_name} section has adequate content")
@@ -412,7 +811,8 @@ class ProfessorFeedbackAgent:
         
         return feedback
     
-    def _identify_overall_strengths(self, paper: Dict[str, str], topic: str) -> List[str]:
+    def _identify_overall_strengths(self, paper: Dict[str, str], topic: str,
+                                    total_words: Optional[int] = None) -> List[str]:
         """Identify overall strengths of the paper."""
         strengths = []
         
@@ -421,31 +821,33 @@ class ProfessorFeedbackAgent:
             strengths.append("The paper has a good structure with multiple sections")
         
         # Coverage
-        total_words = sum(len(content.split()) for content in paper.values())
+        if total_words is None:
+            total_words = sum(_word_count(content) for content in paper.values())
         if total_words >= 2000:
             strengths.append("The paper provides comprehensive coverage of the topic")
         
         # Academic tone
-        all_content = " ".join(paper.values())
-        if not any(word in all_content.lower() for word in ['gonna', 'wanna', 'lol', 'omg']):
+        if not any(_mentions(_lowercase(content), "informal") for content in paper.values()):
             strengths.append("The paper maintains an appropriate academic tone throughout")
         
         return strengths
     
-    def _identify_overall_weaknesses(self, paper: Dict[str, str], topic: str) -> List[str]:
+    def _identify_overall_weaknesses(self, paper: Dict[str, str], topic: str,
+                                     total_words: Optional[int] = None,
+                                     missing_sections: Optional[List[str]] = None) -> List[str]:
         """Identify overall weaknesses of the paper."""
         weaknesses = []
         
         # Missing sections
-        standard_sections = ["introduction", "methodology", "results", "discussion", "conclusion"]
-        present_sections = [s.lower() for s in paper.keys()]
-        missing = [s for s in standard_sections if s not in present_sections]
+        if missing_sections is None:
+            missing_sections = _missing_sections(paper)
         
-        if missing:
-            weaknesses.append(f"Missing standard sections: {', '.join(missing)}")
+        if missing_sections:
+            weaknesses.append(f"Missing standard sections: {', '.join(missing_sections)}")
         
         # Length
-        total_words = sum(len(content.split()) for content in paper.values())
+        if total_words is None:
+            total_words = sum(_word_count(content) for content in paper.values())
         if total_words < 1500:
             weaknesses.append("The paper is somewhat brief and could benefit from more depth")
         
@@ -491,22 +893,10 @@ class ProfessorFeedbackAgent:
         score = max(0.5, min(1.0, score))
         
         # Convert to letter grade
-        if score >= 0.93:
-            return "A"
-        elif score >= 0.90:
-            return "A-"
-        elif score >= 0.87:
-            return "B+"
-        elif score >= 0.83:
-            return "B"
-        elif score >= 0.80:
-            return "B-"
-        elif score >= 0.77:
-            return "C+"
-        elif score >= 0.70:
-            return "C"
-        else:
-            return "C- or below (needs significant improvement)"
+        for threshold, grade in _GRADE_TABLE:
+            if score >= threshold:
+                return grade
+        return "C- or below (needs significant improvement)"
     
     def _generate_specific_comments(self, paper: Dict[str, str], topic: str) -> List[str]:
         """Generate specific comments on the paper."""
@@ -537,92 +927,184 @@ class ProfessorFeedbackAgent:
             - todo_list: Generated to-do list
             - output_file: Path to output file
         """
+        heuristics_content, latest_writing = self._load_feedback_inputs(heuristics_file_path,
+                                                                        writinghistory_file_path)
+        
+        # Generate to-do list using AI
+        todo_list = self._cached_todo_list(heuristics_content, latest_writing,
+                                           partial_file=output_file_path + ".partial")
+        
+        return self._save_todo_entry(heuristics_file_path, writinghistory_file_path, output_file_path,
+                                     heuristics_content, latest_writing, todo_list)
+    
+    async def agenerate_feedback_from_files(self, heuristics_file_path: str,
+                                            writinghistory_file_path: str,
+                                            output_file_path: str,
+                                            rate_limiter: Optional[Any] = None) -> Dict:
+        """
+        Async version of generate_feedback_from_files.
+        
+        File I/O and the (blocking) SDK request run in worker threads.
+        
+        Args:
+            heuristics_file_path: Path to text file containing evaluation heuristics
+            writinghistory_file_path: Path to writinghistory.txt containing all writing revisions
+            output_file_path: Path to output file where the to-do list will be saved
+            rate_limiter: Optional tools.RateLimiter that the AI request goes through
+                          (waits for capacity and retries failures)
+        
+        Returns:
+            Dictionary containing feedback (same as generate_feedback_from_files)
+        """
+        heuristics_content, latest_writing = await asyncio.to_thread(
+            self._load_feedback_inputs, heuristics_file_path, writinghistory_file_path)
+        
+        if rate_limiter is None:
+            todo_list = await asyncio.to_thread(self._cached_todo_list, heuristics_content, latest_writing)
+        else:
+            todo_list = await rate_limiter.run(
+                asyncio.to_thread, self._cached_todo_list, heuristics_content, latest_writing,
+                tokens=rate_limiter.estimate_tokens(heuristics_content + latest_writing)
+            )
+        
+        return await asyncio.to_thread(self._save_todo_entry, heuristics_file_path, writinghistory_file_path,
+                                       output_file_path, heuristics_content, latest_writing, todo_list)
+    
+    def generate_feedback_batch(self, jobs: List[Tuple[str, str, str]],
+                                max_concurrent: int = 10,
+                                rpm: int = 500,
+                                tpm: int = 200_000,
+                                max_attempts: int = 5) -> List[Dict]:
+        """
+        Generate to-do lists for several papers concurrently within the provider's rate limits.
+        
+        Blocking entry point for scripts; from inside an event loop, await
+        agenerate_feedback_batch with a RateLimiter instead.
+        
+        Args:
+            jobs: List of (heuristics_file_path, writinghistory_file_path, output_file_path) tuples
+            max_concurrent: Maximum number of requests in flight (default: 10)
+            rpm: Provider requests-per-minute limit (default: 500)
+            tpm: Provider tokens-per-minute limit (default: 200,000)
+            max_attempts: Attempts per request before giving up (default: 5)
+        
+        Returns:
+            List of feedback dictionaries (see generate_feedback_from_files), in the same order as jobs
+        """
+        # Imported here: the tools package imports this module (tools.Professor)
+        from tools.RateLimiter import RateLimiter
+        
+        rate_limiter = RateLimiter(max_concurrent=max_concurrent, rpm=rpm, tpm=tpm,
+                                   max_attempts=max_attempts)
+        return asyncio.run(self.agenerate_feedback_batch(jobs, rate_limiter=rate_limiter))
+    
+    async def agenerate_feedback_batch(self, jobs: List[Tuple[str, str, str]],
+                                       rate_limiter: Optional[Any] = None) -> List[Dict]:
+        """
+        Generate to-do lists for several papers concurrently.
+        
+        Args:
+            jobs: List of (heuristics_file_path, writinghistory_file_path, output_file_path) tuples
+            rate_limiter: Optional tools.RateLimiter that bounds concurrency and request/token rates
+        
+        Returns:
+            List of feedback dictionaries (see generate_feedback_from_files), in the same order as jobs
+        """
+        return await asyncio.gather(*[
+            self.agenerate_feedback_from_files(heuristics_file_path, writinghistory_file_path,
+                                               output_file_path, rate_limiter)
+            for heuristics_file_path, writinghistory_file_path, output_file_path in jobs
+        ])
+    
+    def _load_feedback_inputs(self, heuristics_file_path: str,
+                              writinghistory_file_path: str) -> Tuple[str, str]:
+        """
+        Read the heuristics and the latest writing for generate_feedback_from_files.
+        
+        Returns:
+            Tuple of (heuristics content, latest writing)
+        
+        Raises:
+            ValueError: If the API is not available or an input file is empty
+            FileNotFoundError: If an input file does not exist
+        """
         if not self.api_available:
             raise ValueError(
                 f"API ({self.api_provider}) is not available. "
                 "Please configure the API key or install the required library."
             )
         
-        # Check if input files exist
-        if not os.path.exists(heuristics_file_path):
-            raise FileNotFoundError(f"Heuristics file not found: {heuristics_file_path}")
-        if not os.path.exists(writinghistory_file_path):
-            raise FileNotFoundError(f"Writing history file not found: {writinghistory_file_path}")
-        
-        # Read heuristics file
+        # Read heuristics file (a missing file is reported by open itself)
         try:
             with open(heuristics_file_path, 'r', encoding='utf-8') as f:
                 heuristics_content = f.read()
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"Heuristics file not found: {heuristics_file_path}") from e
         except Exception as e:
             raise IOError(f"Failed to read heuristics file '{heuristics_file_path}': {str(e)}")
         
-        if not heuristics_content.strip():
-            raise ValueError(f"Heuristics file '{heuristics_file_path}' is empty")
-        
-        # Read writing history and extract latest writing
+        # Extract latest writing (first revision in file, since latest is at top)
         try:
-            with open(writinghistory_file_path, 'r', encoding='utf-8') as f:
-                history_content = f.read()
-        except Exception as e:
+            latest_writing = self._read_latest_writing(writinghistory_file_path)
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"Writing history file not found: {writinghistory_file_path}") from e
+        except (OSError, UnicodeDecodeError) as e:
             raise IOError(f"Failed to read writing history file '{writinghistory_file_path}': {str(e)}")
         
-        if not history_content.strip():
+        if not heuristics_content.strip():
+            raise ValueError(f"Heuristics file '{heuristics_file_path}' is empty")
+        if latest_writing is None:
             raise ValueError(f"Writing history file '{writinghistory_file_path}' is empty")
-        
-        # Extract latest writing (first revision in file, since latest is at top)
-        latest_writing = self._extract_latest_writing(history_content)
-        
         if not latest_writing:
             raise ValueError(f"No valid writing found in '{writinghistory_file_path}'")
         
-        # Generate to-do list using AI
-        todo_list = self._generate_todo_list_with_ai(heuristics_content, latest_writing)
-        
-        # Read existing to-do list history if output file exists
-        todo_history = []
-        if os.path.exists(output_file_path):
-            try:
-                with open(output_file_path, 'r', encoding='utf-8') as f:
-                    existing_content = f.read()
-                    # Parse existing history
-                    todo_history = self._parse_todo_history(existing_content)
-            except Exception as e:
-                print(f"Warning: Failed to read existing todo history: {e}. Starting fresh.")
+        return heuristics_content, latest_writing
+    
+    def _save_todo_entry(self, heuristics_file_path: str, writinghistory_file_path: str,
+                         output_file_path: str, heuristics_content: str,
+                         latest_writing: str, todo_list: str) -> Dict:
+        """
+        Append a generated to-do list to the history file and record it in feedback_history
+        (without the inputs, which can be re-read from their files).
         
-        # Create new entry
+        Returns:
+            Dictionary containing feedback (see generate_feedback_from_files)
+        """
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        new_entry = {
-            "timestamp": timestamp,
-            "todo_list": todo_list,
-            "heuristics_file": heuristics_file_path,
-            "writinghistory_file": writinghistory_file_path
-        }
-        
-        # Add new entry at the beginning (latest first)
-        todo_history.insert(0, new_entry)
         
         # Create output directory if it doesn't exist
         output_dir = os.path.dirname(output_file_path)
-        if output_dir and not os.path.exists(output_dir):
+        if output_dir:
             try:
                 os.makedirs(output_dir, exist_ok=True)
             except Exception as e:
                 raise IOError(f"Failed to create output directory '{output_dir}': {str(e)}")
         
-        # Save to-do list history to output file (latest first)
-        try:
-            with open(output_file_path, 'w', encoding='utf-8') as f:
-                for i, entry in enumerate(todo_history):
+        # Append the new entry; it is numbered after the highest existing entry.
+        # The lock keeps concurrent batch jobs that share an output file from reusing a number.
+        with self._todo_write_lock:
+            try:
+                todo_num, ends_with_newline = self._next_todo_number(output_file_path)
+            except FileNotFoundError:
+                todo_num, ends_with_newline = 1, True
+            except Exception as e:
+                print(f"Warning: Failed to read existing todo history: {e}. Numbering from 1.")
+                todo_num, ends_with_newline = 1, True
+            
+            try:
+                with open(output_file_path, 'a', encoding='utf-8') as f:
+                    if not ends_with_newline:
+                        f.write("\n")
                     f.write(f"{'=' * 80}\n")
-                    f.write(f"TODO LIST #{len(todo_history) - i}\n")
-                    f.write(f"Timestamp: {entry['timestamp']}\n")
-                    f.write(f"Heuristics File: {entry['heuristics_file']}\n")
-                    f.write(f"Writing History File: {entry['writinghistory_file']}\n")
+                    f.write(f"TODO LIST #{todo_num}\n")
+                    f.write(f"Timestamp: {timestamp}\n")
+                    f.write(f"Heuristics File: {heuristics_file_path}\n")
+                    f.write(f"Writing History File: {writinghistory_file_path}\n")
                     f.write(f"{'=' * 80}\n\n")
-                    f.write(entry['todo_list'])
+                    f.write(todo_list)
                     f.write("\n\n")
-        except Exception as e:
-            raise IOError(f"Failed to write output file '{output_file_path}': {str(e)}")
+            except Exception as e:
+                raise IOError(f"Failed to write output file '{output_file_path}': {str(e)}")
         
         result = {
             "latest_writing": latest_writing,
@@ -632,46 +1114,39 @@ class ProfessorFeedbackAgent:
             "timestamp": timestamp
         }
         
-        self.feedback_history.append(result)
+        self.feedback_history.append({key: result[key] for key in ("todo_list", "output_file", "timestamp")})
         
         return result
     
-    def _parse_todo_history(self, content: str) -> List[Dict]:
+    def _next_todo_number(self, todo_history_file_path: str, window: int = 4096) -> Tuple[int, bool]:
         """
-        Parse existing to-do list history from output file.
+        Find the number for a new entry of a to-do list history file without reading all of it.
         
-        Format:
-        ================================================================================
-        TODO LIST #N
-        Timestamp: ...
-        Heuristics File: ...
-        Writing History File: ...
-        ================================================================================
+        New entries are appended, so the highest number is in the last entry; files
+        written before that put the latest entry first, so the first entry is checked
+        too. The tail window doubles until it contains an entry header.
         
-        [to-do list content]
-        """
-        history = []
-        # Split by separator blocks (80 equal signs with newlines)
-        pattern = r'={80}\nTODO LIST #(\d+)\nTimestamp:\s*(.+?)\nHeuristics File:\s*(.+?)\nWriting History File:\s*(.+?)\n={80}\n\n(.*?)(?=\n={80}\n|$)'
-        matches = re.finditer(pattern, content, re.DOTALL)
+        Args:
+            todo_history_file_path: Path to to-do list history file
+            window: Initial number of bytes to read from each end (default: 4096)
         
-        for match in matches:
-            todo_num = match.group(1)
-            timestamp = match.group(2).strip()
-            heuristics_file = match.group(3).strip()
-            writinghistory_file = match.group(4).strip()
-            todo_content = match.group(5).strip()
-            
-            if todo_content:
-                history.append({
-                    "todo_num": todo_num,
-                    "timestamp": timestamp,
-                    "heuristics_file": heuristics_file,
-                    "writinghistory_file": writinghistory_file,
-                    "todo_list": todo_content
-                })
+        Returns:
+            Tuple of (next entry number, whether the file is empty or ends with a newline)
+        """
+        with open(todo_history_file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            numbers = _TODO_NUMBER_RE.findall(f.read(window))
+            while size > window:
+                window *= 2
+                f.seek(max(0, size - window))
+                tail = _TODO_NUMBER_RE.findall(f.read())
+                if tail:
+                    numbers += tail
+                    break
+            f.seek(max(0, size - 1))
+            last_byte = f.read(1)
         
-        return history
+        return max((int(n) for n in numbers), default=0) + 1, last_byte in (b"", b"\n")
     
     def get_latest_todo_list(self, todo_history_file_path: str) -> str:
         """
@@ -683,16 +1158,15 @@ class ProfessorFeedbackAgent:
         Returns:
             Latest to-do list content
         """
-        if not os.path.exists(todo_history_file_path):
-            raise FileNotFoundError(f"Todo history file not found: {todo_history_file_path}")
-        
         try:
             with open(todo_history_file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"Todo history file not found: {todo_history_file_path}") from e
         except Exception as e:
             raise IOError(f"Failed to read todo history file '{todo_history_file_path}': {str(e)}")
         
-        # Extract latest (first in file)
+        # Extract latest (highest number)
         latest_data = self._extract_latest_todo_list(content)
         return latest_data.get("todo_list", "") if latest_data else ""
     
@@ -700,19 +1174,32 @@ class ProfessorFeedbackAgent:
         """
         Extract the latest to-do list from history content.
         
+        The latest entry is the one with the highest number: new entries are appended,
+        while older files put the latest entry first.
+        
         Returns:
             Dictionary with 'todo_list', 'timestamp', 'heuristics_file', 'writinghistory_file'
         """
-        # Find the first todo list block (latest is at top)
-        pattern = r'={80}\nTODO LIST #(\d+)\nTimestamp:\s*(.+?)\nHeuristics File:\s*(.+?)\nWriting History File:\s*(.+?)\n={80}\n\n(.*?)(?=\n={80}\n|$)'
-        match = re.search(pattern, content, re.DOTALL)
+        match = None
+        match_end = 0
+        pos = 0
+        while True:
+            header = _TODO_HEADER_RE.search(content, pos)
+            if header is None:
+                break
+            # The body ends at the next separator line (or the end of the file)
+            pos = content.find(_TODO_SEPARATOR, header.end())
+            if pos == -1:
+                pos = len(content)
+            if match is None or int(header.group(1)) > int(match.group(1)):
+                match, match_end = header, pos
         
         if match:
             todo_num = match.group(1)
             timestamp = match.group(2).strip()
             heuristics_file = match.group(3).strip()
             writinghistory_file = match.group(4).strip()
-            todo_list = match.group(5).strip()
+            todo_list = content[match.end():match_end].strip()
             
             return {
                 "todo_num": todo_num,
@@ -739,35 +1226,178 @@ class ProfessorFeedbackAgent:
         
         [text content]
         """
+        # Both the revision blocks and the fallback need a separator line
+        if '=' * 80 not in history_content:
+            return ""
+        
         # Find the first revision block (latest is at top)
-        pattern = r'={80}\n(?:REVISION #\d+\n.*?\n)={80}\n\n(.*?)(?=\n={80}\n|$)'
-        match = re.search(pattern, history_content, re.DOTALL)
+        match = _REVISION_RE.search(history_content)
         
         if match:
             latest_text = match.group(1).strip()
             return latest_text
         
         # Fallback: try to find any content after first separator
-        lines = history_content.split('\n')
-        in_content = False
-        content_lines = []
+        return self._first_block_text(history_content)
+    
+    def _read_latest_writing(self, writinghistory_file_path: str) -> Optional[str]:
+        """
+        Extract the latest writing from a history file without decoding all of it.
+        
+        The file is memory-mapped and searched as bytes, so only the latest revision
+        (or, for files without revision blocks, the text between the first two separators)
+        is decoded. Same result as _extract_latest_writing on the whole file.
+        
+        Args:
+            writinghistory_file_path: Path to writing history file
+            
+        Returns:
+            Latest writing ("" if none is found), or None if the file is empty
+        """
+        with open(writinghistory_file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # Text mode turns \r\n (and \r) into \n, so such files are decoded in full
+                if mm.find(b'\r') != -1:
+                    history_content = mm[:].decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+                    return self._extract_latest_writing(history_content) if history_content.strip() else None
+                
+                if mm.find(b'=' * 80) == -1:
+                    return "" if mm[:].decode('utf-8').strip() else None
+                
+                match = _REVISION_BYTES_RE.search(mm)
+                if match:
+                    return match.group(1).decode('utf-8').strip()
+                
+                latest_text = self._first_block_text(mm)
+                if not latest_text and not mm[:].decode('utf-8').strip():
+                    return None
+                return latest_text
+    
+    def _first_block_text(self, history) -> str:
+        """
+        Text between the first two separator lines of a writing history, without metadata lines.
+        
+        Args:
+            history: History content as str, or as bytes / a memory map (only the block is decoded)
+            
+        Returns:
+            Block text ("" if the history has no separator line)
+        """
+        is_bytes = not isinstance(history, str)
+        separator_re = _SEPARATOR_BYTES_RE if is_bytes else _SEPARATOR_RE
         
-        for line in lines:
+        separators = []
+        for match in separator_re.finditer(history):
+            line = match.group().decode('utf-8') if is_bytes else match.group()
             if line.strip() == '=' * 80:
-                if not in_content:
-                    in_content = True
-                    continue
-                else:
+                separators.append(match)
+                if len(separators) == 2:
                     break
-            if in_content:
-                # Skip metadata lines
-                if not any(marker in line for marker in ['REVISION #', 'Timestamp:', 'Ideas File:', 'Template File:']):
-                    content_lines.append(line)
+        if not separators:
+            return ""
+        
+        # The block starts after the first separator's newline and ends before the second's line
+        start = separators[0].end() + 1
+        end = separators[1].start() - 1 if len(separators) == 2 else len(history)
+        block = history[start:max(start, end)]
+        if is_bytes:
+            block = block.decode('utf-8')
+        return _REVISION_METADATA_LINE_RE.sub('', block).strip()
+    
+    def _cached_todo_list(self, heuristics: str, writing: str,
+                          partial_file: Optional[str] = None) -> str:
+        """
+        Generate a to-do list, reusing the cached one for identical heuristics and writing.
         
-        if content_lines:
-            return '\n'.join(content_lines).strip()
+        Args:
+            heuristics: Heuristics content
+            writing: Latest writing to review
+            partial_file: File that receives the response as it streams in (with stream_output)
+            
+        Returns:
+            Generated (or cached) to-do list
+        """
+        def generate(*_args, **_kwargs) -> str:
+            if self.stream_output:
+                return self._stream_todo_list(heuristics, writing, partial_file)
+            return self._generate_todo_list_with_ai(heuristics, writing)
+        
+        if self.prompt_cache is None:
+            return generate()
+        
+        # The model is fixed per provider, so the provider completes the key
+        return self.prompt_cache.get_or_set(
+            heuristics + "\0" + writing, generate,
+            task="todo_list", provider=self.api_provider
+        )
+    
+    def _stream_todo_list(self, heuristics: str, writing: str,
+                          partial_file: Optional[str] = None) -> str:
+        """
+        Stream a to-do list from the AI.
+        
+        Chunks are written to partial_file (and passed to on_stream_chunk) as they arrive,
+        so progress is visible before the response completes. The partial file is removed
+        once the response is complete; the cleaned list is then appended to the history.
         
-        return ""
+        Args:
+            heuristics: Heuristics content
+            writing: Latest writing to review
+            partial_file: Optional file that receives the raw chunks
+            
+        Returns:
+            Generated to-do list
+        """
+        if self.api_provider == "gemini":
+            stream, api_name = self._stream_todo_with_gemini(heuristics, writing), "Gemini"
+        elif self.api_provider == "openai":
+            stream, api_name = self._stream_todo_with_openai(heuristics, writing), "OpenAI"
+        else:
+            raise ValueError(f"Unsupported API provider: {self.api_provider}")
+        
+        chunks: List[str] = []
+        try:
+            if partial_file:
+                os.makedirs(os.path.dirname(partial_file) or ".", exist_ok=True)
+            with open(partial_file or os.devnull, 'w', encoding='utf-8') as f:
+                for chunk in stream:
+                    f.write(chunk)
+                    f.flush()
+                    chunks.append(chunk)
+                    if self.on_stream_chunk:
+                        self.on_stream_chunk(chunk)
+        except Exception as e:
+            raise RuntimeError(f"Error calling {api_name} API: {str(e)}") from e
+        finally:
+            if partial_file:
+                try:
+                    os.unlink(partial_file)
+                except FileNotFoundError:
+                    pass
+        
+        todo_list = ''.join(chunks).strip()
+        if not todo_list:
+            raise RuntimeError(f"Error calling {api_name} API: Empty response")
+        # Clean up any LaTeX or markdown that might have slipped through
+        return self._clean_todo_list_format(todo_list)
+    
+    def _stream_todo_with_gemini(self, heuristics: str, writing: str) -> Iterator[str]:
+        """Stream to-do list chunks from the Gemini API."""
+        for chunk in self.api_model.models.generate_content_stream(
+            model="gemini-2.5-flash",
+            contents=_todo_prompt(heuristics, writing)
+        ):
+            if chunk and getattr(chunk, 'text', None):
+                yield chunk.text
+    
+    def _stream_todo_with_openai(self, heuristics: str, writing: str) -> Iterator[str]:
+        """Stream to-do list chunks from the OpenAI API."""
+        stream = self.api_model.chat.completions.create(stream=True, **self._openai_todo_request(heuristics, writing))
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
     
     def _generate_todo_list_with_ai(self, heuristics: str, writing: str) -> str:
         """
@@ -789,33 +1419,7 @@ class ProfessorFeedbackAgent:
     
     def _generate_todo_with_gemini(self, heuristics: str, writing: str) -> str:
         """Generate to-do list using Google Gen AI SDK (Gemini API)."""
-        prompt = f"""You are a professor providing feedback on a research paper draft. Based on the evaluation heuristics and the student's writing, generate an actionable to-do list.
-
-EVALUATION HEURISTICS (use these as criteria):
-{heuristics}
-
-STUDENT'S LATEST WRITING (review this text):
-{writing}
-
-INSTRUCTIONS:
-1. Carefully review the student's writing against the provided heuristics
-2. Identify specific areas that need improvement
-3. Generate an actionable to-do list with clear, specific tasks
-4. Format as a PLAIN TEXT numbered list (NOT LaTeX, NOT markdown, just plain text)
-5. Use simple formatting:
-   - Number items like: 1. First item, 2. Second item, etc.
-   - Use plain text only (no LaTeX commands, no markdown, no HTML)
-   - Use simple line breaks between items
-6. Each item should be:
-   - Specific and concrete (not vague)
-   - Actionable (the student can directly work on it)
-   - Prioritized (more important issues first)
-   - Include brief explanations where helpful
-7. Focus on the most critical improvements first
-8. Be constructive and clear
-9. Output ONLY plain text - no formatting codes, no LaTeX, no special characters for formatting
-
-Generate the to-do list in PLAIN TEXT format now:"""
+        prompt = _todo_prompt(heuristics, writing)
 
         try:
             response = self.api_model.models.generate_content(
@@ -831,47 +1435,12 @@ Generate the to-do list in PLAIN TEXT format now:"""
             else:
                 raise ValueError("Empty response from Gemini API")
         except Exception as e:
-            raise RuntimeError(f"Error calling Gemini API: {str(e)}")
+            raise RuntimeError(f"Error calling Gemini API: {str(e)}") from e
     
     def _generate_todo_with_openai(self, heuristics: str, writing: str) -> str:
         """Generate to-do list using OpenAI API."""
-        prompt = f"""You are a professor providing feedback on a research paper draft. Based on the evaluation heuristics and the student's writing, generate an actionable to-do list.
-
-EVALUATION HEURISTICS (use these as criteria):
-{heuristics}
-
-STUDENT'S LATEST WRITING (review this text):
-{writing}
-
-INSTRUCTIONS:
-1. Carefully review the student's writing against the provided heuristics
-2. Identify specific areas that need improvement
-3. Generate an actionable to-do list with clear, specific tasks
-4. Format as a PLAIN TEXT numbered list (NOT LaTeX, NOT markdown, just plain text)
-5. Use simple formatting:
-   - Number items like: 1. First item, 2. Second item, etc.
-   - Use plain text only (no LaTeX commands, no markdown, no HTML)
-   - Use simple line breaks between items
-6. Each item should be:
-   - Specific and concrete (not vague)
-   - Actionable (the student can directly work on it)
-   - Prioritized (more important issues first)
-   - Include brief explanations where helpful
-7. Focus on the most critical improvements first
-8. Be constructive and clear
-9. Output ONLY plain text - no formatting codes, no LaTeX, no special characters for formatting
-
-Generate the to-do list in PLAIN TEXT format now:"""
-
         try:
-            response = self.api_model.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an expert professor providing constructive feedback on academic writing. Always generate clear, actionable to-do lists in PLAIN TEXT format only (no LaTeX, no markdown, no formatting codes)."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7
-            )
+            response = self.api_model.chat.completions.create(**self._openai_todo_request(heuristics, writing))
             
             if response and response.choices:
                 todo_list = response.choices[0].message.content.strip()
@@ -881,7 +1450,20 @@ Generate the to-do list in PLAIN TEXT format now:"""
             else:
                 raise ValueError("Empty response from OpenAI API")
         except Exception as e:
-            raise RuntimeError(f"Error calling OpenAI API: {str(e)}")
+            raise RuntimeError(f"Error calling OpenAI API: {str(e)}") from e
+    
+    def _openai_todo_request(self, heuristics: str, writing: str) -> Dict[str, Any]:
+        """Arguments of the OpenAI chat completion request for a to-do list."""
+        return {
+            "model": "gpt-4",
+            "messages": [
+                {"role": "system", "content": "You are an expert professor providing constructive feedback on academic writing. Always generate clear, actionable to-do lists in PLAIN TEXT format only (no LaTeX, no markdown, no formatting codes)."},
+                {"role": "user", "content": _todo_prompt(heuristics, writing)}
+            ],
+            "temperature": 0.7,
+            # Route requests with the same heuristics together so the cached prefix is reused
+            "extra_body": {"prompt_cache_key": "todo-" + hashlib.sha256(heuristics.encode('utf-8')).hexdigest()[:16]}
+        }
     
     def _clean_todo_list_format(self, text: str) -> str:
         """
@@ -893,75 +1475,5 @@ Generate the to-do list in PLAIN TEXT format now:"""
         Returns:
             Plain text with formatting removed
         """
-        # Remove LaTeX enumerate/itemize environments but keep content
-        # Extract content from enumerate/itemize
-        def replace_enumerate(match):
-            content = match.group(1)
-            # Replace \item with numbered items
-            items = re.findall(r'\\item\s*(.+?)(?=\\item|\\end\{enumerate\}|\\end\{itemize\}|$)', content, re.DOTALL)
-            result = []
-            for i, item in enumerate(items, 1):
-                cleaned_item = item.strip()
-                # Clean nested formatting from item (need to escape backslashes properly)
-                cleaned_item = re.sub(r'\\textbf\{([^}]+)\}', r'\1', cleaned_item)
-                cleaned_item = re.sub(r'\\textit\{([^}]+)\}', r'\1', cleaned_item)
-                cleaned_item = re.sub(r'\\emph\{([^}]+)\}', r'\1', cleaned_item)
-                cleaned_item = re.sub(r'\\textcolor\{[^}]+\}\{([^}]+)\}', r'\1', cleaned_item)
-                # Remove remaining LaTeX commands (more aggressive)
-                cleaned_item = re.sub(r'\\[a-zA-Z]+\*?(\{[^}]*\})?', '', cleaned_item)
-                # Clean up any remaining braces
-                cleaned_item = re.sub(r'\{([^}]+)\}', r'\1', cleaned_item)
-                cleaned_item = cleaned_item.strip()
-                result.append(f"{i}. {cleaned_item}")
-            return '\n'.join(result)
-        
-        text = re.sub(r'\\begin\{enumerate\}.*?\[.*?\].*?\n(.*?)\\end\{enumerate\}', replace_enumerate, text, flags=re.DOTALL)
-        text = re.sub(r'\\begin\{enumerate\}(.*?)\\end\{enumerate\}', replace_enumerate, text, flags=re.DOTALL)
-        text = re.sub(r'\\begin\{itemize\}(.*?)\\end\{itemize\}', replace_enumerate, text, flags=re.DOTALL)
-        
-        # Remove standalone LaTeX item commands and convert to numbered list
-        items = re.findall(r'\\item\s*(.+?)(?=\\item|$)', text, flags=re.DOTALL)
-        if items and len(items) > 0:
-            result = []
-            for i, item in enumerate(items, 1):
-                cleaned = item.strip()
-                # Clean formatting
-                cleaned = re.sub(r'\\textbf\{([^}]+)\}', r'\1', cleaned)
-                cleaned = re.sub(r'\\textit\{([^}]+)\}', r'\1', cleaned)
-                cleaned = re.sub(r'\\emph\{([^}]+)\}', r'\1', cleaned)
-                cleaned = re.sub(r'\\textcolor\{[^}]+\}\{([^}]+)\}', r'\1', cleaned)
-                cleaned = re.sub(r'\\[a-zA-Z]+\{?[^}]*\}?', '', cleaned)  # Remove other LaTeX commands
-                result.append(f"{i}. {cleaned}")
-            text = '\n'.join(result)
-        else:
-            # Remove LaTeX item commands inline
-            text = re.sub(r'\\item\s*', '\n', text)
-        
-        # Remove LaTeX formatting commands (if not already removed) - apply multiple passes
-        for _ in range(3):  # Multiple passes to handle nested commands
-            text = re.sub(r'\\textbf\{([^}]+)\}', r'\1', text)
-            text = re.sub(r'\\textit\{([^}]+)\}', r'\1', text)
-            text = re.sub(r'\\emph\{([^}]+)\}', r'\1', text)
-            text = re.sub(r'\\textcolor\{[^}]+\}\{([^}]+)\}', r'\1', text)
-            text = re.sub(r'\\[a-zA-Z]+\*?(\{[^}]*\})?', '', text)  # Remove other LaTeX commands
-            # Clean up orphaned braces
-            text = re.sub(r'\{([^}]+)\}', r'\1', text)
-        
-        # Remove LaTeX labels and options
-        text = re.sub(r'\[label=[^\]]+\]', '', text)
-        text = re.sub(r'\\arabic\*', '', text)
-        text = re.sub(r'\\arabic\{enumii\}', '', text)
-        
-        # Remove markdown formatting
-        text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
-        text = re.sub(r'\*([^*]+)\*', r'\1', text)
-        text = re.sub(r'`([^`]+)`', r'\1', text)
-        text = re.sub(r'#+\s*', '', text)
-        
-        # Clean up extra whitespace and normalize
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        text = re.sub(r'[ \t]+', ' ', text)
-        text = re.sub(r' \n', '\n', text)  # Remove trailing spaces before newlines
-        
-        return text.strip()
+        return _clean_todo_list_text(text)
 
@@ -607,18 +607,18 @@ Note: The following revisions were made based on feedback: {feedback[:200]}... T
         """
         # Check if it's a history format (has TODO LIST # markers)
         if "TODO LIST #" in content:
-            # Extract ONLY the latest (first) todo list from history
-            # Pattern matches the first occurrence (latest is at top)
+            # Extract ONLY the latest todo list from history
+            # New entries are appended (older files have the latest at the top),
+            # so the latest is the entry with the highest number
             pattern = r'={80}\nTODO LIST #(\d+)\nTimestamp:\s*(.+?)\nHeuristics File:\s*.+?\nWriting History File:\s*.+?\n={80}\n\n(.*?)(?=\n={80}\n|$)'
-            match = re.search(pattern, content, re.DOTALL)
+            matches = list(re.finditer(pattern, content, re.DOTALL))
             
-            if match:
+            if matches:
+                match = max(reversed(matches), key=lambda m: int(m.group(1)))
                 todo_num = match.group(1)
                 timestamp = match.group(2).strip()
                 todo_content = match.group(3).strip()
                 
-                # Verify this is the latest (should be TODO LIST #1 or highest number)
-                # But since latest is at top, first match is always the latest
                 print(f"Using latest to-do list (TODO LIST #{todo_num}, timestamp: {timestamp})")
                 return todo_content
             
@@ -5,22 +5,143 @@ Defaults to Gemini but allows switching between providers.
 """
 
 import os
-from typing import Optional, Dict, Any
+import time
+import asyncio
+import hashlib
+import importlib.util
+import re
+from functools import lru_cache
+from typing import Optional, Dict, Any, Iterator, Tuple
 from abc import ABC, abstractmethod
 
-# Try to import Google Gen AI SDK
+# Check whether the Google Gen AI SDK and the OpenAI API are installed without importing
+# them: the SDKs are imported when a client is created, since importing them takes longer
+# than loading everything else
 try:
-    from google.genai import Client as GenAIClient
-    GEMINI_AVAILABLE = True
+    GEMINI_AVAILABLE = importlib.util.find_spec("google.genai") is not None
 except ImportError:
     GEMINI_AVAILABLE = False
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
 
-# Try to import OpenAI API
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+
+# Words in a provider's error message that point at the structured-output parameters
+_RESPONSE_SCHEMA_ERROR_RE = re.compile(r'response_?format|response_?schema|json_?schema|response_mime_type',
+                                       re.IGNORECASE)
+
+
+class AIProviderError(ValueError):
+    """Error returned by a provider's API (a ValueError, like the wrapper's other errors)."""
+    
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        # HTTP status of the failed request, if the SDK reported one
+        self.status_code = status_code
+
+
+class ResponseSchemaError(AIProviderError):
+    """The provider or model rejected the requested structured output (response_schema)."""
+
+
+def _provider_error(label: str, error: Exception, schema_requested: bool = False) -> AIProviderError:
+    """
+    Wrap an SDK error, keeping its HTTP status.
+    
+    A request with a response_schema whose error is a bad request (or a client-side
+    error without a status) that mentions the structured-output parameters becomes a
+    ResponseSchemaError; rate limits, server errors and timeouts never do.
+    """
+    status = getattr(error, 'status_code', None)
+    if not isinstance(status, int):
+        status = getattr(error, 'code', None)
+    if not isinstance(status, int):
+        status = None
+    
+    message = f"{label} API error: {error}"
+    if schema_requested and status in (None, 400, 422) and _RESPONSE_SCHEMA_ERROR_RE.search(str(error)):
+        return ResponseSchemaError(message, status)
+    return AIProviderError(message, status)
+
+
+# Gemini only creates explicit context caches above a minimum token count (~1024
+# tokens, about 4 characters each); shorter prefixes rely on implicit caching
+_GEMINI_MIN_CACHE_CHARS = 4096
+_GEMINI_CACHE_TTL = 600  # seconds
+# Explicit caches are billed while they live; at most this many are kept per caller
+_GEMINI_MAX_CACHES = 8
+
+
+def gemini_context_cache_name(client: Any, caches: Dict[Tuple[str, str], Tuple[Optional[str], float]],
+                              model: str, contents: str) -> Optional[str]:
+    """
+    Return the name of a Gemini explicit context cache holding contents, creating it if needed.
+    
+    Args:
+        client: google.genai Client
+        caches: Dictionary kept by the caller across requests; maps (model, sha256 of contents)
+                to (cache name or None if creation failed, refresh time)
+        model: Model the cache is created for
+        contents: Text to cache
+        
+    Returns:
+        Cache name, or None if contents is too short to cache, the model is experimental
+        (no explicit caching) or the cache could not be created (the contents are then
+        sent inline until the next refresh)
+    """
+    if len(contents) < _GEMINI_MIN_CACHE_CHARS or model.endswith("-exp"):
+        return None
+    
+    key = (model, hashlib.sha256(contents.encode('utf-8')).hexdigest())
+    now = time.monotonic()
+    cached = caches.get(key)
+    if cached and cached[1] > now:
+        return cached[0]
+    
+    try:
+        cache = client.caches.create(
+            model=model,
+            config={"contents": [contents], "ttl": f"{_GEMINI_CACHE_TTL}s"}
+        )
+        name = cache.name
+    except Exception as e:
+        print(f"Warning: Failed to create Gemini context cache: {e}")
+        name = None
+    
+    # Forget caches the server has expired, then delete the oldest ones over the limit
+    for old_key in [k for k, (_, refresh) in caches.items() if refresh <= now]:
+        del caches[old_key]
+    while len(caches) >= _GEMINI_MAX_CACHES:
+        old_key = next(iter(caches))
+        _delete_gemini_cache(client, caches.pop(old_key)[0])
+    
+    # Refresh shortly before the server-side cache expires
+    caches[key] = (name, now + _GEMINI_CACHE_TTL - 30)
+    return name
+
+
+def _delete_gemini_cache(client: Any, name: Optional[str]) -> None:
+    """Delete a Gemini context cache, ignoring errors (it expires on its own)."""
+    if not name:
+        return
+    try:
+        client.caches.delete(name=name)
+    except Exception as e:
+        print(f"Warning: Failed to delete Gemini context cache: {e}")
+
+
+def delete_gemini_context_caches(client: Any, caches: Dict[Tuple[str, str], Tuple[Optional[str], float]]) -> None:
+    """
+    Delete the context caches created by gemini_context_cache_name and empty caches.
+    
+    Args:
+        client: google.genai Client
+        caches: Dictionary passed to gemini_context_cache_name
+    """
+    now = time.monotonic()
+    for name, refresh in caches.values():
+        # Caches past their refresh time are about to expire anyway
+        if refresh > now:
+            _delete_gemini_cache(client, name)
+    caches.clear()
 
 
 class AIProvider(ABC):
@@ -31,6 +152,14 @@ class AIProvider(ABC):
         """Generate content from a prompt."""
         pass
     
+    async def agenerate_content(self, prompt: str, **kwargs) -> str:
+        """Generate content asynchronously (runs generate_content in a worker thread by default)."""
+        return await asyncio.to_thread(self.generate_content, prompt, **kwargs)
+    
+    def generate_content_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Generate content as a stream of text chunks (a single chunk by default)."""
+        yield self.generate_content(prompt, **kwargs)
+    
     @abstractmethod
     def is_available(self) -> bool:
         """Check if the provider is available."""
@@ -40,10 +169,15 @@ class AIProvider(ABC):
 class GeminiProvider(AIProvider):
     """Gemini API provider."""
     
+    # Model used when a request does not name one
+    default_model = "gemini-2.5-flash"
+    
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
         self.client = None
         self._available = False
+        # (model, sha256 of prefix) -> (cache name or None if creation failed, refresh time)
+        self._context_caches: Dict[Tuple[str, str], Tuple[Optional[str], float]] = {}
         
         if not GEMINI_AVAILABLE:
             print("Warning: google-genai not installed. Install with: pip install google-genai")
@@ -54,6 +188,7 @@ class GeminiProvider(AIProvider):
             return
         
         try:
+            from google.genai import Client as GenAIClient
             self.client = GenAIClient(api_key=self.api_key)
             self._available = True
             print("✓ Gemini API configured")
@@ -61,22 +196,102 @@ class GeminiProvider(AIProvider):
             print(f"Warning: Failed to configure Gemini API: {e}")
             self._available = False
     
-    def generate_content(self, prompt: str, model: str = "gemini-2.5-flash", **kwargs) -> str:
-        """Generate content using Gemini API."""
+    def generate_content(self, prompt: str, model: str = default_model,
+                         response_schema: Optional[Dict[str, Any]] = None,
+                         stable_prefix_chars: int = 0, **kwargs) -> str:
+        """
+        Generate content using Gemini API.
+        
+        If response_schema (a JSON schema dict) is given, the response is constrained
+        to a JSON object matching it. If the first stable_prefix_chars characters of
+        the prompt are long enough, they are stored in an explicit context cache that
+        later requests with the same prefix reuse. Extra keyword arguments (e.g.,
+        prompt_cache_key) are accepted and ignored.
+        """
         if not self._available or not self.client:
             raise ValueError("Gemini API is not available")
         
         try:
+            contents, config = self._request(prompt, model, response_schema, stable_prefix_chars)
             response = self.client.models.generate_content(
                 model=model,
-                contents=prompt
+                contents=contents,
+                config=config
+            )
+            
+            if response and hasattr(response, 'text') and response.text:
+                return response.text.strip()
+            return ""
+        except Exception as e:
+            raise _provider_error("Gemini", e, bool(response_schema)) from e
+    
+    async def agenerate_content(self, prompt: str, model: str = default_model,
+                                response_schema: Optional[Dict[str, Any]] = None,
+                                stable_prefix_chars: int = 0, **kwargs) -> str:
+        """Generate content asynchronously using the Gemini async client."""
+        if not self._available or not self.client:
+            raise ValueError("Gemini API is not available")
+        
+        try:
+            # Context cache creation (rare) uses the sync client, off the event loop
+            contents, config = await asyncio.to_thread(
+                self._request, prompt, model, response_schema, stable_prefix_chars)
+            response = await self.client.aio.models.generate_content(
+                model=model,
+                contents=contents,
+                config=config
             )
             
             if response and hasattr(response, 'text') and response.text:
                 return response.text.strip()
             return ""
         except Exception as e:
-            raise ValueError(f"Gemini API error: {e}")
+            raise _provider_error("Gemini", e, bool(response_schema)) from e
+    
+    def generate_content_stream(self, prompt: str, model: str = default_model,
+                                stable_prefix_chars: int = 0, **kwargs) -> Iterator[str]:
+        """Generate content using Gemini API, yielding text chunks as they arrive."""
+        if not self._available or not self.client:
+            raise ValueError("Gemini API is not available")
+        
+        try:
+            contents, config = self._request(prompt, model, None, stable_prefix_chars)
+            for chunk in self.client.models.generate_content_stream(
+                model=model,
+                contents=contents,
+                config=config
+            ):
+                if chunk and getattr(chunk, 'text', None):
+                    yield chunk.text
+        except Exception as e:
+            raise _provider_error("Gemini", e) from e
+    
+    def _request(self, prompt: str, model: str, response_schema: Optional[Dict[str, Any]],
+                 stable_prefix_chars: int) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Build the contents and generation config for a request.
+        
+        Returns:
+            Tuple of (contents, config); contents omits the prefix when it is served
+            from a context cache
+        """
+        config: Dict[str, Any] = {}
+        if response_schema:
+            config["response_mime_type"] = "application/json"
+            config["response_schema"] = response_schema
+        
+        prefix = prompt[:stable_prefix_chars]
+        if len(prefix) >= _GEMINI_MIN_CACHE_CHARS and stable_prefix_chars < len(prompt):
+            cache_name = self._context_cache_name(model, prefix)
+            if cache_name:
+                config["cached_content"] = cache_name
+                prompt = prompt[stable_prefix_chars:]
+        
+        return prompt, config or None
+    
+    def _context_cache_name(self, model: str, prefix: str) -> Optional[str]:
+        """Return the name of a context cache holding prefix (see gemini_context_cache_name)."""
+        return gemini_context_cache_name(self.client, self._context_caches, model, prefix)
     
     def is_available(self) -> bool:
         """Check if Gemini is available."""
@@ -86,9 +301,14 @@ class GeminiProvider(AIProvider):
 class OpenAIProvider(AIProvider):
     """OpenAI API provider."""
     
+    # Model used when a request does not name one
+    default_model = "gpt-4"
+    
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.client = None
+        # (event loop, AsyncOpenAI client used on it); see _async_client
+        self._async_client_for_loop: Optional[Tuple[asyncio.AbstractEventLoop, Any]] = None
         self._available = False
         
         if not OPENAI_AVAILABLE:
@@ -100,6 +320,7 @@ class OpenAIProvider(AIProvider):
             return
         
         try:
+            import openai
             self.client = openai.OpenAI(api_key=self.api_key)
             self._available = True
             print("✓ OpenAI API configured")
@@ -107,15 +328,17 @@ class OpenAIProvider(AIProvider):
             print(f"Warning: Failed to configure OpenAI API: {e}")
             self._available = False
     
-    def generate_content(self, prompt: str, model: str = "gpt-4", **kwargs) -> str:
+    def generate_content(self, prompt: str, model: str = default_model, **kwargs) -> str:
         """Generate content using OpenAI API."""
         if not self._available or not self.client:
             raise ValueError("OpenAI API is not available")
         
+        schema_requested = bool(kwargs.get("response_schema"))
         try:
+            kwargs = self._with_response_schema(self._with_prompt_cache_key(kwargs))
             response = self.client.chat.completions.create(
                 model=model,
-                messages=[{"role": "user", "content": prompt}],
+                messages=self._messages(prompt, kwargs.pop("stable_prefix_chars", 0)),
                 **kwargs
             )
             
@@ -123,13 +346,119 @@ class OpenAIProvider(AIProvider):
                 return response.choices[0].message.content.strip()
             return ""
         except Exception as e:
-            raise ValueError(f"OpenAI API error: {e}")
+            raise _provider_error("OpenAI", e, schema_requested) from e
+    
+    async def agenerate_content(self, prompt: str, model: str = default_model, **kwargs) -> str:
+        """Generate content asynchronously using the OpenAI async client."""
+        if not self._available or not self.client:
+            raise ValueError("OpenAI API is not available")
+        
+        schema_requested = bool(kwargs.get("response_schema"))
+        try:
+            kwargs = self._with_response_schema(self._with_prompt_cache_key(kwargs))
+            response = await self._async_client().chat.completions.create(
+                model=model,
+                messages=self._messages(prompt, kwargs.pop("stable_prefix_chars", 0)),
+                **kwargs
+            )
+            
+            if response and response.choices and len(response.choices) > 0:
+                return response.choices[0].message.content.strip()
+            return ""
+        except Exception as e:
+            raise _provider_error("OpenAI", e, schema_requested) from e
+    
+    def generate_content_stream(self, prompt: str, model: str = default_model, **kwargs) -> Iterator[str]:
+        """Generate content using OpenAI API, yielding text chunks as they arrive."""
+        if not self._available or not self.client:
+            raise ValueError("OpenAI API is not available")
+        
+        schema_requested = bool(kwargs.get("response_schema"))
+        try:
+            kwargs = self._with_response_schema(self._with_prompt_cache_key(kwargs))
+            stream = self.client.chat.completions.create(
+                model=model,
+                messages=self._messages(prompt, kwargs.pop("stable_prefix_chars", 0)),
+                stream=True,
+                **kwargs
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            raise _provider_error("OpenAI", e, schema_requested) from e
+    
+    def _async_client(self) -> Any:
+        """
+        Return the AsyncOpenAI client for the running event loop, creating it if needed.
+        
+        The client's connection pool is bound to the loop it was first used on, and the
+        batch helpers start a new loop with asyncio.run() per call, so a client from an
+        earlier (closed) loop is replaced instead of reused.
+        """
+        import openai
+        
+        loop = asyncio.get_running_loop()
+        if self._async_client_for_loop is None or self._async_client_for_loop[0] is not loop:
+            self._async_client_for_loop = (loop, openai.AsyncOpenAI(api_key=self.api_key))
+        return self._async_client_for_loop[1]
+    
+    def _messages(self, prompt: str, stable_prefix_chars: int = 0) -> list:
+        """
+        Build the chat messages for a prompt.
+        
+        The stable prefix (fixed instructions and project context) is sent as the
+        system message and the rest as the user message, so the cached prefix is
+        the same message across requests.
+        """
+        if 0 < stable_prefix_chars < len(prompt):
+            return [
+                {"role": "system", "content": prompt[:stable_prefix_chars].rstrip()},
+                {"role": "user", "content": prompt[stable_prefix_chars:]},
+            ]
+        return [{"role": "user", "content": prompt}]
+    
+    def _with_prompt_cache_key(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Move a prompt_cache_key argument into extra_body.
+        
+        OpenAI caches prompt prefixes automatically; the cache key routes requests that
+        share a prefix (e.g., the same project) to the same cache. Passing it through
+        extra_body keeps this working on SDK versions without a dedicated parameter.
+        """
+        cache_key = kwargs.pop("prompt_cache_key", None)
+        if cache_key:
+            extra_body = dict(kwargs.get("extra_body") or {})
+            extra_body["prompt_cache_key"] = cache_key
+            kwargs["extra_body"] = extra_body
+        return kwargs
+    
+    def _with_response_schema(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Turn a response_schema argument (a JSON schema dict) into a strict
+        json_schema response_format.
+        """
+        response_schema = kwargs.pop("response_schema", None)
+        if response_schema:
+            kwargs["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "response",
+                    "schema": dict(response_schema, additionalProperties=False),
+                    "strict": True,
+                },
+            }
+        return kwargs
     
     def is_available(self) -> bool:
         """Check if OpenAI is available."""
         return self._available
 
 
+_PROVIDER_CLASSES = {"gemini": GeminiProvider, "openai": OpenAIProvider}
+_PROVIDER_LABELS = {"gemini": "Gemini", "openai": "OpenAI"}
+
+
 class CloudAIWrapper:
     """Unified wrapper for cloud AI services."""
     
@@ -145,30 +474,43 @@ class CloudAIWrapper:
             openai_api_key: Optional OpenAI API key
         """
         self.provider_name = provider.lower()
-        self.gemini = GeminiProvider(gemini_api_key)
-        self.openai = OpenAIProvider(openai_api_key)
-        
-        # Select provider
-        if self.provider_name == "gemini":
-            if self.gemini.is_available():
-                self.provider = self.gemini
-            elif self.openai.is_available():
-                print("Warning: Gemini not available, falling back to OpenAI")
-                self.provider = self.openai
-                self.provider_name = "openai"
-            else:
-                raise ValueError("No AI provider is available. Please configure API keys.")
-        elif self.provider_name == "openai":
-            if self.openai.is_available():
-                self.provider = self.openai
-            elif self.gemini.is_available():
-                print("Warning: OpenAI not available, falling back to Gemini")
-                self.provider = self.gemini
-                self.provider_name = "gemini"
-            else:
-                raise ValueError("No AI provider is available. Please configure API keys.")
-        else:
+        if self.provider_name not in _PROVIDER_CLASSES:
             raise ValueError(f"Unknown provider: {provider}. Supported: 'gemini', 'openai'")
+        
+        # Providers are created on first use, so the SDK client of a provider that
+        # is never selected (usually the fallback) is not constructed
+        self._api_keys = {"gemini": gemini_api_key, "openai": openai_api_key}
+        self._providers: Dict[str, AIProvider] = {}
+        
+        # Select provider, falling back to the other one if it is not configured
+        fallback_name = "openai" if self.provider_name == "gemini" else "gemini"
+        if self._get_provider(self.provider_name).is_available():
+            self.provider = self._get_provider(self.provider_name)
+        elif self._get_provider(fallback_name).is_available():
+            print(f"Warning: {_PROVIDER_LABELS[self.provider_name]} not available, "
+                  f"falling back to {_PROVIDER_LABELS[fallback_name]}")
+            self.provider = self._get_provider(fallback_name)
+            self.provider_name = fallback_name
+        else:
+            raise ValueError("No AI provider is available. Please configure API keys.")
+    
+    @property
+    def gemini(self) -> "GeminiProvider":
+        """Gemini provider (created on first access)."""
+        return self._get_provider("gemini")
+    
+    @property
+    def openai(self) -> "OpenAIProvider":
+        """OpenAI provider (created on first access)."""
+        return self._get_provider("openai")
+    
+    def _get_provider(self, name: str) -> AIProvider:
+        """Return the provider called name, creating it on first use."""
+        provider = self._providers.get(name)
+        if provider is None:
+            provider = _PROVIDER_CLASSES[name](self._api_keys[name])
+            self._providers[name] = provider
+        return provider
     
     def generate(self, prompt: str, **kwargs) -> str:
         """
@@ -177,12 +519,56 @@ class CloudAIWrapper:
         Args:
             prompt: Input prompt
             **kwargs: Additional arguments for the provider
+                      (e.g., prompt_cache_key to group requests sharing a prompt prefix,
+                      stable_prefix_chars to mark how much of the prompt is shared across
+                      requests, response_schema to request a JSON object matching a schema)
             
         Returns:
             Generated text content
         """
         return self.provider.generate_content(prompt, **kwargs)
     
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        """
+        Generate content asynchronously using the configured provider.
+        
+        Args:
+            prompt: Input prompt
+            **kwargs: Additional arguments for the provider
+            
+        Returns:
+            Generated text content
+        """
+        return await self.provider.agenerate_content(prompt, **kwargs)
+    
+    def generate_structured(self, prompt: str, schema: Dict[str, Any], **kwargs) -> str:
+        """
+        Generate a JSON response constrained to a schema using the provider's
+        native structured output.
+        
+        Args:
+            prompt: Input prompt
+            schema: JSON schema of the expected object (type/properties/required)
+            **kwargs: Additional arguments for the provider
+            
+        Returns:
+            The JSON text of the response
+        """
+        return self.generate(prompt, response_schema=schema, **kwargs)
+    
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """
+        Generate content using the configured provider, yielding text chunks as they arrive.
+        
+        Args:
+            prompt: Input prompt
+            **kwargs: Additional arguments for the provider
+            
+        Returns:
+            Iterator over generated text chunks
+        """
+        return self.provider.generate_content_stream(prompt, **kwargs)
+    
     def switch_provider(self, provider: str):
         """
         Switch to a different provider.
@@ -191,12 +577,9 @@ class CloudAIWrapper:
             provider: "gemini" or "openai"
         """
         provider = provider.lower()
-        if provider == "gemini" and self.gemini.is_available():
-            self.provider = self.gemini
-            self.provider_name = "gemini"
-        elif provider == "openai" and self.openai.is_available():
-            self.provider = self.openai
-            self.provider_name = "openai"
+        if provider in _PROVIDER_CLASSES and self._get_provider(provider).is_available():
+            self.provider = self._get_provider(provider)
+            self.provider_name = provider
         else:
             raise ValueError(f"Cannot switch to {provider}: not available")
     
@@ -207,4 +590,42 @@ class CloudAIWrapper:
     def get_provider(self) -> str:
         """Get the name of the current provider."""
         return self.provider_name
+    
+    def get_model(self) -> str:
+        """Get the model the current provider uses when a request does not name one."""
+        return self.provider.default_model
+
+
+def get_ai_wrapper(provider: str = "gemini",
+                   gemini_api_key: Optional[str] = None,
+                   openai_api_key: Optional[str] = None) -> CloudAIWrapper:
+    """
+    Return a CloudAIWrapper shared by all callers with the same provider and keys.
+    
+    The wrapper's SDK clients keep their HTTP connection pools, so sharing one
+    wrapper lets requests from different Writers reuse open connections instead
+    of setting up a new TLS connection per client. Since the wrapper is shared,
+    switch_provider() on it affects every caller; construct a CloudAIWrapper
+    directly for an independent one.
+    
+    Args:
+        provider: "gemini" or "openai" (default: "gemini")
+        gemini_api_key: Optional Gemini API key (default: GEMINI_API_KEY)
+        openai_api_key: Optional OpenAI API key (default: OPENAI_API_KEY)
+        
+    Returns:
+        Shared CloudAIWrapper
+    """
+    # Resolve the environment here so a changed key yields a new wrapper
+    return _shared_ai_wrapper(
+        provider.lower(),
+        gemini_api_key or os.getenv("GEMINI_API_KEY"),
+        openai_api_key or os.getenv("OPENAI_API_KEY")
+    )
+
 
+@lru_cache(maxsize=None)
+def _shared_ai_wrapper(provider: str, gemini_api_key: Optional[str],
+                       openai_api_key: Optional[str]) -> CloudAIWrapper:
+    """Create the CloudAIWrapper behind get_ai_wrapper (failed constructions are not cached)."""
+    return CloudAIWrapper(provider=provider, gemini_api_key=gemini_api_key, openai_api_key=openai_api_key)
@@ -11,14 +11,46 @@ import sys
 from pathlib import Path
 from typing import Dict, List, Optional
 import re
+import json
+
+# Prefer orjson for the TempMemory.json sidecar when it is installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Handle imports when run as script or module
 try:
-    from .CloudAIWrapper import CloudAIWrapper
+    from .CloudAIWrapper import get_ai_wrapper
 except ImportError:
     # Add parent directory to path when run as script
     sys.path.insert(0, str(Path(__file__).parent.parent))
-    from tools.CloudAIWrapper import CloudAIWrapper
+    from tools.CloudAIWrapper import get_ai_wrapper
+
+# Patterns for cleaning AI-generated summary lines, compiled once at import
+_LIST_NUMBER_RE = re.compile(r'^\d+[\.\)]\s*')
+_LIST_DASH_RE = re.compile(r'^-\s*')
+# Instruction/metadata sentences the model sometimes prepends to the list
+_INSTRUCTION_LINE_RE = re.compile('|'.join([
+    r'^here are \d+',
+    r'^the following are',
+    r'^these are \d+',
+    r'^below are \d+',
+    r'^here are the \d+',
+    r'^the \d+ (most important|diverse|sentences)',
+    r'^these (sentences|are)',
+    r'^following are',
+    r'^extracted (sentences|from)',
+    r'^(these|the) (sentences|following)',
+]))
+
+# A memory file line that is a section header ("===== Name =====") or a list item
+# ("- Item" / "• Item"), ignoring surrounding whitespace on the line
+_MEMORY_LINE_RE = re.compile(
+    r'^[^\S\n]*(?:(={5,9}|=====.*=====)|([•-].*?))[^\S\n]*$',
+    re.MULTILINE
+)
 
 
 class MemoryManager:
@@ -38,9 +70,8 @@ class MemoryManager:
     def _load_global_memory(self):
         """Load global memory from file."""
         if self.global_memory_file.exists():
-            with open(self.global_memory_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                self.global_memory = self._parse_memory_file(content)
+            content = self.global_memory_file.read_text(encoding='utf-8')
+            self.global_memory = self._parse_memory_file(content)
         else:
             # Create default global memory
             self.global_memory = {
@@ -72,21 +103,20 @@ class MemoryManager:
         current_section = None
         current_items = []
         
-        for line in content.split('\n'):
-            line = line.strip()
-            
-            # Check for section header
-            if line.startswith('=====') and line.endswith('====='):
+        # Only header and item lines matter, so one regex pass skips all other lines
+        for match in _MEMORY_LINE_RE.finditer(content):
+            header, item = match.groups()
+            if header is not None:
                 # Save previous section
                 if current_section:
                     sections[current_section] = current_items
                 
                 # Start new section
-                current_section = line.replace('=', '').strip()
+                current_section = header.replace('=', '').strip()
                 current_items = []
-            elif line.startswith('•') or line.startswith('-'):
+            else:
                 # List item (bullet or dash)
-                item = line.lstrip('•- ').strip()
+                item = item.lstrip('•- ').strip()
                 if item:
                     current_items.append(item)
         
@@ -135,9 +165,8 @@ class MemoryManager:
                 "Previous Content": []
             }
         
-        with open(project_memory_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-            parsed = self._parse_memory_file(content)
+        content = project_memory_file.read_text(encoding='utf-8')
+        parsed = self._parse_memory_file(content)
         
         # Ensure only the two required sections are returned
         return {
@@ -177,8 +206,10 @@ class MemoryManager:
                 "Output": []
             }
         
-        with open(temp_memory_file, 'r', encoding='utf-8') as f:
-            content = f.read()
+        # Use the JSON sidecar written by save_temp_memory unless the text file was edited since
+        parsed = self._load_json_sidecar(temp_memory_file)
+        if parsed is None:
+            content = temp_memory_file.read_text(encoding='utf-8')
             parsed = self._parse_memory_file(content)
         
         # Return all sections
@@ -240,6 +271,67 @@ class MemoryManager:
         temp_memory_file = Path(temp_memory_file)
         temp_memory_file.parent.mkdir(parents=True, exist_ok=True)
         
+        with open(temp_memory_file, 'w', encoding='utf-8') as f:
+            f.write(self.format_temp_memory(memory))
+        
+        # Written after the text file so its mtime marks it as up to date
+        with open(self.json_sidecar_path(temp_memory_file), 'wb') as f:
+            f.write(self.dump_memory_json(memory))
+    
+    def json_sidecar_path(self, memory_file: str) -> Path:
+        """
+        Get the JSON sidecar path for a memory file (e.g., TempMemory.txt -> TempMemory.json).
+        
+        The sidecar holds the same sections as the text file and loads without the
+        line parser. The text file stays the human-editable source of truth: the
+        sidecar is only used while it is at least as new as the text file.
+        """
+        return Path(memory_file).with_suffix('.json')
+    
+    def dump_memory_json(self, memory: Dict[str, List[str]]) -> bytes:
+        """
+        Serialize memory sections for the JSON sidecar.
+        
+        Args:
+            memory: Dictionary of memory sections
+            
+        Returns:
+            UTF-8 encoded JSON
+        """
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(memory)
+        return json.dumps(memory, ensure_ascii=False).encode('utf-8')
+    
+    def _load_json_sidecar(self, memory_file: Path) -> Optional[Dict[str, List[str]]]:
+        """
+        Load a memory file's JSON sidecar if it is at least as new as the text file.
+        
+        Returns:
+            Parsed sections, or None if the sidecar is missing, stale, or invalid
+        """
+        sidecar = self.json_sidecar_path(memory_file)
+        try:
+            if sidecar.stat().st_mtime_ns < memory_file.stat().st_mtime_ns:
+                return None
+            data = sidecar.read_bytes()
+            parsed = orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+        except (OSError, ValueError):
+            return None
+        
+        if not isinstance(parsed, dict) or not all(isinstance(v, list) for v in parsed.values()):
+            return None
+        return parsed
+    
+    def format_temp_memory(self, memory: Dict[str, List[str]]) -> str:
+        """
+        Format temp memory as TempMemory.txt content (see save_temp_memory).
+        
+        Args:
+            memory: Dictionary of temp memory sections
+            
+        Returns:
+            File content with all sections in order
+        """
         # Define the sections in order (Writing Context at top, Output at bottom)
         required_sections = [
             "Writing Context",
@@ -251,14 +343,15 @@ class MemoryManager:
             "Output"
         ]
         
-        with open(temp_memory_file, 'w', encoding='utf-8') as f:
-            for section_name in required_sections:
-                items = memory.get(section_name, [])
-                f.write(f"===== {section_name} =====\n")
-                f.write("\n")
-                for item in items:
-                    f.write(f"- {item}\n")
-                f.write("\n")
+        parts = []
+        for section_name in required_sections:
+            items = memory.get(section_name, [])
+            parts.append(f"===== {section_name} =====\n")
+            parts.append("\n")
+            for item in items:
+                parts.append(f"- {item}\n")
+            parts.append("\n")
+        return ''.join(parts)
     
     def get_all_memory(self, project_memory_file: Optional[str] = None,
                       temp_memory_file: Optional[str] = None) -> Dict[str, Dict[str, List[str]]]:
@@ -319,8 +412,8 @@ class MemoryManager:
         if not content.strip():
             return []
         
-        # Initialize AI wrapper
-        ai_wrapper = CloudAIWrapper(
+        # Shared AI wrapper (reuses open connections)
+        ai_wrapper = get_ai_wrapper(
             provider=api_provider,
             gemini_api_key=gemini_api_key,
             openai_api_key=openai_api_key
@@ -350,28 +443,14 @@ Please output exactly 10 sentences, one per line, as a numbered list (1. sentenc
             # Parse the output to extract sentences
             sentences = []
             
-            # Patterns to identify instruction/metadata sentences
-            instruction_patterns = [
-                r'^here are \d+',
-                r'^the following are',
-                r'^these are \d+',
-                r'^below are \d+',
-                r'^here are the \d+',
-                r'^the \d+ (most important|diverse|sentences)',
-                r'^these (sentences|are)',
-                r'^following are',
-                r'^extracted (sentences|from)',
-                r'^(these|the) (sentences|following)',
-            ]
-            
             for line in summary_text.split('\n'):
                 line = line.strip()
                 if not line:
                     continue
                 
                 # Remove numbering (e.g., "1. ", "1)", "- ", etc.)
-                line = re.sub(r'^\d+[\.\)]\s*', '', line)
-                line = re.sub(r'^-\s*', '', line)
+                line = _LIST_NUMBER_RE.sub('', line)
+                line = _LIST_DASH_RE.sub('', line)
                 line = line.strip()
                 
                 # Skip empty or very short lines
@@ -380,7 +459,7 @@ Please output exactly 10 sentences, one per line, as a numbered list (1. sentenc
                 
                 # Check if line is an instruction sentence
                 line_lower = line.lower()
-                is_instruction = any(re.search(pattern, line_lower) for pattern in instruction_patterns)
+                is_instruction = bool(_INSTRUCTION_LINE_RE.search(line_lower))
                 
                 # Skip instruction sentences and lines that seem like metadata
                 if is_instruction:
@@ -4,25 +4,66 @@ Extracts sections from PDF files. Can extract a single section or all sections.
 Saves extracted sections as text files to the extracted_sections folder.
 """
 
+import io
 import os
+import asyncio
 import sys
+import json
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple, Pattern
 import re
 
 # Try to import PDF parsing libraries
+try:
+    import pypdfium2
+    PYPDFIUM2_AVAILABLE = True
+except ImportError:
+    PYPDFIUM2_AVAILABLE = False
+
 try:
     import pdfplumber
     PDFPLUMBER_AVAILABLE = True
 except ImportError:
     PDFPLUMBER_AVAILABLE = False
 
+# Text-only layout device for pdfplumber pages (pdfplumber internals; skipped if they change)
+_TextOnlyAggregator = None
+if PDFPLUMBER_AVAILABLE:
+    try:
+        from pdfplumber.page import PDFPageAggregatorWithMarkedContent
+        from pdfminer.pdfinterp import PDFPageInterpreter
+
+        class _TextOnlyAggregator(PDFPageAggregatorWithMarkedContent):
+            """Layout device that drops paths and images, which contribute no text."""
+
+            def paint_path(self, *args, **kwargs):
+                pass
+
+            def render_image(self, *args, **kwargs):
+                pass
+    except ImportError:
+        _TextOnlyAggregator = None
+
 try:
     import PyPDF2
     PYPDF2_AVAILABLE = True
 except ImportError:
     PYPDF2_AVAILABLE = False
 
+# Handle imports when run as script or module
+try:
+    from .PromptCache import PromptCache
+    from .CloudAIWrapper import gemini_context_cache_name, delete_gemini_context_caches
+except ImportError:
+    # Add parent directory to path when run as script
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from tools.PromptCache import PromptCache
+    from tools.CloudAIWrapper import gemini_context_cache_name, delete_gemini_context_caches
+
 # Try to import Google Gen AI SDK
 try:
     from google.genai import Client as GenAIClient
@@ -31,12 +72,315 @@ except ImportError:
     GEMINI_AVAILABLE = False
 
 
+# Common academic paper section titles; a line holding one of them ends the current section
+_COMMON_SECTION_TITLES = (
+    "Abstract",
+    "Introduction",
+    "Related Work",
+    "Literature Review",
+    "Background",
+    "Methodology",
+    "Methods",
+    "Approach",
+    "Results",
+    "Findings",
+    "Discussion",
+    "Evaluation",
+    "Experiments",
+    "Conclusion",
+    "Conclusions",
+    "Future Work",
+    "Acknowledgments",
+    "References",
+    "Bibliography"
+)
+# (title, lowercase title) pairs, so lookups compare without lowering per call
+_COMMON_SECTION_TITLES_LOWER = tuple((title, title.lower()) for title in _COMMON_SECTION_TITLES)
+
+
+# AI extraction: output token budget per section, and sections requested together
+_SECTION_OUTPUT_TOKENS = 8192
+_MAX_SECTIONS_PER_REQUEST = 4
+
+# AI extraction only sends this many characters of the paper, so parsing stops
+# after the page that reaches it
+_AI_TEXT_BUDGET = 150000
+
+# Sections near the start of a paper are looked for in the first pages only
+_FRONT_MATTER_SECTIONS = {"abstract", "introduction"}
+_FRONT_MATTER_MAX_PAGES = 8
+
+# Documents with at least this many pages to parse are split across worker processes
+_PARALLEL_MIN_PAGES = 20
+_PARALLEL_MAX_WORKERS = 8
+
+# PDFs larger than this are memory-mapped instead of read into memory
+_MMAP_MIN_BYTES = 50 * 1024 * 1024
+
+# pypdfium2 text with a lower share of letters among non-space characters is
+# treated as garbled (e.g., broken font encodings) and parsed again with pdfplumber
+_MIN_LETTER_RATIO = 0.5
+
+# Instructions for AI section extraction. They do not mention the section, so the
+# prompt prefix (instructions + paper text) is the same for every section of a paper.
+_SECTION_EXTRACTION_INSTRUCTIONS = """You are extracting sections from an academic paper. The paper text follows; the sections to extract are named after it.
+
+Rules:
+1. A section header may be plain ("Introduction"), numbered ("1 Introduction", "1. Introduction"), upper case ("INTRODUCTION"), or mid-line ("... 1 INTRODUCTION").
+2. Return the COMPLETE section content, from its first sentence after the header up to the next section header (e.g., "2 RELATED WORK", "2.1", "Background"). Never truncate.
+3. Leave out the header itself, other sections, author information and formatting artifacts.
+4. Undo PDF line wrapping: rejoin hyphenated words ("op-" + "portunities"), merge lines of the same sentence, and keep only real paragraph breaks.
+5. Output only the section text, without any introduction or commentary."""
+
+# What some sections typically contain, added to their extraction query
+_SECTION_CONTENT_HINTS = {
+    "introduction": "Introduction to the topic, background and motivation, problem statement, "
+                    "research objectives, and paper contributions or overview",
+}
+
+
+def _section_query(section_title: str) -> str:
+    """Build the section-specific request that follows the paper text in an extraction prompt."""
+    query = f'Extract the "{section_title}" section.'
+    hint = _SECTION_CONTENT_HINTS.get(section_title.lower())
+    if hint:
+        query += f"\nThe {section_title} section typically contains: {hint}."
+    return query
+
+
+def _sections_query(section_titles: List[str]) -> str:
+    """Build the request for several sections at once, answered as one JSON object."""
+    names = ", ".join(f'"{section_title}"' for section_title in section_titles)
+    query = (f"Extract these sections: {names}. Return a JSON object with one key per section, named exactly "
+             f"as written; each value is the section text, or an empty string if the paper has no such section.")
+    for section_title in section_titles:
+        hint = _SECTION_CONTENT_HINTS.get(section_title.lower())
+        if hint:
+            query += f"\nThe {section_title} section typically contains: {hint}."
+    return query
+
+
+def _parse_sections_response(response_text: str) -> Optional[Dict[str, str]]:
+    """Parse a {section title: content} JSON response; None if it is not such an object."""
+    response_text = response_text.strip()
+    if response_text.startswith('```'):
+        # Remove a surrounding markdown code block
+        lines = response_text.split('\n')
+        response_text = '\n'.join(lines[1:-1] if lines[-1].startswith('```') else lines[1:])
+    try:
+        data = json.loads(response_text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    return {str(key): value for key, value in data.items() if isinstance(value, str)}
+
+
+# Whitespace within one line. The header patterns below run over the whole text
+# with re.MULTILINE, so they must not match across line breaks.
+_WS = r'[^\S\n]'
+
+
+def _header_line_patterns(title: str) -> List[str]:
+    """Patterns for a line holding only the header of a common section."""
+    return [
+        rf'^{_WS}*{re.escape(title)}{_WS}*:?{_WS}*$',
+        rf'^{_WS}*\d+\.?{_WS}*{re.escape(title)}{_WS}*:?{_WS}*$',
+        rf'^{_WS}*\d+\.\d+\.?{_WS}*{re.escape(title)}{_WS}*:?{_WS}*$',
+        rf'^{_WS}*{re.escape(title.upper())}{_WS}*:?{_WS}*$',
+    ]
+
+
+def _alternation(patterns: List[str], flags: int = re.IGNORECASE | re.MULTILINE) -> Pattern:
+    """Compile patterns into one alternation regex."""
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), flags)
+
+
+@lru_cache(maxsize=64)
+def _section_start_re(section_title: str) -> Pattern:
+    """Compile one regex matching any line that is exactly the header of section_title."""
+    title = re.escape(section_title)
+    return _alternation(_header_line_patterns(section_title) + [
+        rf'^{_WS}*\d+\.\d+\.\d+\.?{_WS}*{title}{_WS}*:?{_WS}*$',
+        rf'^{_WS}*\d+\.?{_WS}*{re.escape(section_title.upper())}{_WS}*:?{_WS}*$',
+        rf'^{_WS}*#{1,3}{_WS}*{title}{_WS}*:?{_WS}*$',
+    ])
+
+
+@lru_cache(maxsize=64)
+def _section_end_re(section_title_lower: str) -> Pattern:
+    """
+    Compile one regex matching the header line of any common section other than the given one.
+    
+    Equivalent to the alternation of _header_line_patterns over those titles, but the
+    shared prefix and suffix are factored out so each line start is tried once against
+    a single alternation of the titles instead of once per title and pattern.
+    """
+    titles = '|'.join(re.escape(common_section) for common_section, common_lower in _COMMON_SECTION_TITLES_LOWER
+                      if common_lower != section_title_lower)
+    return re.compile(rf'^{_WS}*(?:\d+(?:\.\d+)?\.?{_WS}*)?(?:{titles}){_WS}*:?{_WS}*$',
+                      re.IGNORECASE | re.MULTILINE)
+
+
+# Numbered heading such as "3 Method" or "3. Method"; checked once a section is a few lines long
+_NUMBERED_HEADING_RE = re.compile(rf'^{_WS}*\d+\.?{_WS}+[A-Z]', re.MULTILINE)
+
+
+@lru_cache(maxsize=64)
+def _section_anywhere_re(section_title: str) -> Pattern:
+    """Compile one regex finding a section_title header anywhere in a line."""
+    return _alternation([
+        rf'\b\d+{_WS}+{re.escape(section_title.upper())}\b',
+        rf'\b\d+\.{_WS}+{re.escape(section_title.upper())}\b',
+        rf'\b\d+{_WS}+{re.escape(section_title)}\b',
+        rf'\b\d+\.{_WS}+{re.escape(section_title)}\b',
+        rf'\b{re.escape(section_title.upper())}\b',
+    ], re.IGNORECASE)
+
+
+@lru_cache(maxsize=64)
+def _compiled_anywhere_patterns(section_title: str) -> Tuple[Pattern, ...]:
+    """Compile the patterns for a section_title header that appears mid-line (tried in order)."""
+    return tuple(re.compile(pattern, re.IGNORECASE) for pattern in [
+        rf'\b\d+\s+{re.escape(section_title.upper())}\b',
+        rf'\b\d+\.\s+{re.escape(section_title.upper())}\b',
+        rf'\b\d+\s+{re.escape(section_title)}\b',
+        rf'\b\d+\.\s+{re.escape(section_title)}\b',
+        rf'\b{re.escape(section_title.upper())}\b',
+    ])
+
+
+@lru_cache(maxsize=64)
+def _compiled_header_removal_patterns(section_title: str) -> Tuple[Pattern, Tuple[Pattern, ...]]:
+    """
+    Compile the patterns that remove the section_title header from extracted content.
+    
+    The header pattern removes, in one pass, what removing every line that starts
+    with the title (^Title.*\n) and then every numbered header line
+    (^\d+\.?\s*Title.*\n) removes: the whitespace of a numbered header may span
+    title lines that the first removal would already have dropped.
+    
+    Returns:
+        Tuple of (header_pattern, first_line_patterns)
+    """
+    title = re.escape(section_title)
+    first_line_patterns = tuple(re.compile(pattern, re.IGNORECASE) for pattern in [
+        rf'.*?\d+\s+{re.escape(section_title.upper())}\s*(.*)$',
+        rf'.*?\d+\.\s+{re.escape(section_title.upper())}\s*(.*)$',
+        rf'.*?{re.escape(section_title.upper())}\s*(.*)$',
+    ])
+    header_pattern = re.compile(rf'^(?:\d+\.?(?:\s|(?<=\n){title}.*?\n)*(?<!\n))?{title}.*?\n',
+                                re.IGNORECASE | re.MULTILINE)
+    return header_pattern, first_line_patterns
+
+
+def _page_text(page) -> Optional[str]:
+    """
+    Extract the text of a pdfplumber page without laying out its graphics.
+    
+    Figure-heavy pages spend most of their parse time turning path operators
+    into line/curve objects; the page layout is built with a device that skips
+    them (and images), then pdfplumber extracts the text from the characters.
+    Falls back to pdfplumber's own layout if its internals are not as expected.
+    
+    Args:
+        page: pdfplumber Page
+        
+    Returns:
+        Page text (None or "" if the page has none)
+    """
+    if _TextOnlyAggregator is not None and not hasattr(page, "_layout"):
+        # Relies on pdfplumber internals (rsrcmgr, laparams, the cached _layout); if they
+        # change, this page is laid out the normal way instead
+        try:
+            device = _TextOnlyAggregator(page.pdf.rsrcmgr, pageno=page.page_number,
+                                         laparams=page.pdf.laparams)
+            PDFPageInterpreter(page.pdf.rsrcmgr, device).process_page(page.page_obj)
+            # Page.layout returns a cached _layout, so extract_text uses this one
+            page._layout = device.get_result()
+        except (AttributeError, TypeError):
+            pass
+    return page.extract_text()
+
+
+def _letter_ratio(text: str) -> float:
+    """Share of letters among the non-whitespace characters of text (0.0 for no text)."""
+    characters = ''.join(text.split())
+    if not characters:
+        return 0.0
+    return sum(character.isalpha() for character in characters) / len(characters)
+
+
+def _parse_pages(pdf_path: str, page_numbers: List[int]) -> List[Optional[str]]:
+    """Extract the text of some pages of a PDF with pdfplumber (process pool worker)."""
+    with pdfplumber.open(pdf_path, pages=page_numbers) as pdf:
+        return [_page_text(page) for page in pdf.pages]
+
+
+@lru_cache(maxsize=32)
+def _ai_cleanup_re(section_title: str) -> Pattern:
+    """
+    Compile the regex that strips AI lead-ins such as "Here is the <title> section:".
+    
+    Each lead-in is removed at most once, in order, from the start of the response.
+    """
+    title = re.escape(section_title)
+    return re.compile(
+        rf'^(?:The\s+{title}\s+section\s+is:?\s*)?'
+        rf'(?:Here\s+is\s+the\s+{title}\s+section:?\s*)?'
+        r'(?:The\s+extracted\s+content:?\s*)?',
+        re.IGNORECASE
+    )
+
+
+def _line_start(text: str, pos: int) -> int:
+    """Offset of the start of the line containing pos."""
+    return text.rfind('\n', 0, pos) + 1
+
+
+def _line_end(text: str, pos: int) -> int:
+    """Offset of the newline ending the line containing pos (len(text) for the last line)."""
+    end = text.find('\n', pos)
+    return len(text) if end == -1 else end
+
+
+def _find_section_end(text: str, start: int, section_title_lower: str) -> int:
+    """
+    Find where the section whose first line starts at start ends.
+    
+    Returns:
+        Start of the line that begins the next section, or len(text) + 1 if the
+        section runs to the end of the text
+    """
+    end = len(text) + 1
+    first_line_end = _line_end(text, start)
+    if first_line_end >= len(text):
+        return end
+    
+    next_header = _section_end_re(section_title_lower).search(text, first_line_end + 1)
+    if next_header is not None:
+        end = _line_start(text, next_header.start())
+    
+    # A short numbered line ("3 Method") also ends the section, from its fifth line on
+    numbered_from = start
+    for _ in range(4):
+        numbered_from = _line_end(text, numbered_from) + 1
+        if numbered_from > len(text):
+            return end
+    for numbered in _NUMBERED_HEADING_RE.finditer(text, numbered_from, end):
+        line_start = _line_start(text, numbered.start())
+        if len(text[line_start:_line_end(text, line_start)].split()) < 10:
+            return line_start
+    return end
+
+
 class PlainTextExtractor:
     """Utility to extract sections from PDF files."""
     
     def __init__(self, output_base_dir: str = "extracted_sections",
                  gemini_api_key: Optional[str] = None,
-                 use_ai: bool = True):
+                 use_ai: bool = True,
+                 use_cache: bool = False):
         """
         Initialize PlainTextExtractor utility.
         
@@ -44,15 +388,28 @@ class PlainTextExtractor:
             output_base_dir: Base directory for extracted sections (default: "extracted_sections")
             gemini_api_key: Optional Gemini API key for AI-powered extraction
             use_ai: Whether to use AI for extraction (default: True)
+            use_cache: Serve sections extracted before (same PDF file, unchanged since) from
+                       <output_base_dir>/.section_cache.sqlite (default: False)
         """
         self.output_base_dir = Path(output_base_dir)
         self.output_base_dir.mkdir(exist_ok=True)
         self.extraction_history = []
         self.use_ai = use_ai
         
+        # Optional persistent cache of extracted sections
+        self.section_cache: Optional[PromptCache] = None
+        if use_cache:
+            self.section_cache = PromptCache(self.output_base_dir / ".section_cache.sqlite")
+        
+        # Text of the most recently parsed PDF: (path, mtime_ns, size) -> {max_pages: text},
+        # so extracting several sections from one PDF parses it once
+        self._text_cache: Tuple[Optional[Tuple[str, int, int]], Dict[Optional[int], str]] = (None, {})
+        
         # Setup AI API if requested
         self.gemini_api_key = gemini_api_key or os.getenv("GEMINI_API_KEY")
         self.gemini_client = None
+        # Explicit context caches of paper texts: (model, sha256) -> (cache name, refresh time)
+        self._context_caches: Dict[Tuple[str, str], Tuple[Optional[str], float]] = {}
         
         if self.use_ai and GEMINI_AVAILABLE and self.gemini_api_key:
             try:
@@ -72,7 +429,7 @@ class PlainTextExtractor:
             self.use_ai = False
         
         # Check if PDF libraries are available
-        if not PDFPLUMBER_AVAILABLE and not PYPDF2_AVAILABLE:
+        if not PYPDFIUM2_AVAILABLE and not PDFPLUMBER_AVAILABLE and not PYPDF2_AVAILABLE:
             print("Warning: No PDF parsing library available. Install pdfplumber or PyPDF2.")
             print("  Install with: pip install pdfplumber  (recommended)")
             print("  Or: pip install PyPDF2")
@@ -113,32 +470,84 @@ class PlainTextExtractor:
             FileNotFoundError: If PDF file doesn't exist
             ValueError: If section not found or extraction fails
         """
+        section_content = self.extract_sections(pdf_path, [section_title]).get(section_title)
+        if not section_content:
+            raise ValueError(f"Section '{section_title}' not found in PDF: {pdf_path}")
+        return section_content
+    
+    def extract_sections(self, pdf_path: str, section_titles: List[str]) -> Dict[str, str]:
+        """
+        Extract several sections from a PDF file, parsing it once.
+        
+        With AI extraction the sections are requested together, up to
+        _MAX_SECTIONS_PER_REQUEST per request, as one JSON object.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            section_titles: Titles of the sections to extract (e.g., ["Introduction", "Related Work"])
+        
+        Returns:
+            Dictionary mapping each section title that was found to its content
+        
+        Raises:
+            FileNotFoundError: If PDF file doesn't exist
+            ValueError: If no text can be extracted from the PDF
+        """
         if not os.path.exists(pdf_path):
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
         
-        # Extract text from PDF
-        text = self._extract_text_from_pdf(pdf_path)
+        section_titles = list(dict.fromkeys(section_titles))
+        use_ai = bool(self.use_ai and self.gemini_client)
+        signature = self._pdf_signature(pdf_path)
         
-        if not text:
-            raise ValueError(f"Failed to extract text from PDF: {pdf_path}")
-        
-        # Extract the specific section (use AI if available)
-        if self.use_ai and self.gemini_client:
-            section_content = self._extract_section_with_ai(text, section_title, pdf_path)
-        else:
-            section_content = self._extract_section_by_title(text, section_title)
+        sections: Dict[str, str] = {}
+        missing: List[str] = []
+        for section_title in section_titles:
+            cached = None
+            if self.section_cache:
+                cached = self.section_cache.get(self._section_cache_key(signature, section_title, use_ai))
+            if cached is None:
+                missing.append(section_title)
+            else:
+                sections[section_title] = cached
         
-        if not section_content:
-            raise ValueError(f"Section '{section_title}' not found in PDF: {pdf_path}")
+        if missing:
+            text = self._text_for_sections(pdf_path, signature, missing,
+                                           char_budget=_AI_TEXT_BUDGET if use_ai else None)
+            if not text:
+                raise ValueError(f"Failed to extract text from PDF: {pdf_path}")
+            
+            # Extract the requested sections (use AI if available)
+            if use_ai:
+                try:
+                    extracted = self._extract_sections_with_ai(text, missing, pdf_path)
+                finally:
+                    # The paper's context caches are billed until deleted
+                    delete_gemini_context_caches(self.gemini_client, self._context_caches)
+            else:
+                extracted = {section_title: self._extract_section_by_title(text, section_title)
+                             for section_title in missing}
+            
+            for section_title in missing:
+                section_content = extracted.get(section_title)
+                if section_content:
+                    sections[section_title] = section_content
+                    if self.section_cache:
+                        self.section_cache.set(self._section_cache_key(signature, section_title, use_ai),
+                                               section_content)
         
-        # Store in history
-        self.extraction_history.append({
-            "pdf_path": pdf_path,
-            "section_title": section_title,
-            "content_length": len(section_content)
-        })
+        # Store in history (in request order)
+        found: Dict[str, str] = {}
+        for section_title in section_titles:
+            if section_title in sections:
+                found[section_title] = sections[section_title]
+                self.extraction_history.append({
+                    "pdf_path": pdf_path,
+                    "section_title": section_title,
+                    "content_length": len(sections[section_title])
+                })
         
-        return section_content
+        return found
     
     def extract_all_sections(self, pdf_path: str, paper_name: Optional[str] = None,
                             gemini_api_key: Optional[str] = None, use_ai: Optional[bool] = None) -> Dict:
@@ -184,39 +593,42 @@ class PlainTextExtractor:
         print(f"Output directory: {paper_dir}")
         print("-" * 60)
         
-        # Extract each section
+        # Extract all sections together (one parse, batched AI requests)
+        try:
+            sections = self.extract_sections(pdf_path, self.section_titles)
+        except ValueError as e:
+            print(f"  ✗ {e}")
+            sections = {}
+        
         for section_title in self.section_titles:
-            try:
-                print(f"\n[{section_num}] Extracting '{section_title}'...")
-                content = self.extract_section(pdf_path, section_title)
+            print(f"\n[{section_num}] Extracting '{section_title}'...")
+            content = sections.get(section_title)
+            
+            if content and len(content.strip()) > 0:
+                # Create filename: 1_abstract.txt, 2_introduction.txt, etc.
+                safe_title = section_title.lower().replace(' ', '_')
+                filename = f"{section_num}_{safe_title}.txt"
+                filepath = paper_dir / filename
                 
-                if content and len(content.strip()) > 0:
-                    # Create filename: 1_abstract.txt, 2_introduction.txt, etc.
-                    safe_title = section_title.lower().replace(' ', '_')
-                    filename = f"{section_num}_{safe_title}.txt"
-                    filepath = paper_dir / filename
-                    
+                try:
                     # Save to file
                     with open(filepath, 'w', encoding='utf-8') as f:
                         f.write(content)
-                    
-                    extracted_files[section_num] = {
-                        'title': section_title,
-                        'file': str(filepath),
-                        'length': len(content)
-                    }
-                    
-                    print(f"  ✓ Saved: {filename} ({len(content)} chars)")
-                    section_num += 1
-                else:
-                    print(f"  - Section not found or empty")
-            except ValueError:
+                except OSError as e:
+                    print(f"  ✗ Error saving '{section_title}': {e}")
+                    continue
+                
+                extracted_files[section_num] = {
+                    'title': section_title,
+                    'file': str(filepath),
+                    'length': len(content)
+                }
+                
+                print(f"  ✓ Saved: {filename} ({len(content)} chars)")
+                section_num += 1
+            else:
                 # Section not found, skip it
                 print(f"  - Section not found")
-                continue
-            except Exception as e:
-                print(f"  ✗ Error extracting '{section_title}': {e}")
-                continue
         
         print(f"\n{'='*60}")
         print(f"Extraction complete! Extracted {len(extracted_files)} sections.")
@@ -224,53 +636,283 @@ class PlainTextExtractor:
         
         return extracted_files
     
-    def _extract_text_from_pdf(self, pdf_path: str) -> str:
+    def extract_section_from_pdfs(self, pdf_paths: List[str], section_title: str,
+                                  max_concurrent: int = 8) -> Dict[str, Optional[str]]:
+        """
+        Extract the same section from several PDF files concurrently.
+        
+        Synchronous entry point for aextract_section_from_pdfs.
+        
+        Args:
+            pdf_paths: Paths to PDF files
+            section_title: Title of the section to extract
+            max_concurrent: Maximum number of PDFs processed at once (default: 8)
+        
+        Returns:
+            Dictionary mapping each PDF path to the section content (None if not extracted)
+        """
+        return asyncio.run(self.aextract_section_from_pdfs(pdf_paths, section_title, max_concurrent))
+    
+    async def aextract_section_from_pdfs(self, pdf_paths: List[str], section_title: str,
+                                         max_concurrent: int = 8) -> Dict[str, Optional[str]]:
+        """
+        Async version of extract_section_from_pdfs.
+        
+        Each PDF goes through extract_section in a worker thread, so the Gemini
+        requests of different PDFs overlap instead of waiting for each other.
+        
+        Args:
+            pdf_paths: Paths to PDF files
+            section_title: Title of the section to extract
+            max_concurrent: Maximum number of PDFs processed at once (default: 8)
+        
+        Returns:
+            Dictionary mapping each PDF path to the section content (None if not extracted)
+        """
+        semaphore = asyncio.Semaphore(max_concurrent)
+        
+        async def extract(pdf_path: str) -> Optional[str]:
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(self.extract_section, pdf_path, section_title)
+                except (FileNotFoundError, ValueError) as e:
+                    print(f"Warning: {e}")
+                    return None
+        
+        results = await asyncio.gather(*[extract(pdf_path) for pdf_path in pdf_paths])
+        return dict(zip(pdf_paths, results))
+    
+    def _pdf_signature(self, pdf_path: str) -> Tuple[str, int, int]:
+        """Identify a PDF file version by (absolute path, mtime_ns, size)."""
+        stat = os.stat(pdf_path)
+        return (os.path.abspath(pdf_path), stat.st_mtime_ns, stat.st_size)
+    
+    def _section_cache_key(self, signature: Tuple[str, int, int], section_title: str, use_ai: bool) -> str:
+        """Key of a section in the persistent section cache."""
+        return f"extract_section\n{signature}\n{section_title}\n{use_ai}"
+    
+    def _text_for_sections(self, pdf_path: str, signature: Tuple[str, int, int],
+                           section_titles: List[str], char_budget: Optional[int] = None) -> str:
+        """
+        Extract the PDF text needed for the given sections.
+        
+        Only the first pages are parsed if all sections are front-matter sections
+        found there (and ending before the last parsed page); otherwise all pages,
+        or as many as needed to reach char_budget characters.
+        """
+        if all(section_title.lower() in _FRONT_MATTER_SECTIONS for section_title in section_titles):
+            text = self._cached_pdf_text(pdf_path, signature, max_pages=_FRONT_MATTER_MAX_PAGES)
+            if all(self._section_ends_within(text, section_title) for section_title in section_titles):
+                return text
+        return self._cached_pdf_text(pdf_path, signature, char_budget=char_budget)
+    
+    def _cached_pdf_text(self, pdf_path: str, signature: Tuple[str, int, int],
+                         max_pages: Optional[int] = None, char_budget: Optional[int] = None) -> str:
+        """
+        Extract text from a PDF file, reusing the text of the previous call for the same file.
+        
+        Args:
+            pdf_path: Path to PDF file
+            signature: _pdf_signature(pdf_path)
+            max_pages: Only parse the first max_pages pages (default: all pages)
+            char_budget: Stop parsing once this many characters are extracted (default: no limit)
+            
+        Returns:
+            Extracted text content
+        """
+        cached_signature, texts = self._text_cache
+        if cached_signature != signature:
+            texts = {}
+            self._text_cache = (signature, texts)
+        # Text extracted without a budget also serves budgeted requests
+        if char_budget is not None and (max_pages, None) in texts:
+            return texts[(max_pages, None)]
+        if (max_pages, char_budget) not in texts:
+            texts[(max_pages, char_budget)] = self._extract_text_from_pdf(
+                pdf_path, max_pages=max_pages, char_budget=char_budget)
+        return texts[(max_pages, char_budget)]
+    
+    def _extract_text_from_pdf(self, pdf_path: str, max_pages: Optional[int] = None,
+                               char_budget: Optional[int] = None) -> str:
         """
         Extract text from a PDF file.
-        Tries pdfplumber first (better), falls back to PyPDF2.
+        Tries pypdfium2 first (fastest), then pdfplumber (better layout handling),
+        then PyPDF2.
         
         Args:
             pdf_path: Path to PDF file
+            max_pages: Only parse the first max_pages pages (default: all pages)
+            char_budget: Stop after the page that brings the text to this many
+                         characters (default: no limit)
             
         Returns:
             Extracted text content
         """
-        # Try pdfplumber first (better text extraction)
-        if PDFPLUMBER_AVAILABLE:
-            try:
-                text = ""
-                with pdfplumber.open(pdf_path) as pdf:
-                    for page in pdf.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n"
-                return text
-            except Exception as e:
-                print(f"Warning: pdfplumber failed: {e}. Trying PyPDF2...")
+        if not PYPDFIUM2_AVAILABLE and not PDFPLUMBER_AVAILABLE and not PYPDF2_AVAILABLE:
+            raise ImportError("No PDF parsing library available. Install pdfplumber or PyPDF2.")
         
-        # Fallback to PyPDF2
-        if PYPDF2_AVAILABLE:
-            try:
-                text = ""
-                with open(pdf_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    for page in pdf_reader.pages:
-                        text += page.extract_text() + "\n"
-                return text
-            except Exception as e:
-                print(f"Error: PyPDF2 failed: {e}")
-                return ""
+        pages = list(range(1, max_pages + 1)) if max_pages is not None else None
+        
+        # Read the file once; all libraries (and the fallbacks) parse the same buffer
+        with open(pdf_path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size >= _MMAP_MIN_BYTES:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                data = file.read()
         
-        raise ImportError("No PDF parsing library available. Install pdfplumber or PyPDF2.")
+        try:
+            # Try pypdfium2 first (C++ parser, much faster)
+            if PYPDFIUM2_AVAILABLE:
+                try:
+                    text = self._extract_text_pdfium(pdf_path, data, max_pages, char_budget)
+                    if _letter_ratio(text) >= _MIN_LETTER_RATIO or not (PDFPLUMBER_AVAILABLE or PYPDF2_AVAILABLE):
+                        return text
+                except Exception as e:
+                    print(f"Warning: pypdfium2 failed: {e}. Trying pdfplumber...")
+            
+            # Then pdfplumber (better text extraction)
+            if PDFPLUMBER_AVAILABLE:
+                try:
+                    # Collect page texts and join once (repeated += copies the text so far)
+                    parts = []
+                    length = 0
+                    with pdfplumber.open(self._pdf_stream(data), pages=pages) as pdf:
+                        page_numbers = [page.page_number for page in pdf.pages]
+                        # Large documents without a budget are parsed in worker processes
+                        if (char_budget is None and len(page_numbers) >= _PARALLEL_MIN_PAGES
+                                and (os.cpu_count() or 1) > 1):
+                            try:
+                                return self._extract_text_parallel(pdf_path, page_numbers)
+                            except Exception as e:
+                                print(f"Warning: Parallel PDF parsing failed: {e}. Parsing pages serially...")
+                        for page in pdf.pages:
+                            page_text = self._extract_page_text(page)
+                            if page_text:
+                                parts.append(page_text + "\n")
+                                length += len(page_text) + 1
+                                if char_budget is not None and length >= char_budget:
+                                    break
+                    return "".join(parts)
+                except Exception as e:
+                    print(f"Warning: pdfplumber failed: {e}. Trying PyPDF2...")
+            
+            # Fallback to PyPDF2
+            if PYPDF2_AVAILABLE:
+                try:
+                    parts = []
+                    length = 0
+                    pdf_reader = PyPDF2.PdfReader(self._pdf_stream(data))
+                    for page in islice(pdf_reader.pages, max_pages):
+                        parts.append(page.extract_text() + "\n")
+                        length += len(parts[-1])
+                        if char_budget is not None and length >= char_budget:
+                            break
+                    return "".join(parts)
+                except Exception as e:
+                    print(f"Error: PyPDF2 failed: {e}")
+                    return ""
+            
+            return ""
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+    
+    def _extract_text_pdfium(self, pdf_path: str, data, max_pages: Optional[int] = None,
+                             char_budget: Optional[int] = None) -> str:
+        """
+        Extract text from a PDF file with pypdfium2.
+        
+        Args:
+            pdf_path: Path to PDF file (opened by PDFium itself if data is a memory map)
+            data: PDF file content (bytes or a memory map)
+            max_pages: Only parse the first max_pages pages (default: all pages)
+            char_budget: Stop after the page that brings the text to this many
+                         characters (default: no limit)
+            
+        Returns:
+            Extracted text content, one line per text line as with pdfplumber
+        """
+        parts = []
+        length = 0
+        pdf = pypdfium2.PdfDocument(pdf_path if isinstance(data, mmap.mmap) else data)
+        try:
+            for index in range(min(len(pdf), max_pages) if max_pages is not None else len(pdf)):
+                page = pdf[index]
+                text_page = page.get_textpage()
+                # PDFium separates lines with CRLF
+                page_text = text_page.get_text_range().replace('\r\n', '\n')
+                text_page.close()
+                page.close()
+                if page_text:
+                    parts.append(page_text + "\n")
+                    length += len(page_text) + 1
+                    if char_budget is not None and length >= char_budget:
+                        break
+        finally:
+            pdf.close()
+        return "".join(parts)
+    
+    def _pdf_stream(self, data):
+        """Return a seekable file object over PDF bytes (or a memory map), positioned at the start."""
+        if isinstance(data, mmap.mmap):
+            data.seek(0)
+            return data
+        return io.BytesIO(data)
     
-    def _extract_section_with_ai(self, text: str, section_title: str, pdf_path: str) -> str:
+    def _extract_page_text(self, page) -> Optional[str]:
+        """Extract the text of a pdfplumber page (see _page_text)."""
+        return _page_text(page)
+    
+    def _extract_text_parallel(self, pdf_path: str, page_numbers: List[int]) -> str:
+        """
+        Extract the text of the given pages with pdfplumber in worker processes.
+        
+        Each worker opens the PDF once and parses a contiguous run of pages.
+        
+        Args:
+            pdf_path: Path to PDF file
+            page_numbers: 1-based page numbers to parse, in order
+            
+        Returns:
+            Extracted text content, as the serial loop would produce it
+        """
+        workers = min(os.cpu_count() or 1, _PARALLEL_MAX_WORKERS)
+        chunk_size = -(-len(page_numbers) // workers)
+        chunks = [page_numbers[start:start + chunk_size]
+                  for start in range(0, len(page_numbers), chunk_size)]
+        
+        with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+            chunk_texts = executor.map(_parse_pages, [pdf_path] * len(chunks), chunks)
+            return "".join(page_text + "\n" for page_texts in chunk_texts
+                           for page_text in page_texts if page_text)
+    
+    def _section_ends_within(self, text: str, section_title: str) -> bool:
+        """
+        Check whether a section is found in text and ends before the end of text.
+        
+        Args:
+            text: Text of the first pages of a PDF
+            section_title: Title of the section
+            
+        Returns:
+            True if the rule-based extractor finds the section followed by more text
+        """
+        content = self._extract_section_by_title(text, section_title)
+        return bool(content) and not text.rstrip().endswith(content[-100:])
+    
+    def _extract_section_with_ai(self, text: str, section_title: str, pdf_path: str,
+                                 cache_context: bool = False) -> str:
         """
         Use AI API to accurately extract a section from the PDF text.
         
+        The response is streamed and stops once the model starts writing the header
+        of another common section, so the tokens past the section are not generated.
+        
         Args:
             text: Full text extracted from PDF
             section_title: Title of the section to extract
             pdf_path: Path to PDF file (for context)
+            cache_context: Whether other requests will reuse the paper text (see _generate_with_paper)
             
         Returns:
             Extracted section content
@@ -278,140 +920,209 @@ class PlainTextExtractor:
         if not self.gemini_client:
             return ""
         
-        # Increase text length for AI analysis (150000 chars for better completeness)
-        max_text_length = 150000
-        text_to_analyze = text[:max_text_length] if len(text) > max_text_length else text
-        
-        prompt = f"""You are analyzing an academic research paper. Extract ONLY the COMPLETE "{section_title}" section content.
-
-The "{section_title}" section header may appear in various formats:
-- "{section_title}"
-- "1 {section_title}" or "1. {section_title}"
-- "{section_title.upper()}"
-- The section header might appear mid-line due to PDF formatting
-
-CRITICAL INSTRUCTIONS:
-1. Find where the {section_title} section STARTS. Look for the section header which may appear:
-   - At the start of a line
-   - Mid-line (e.g., "previous text 1 INTRODUCTION" where "1 INTRODUCTION" is the header)
-   - In various formats and cases
-
-2. Extract ALL content from the {section_title} section starting from the FIRST MEANINGFUL SENTENCE.
-   - If the header appears mid-line, skip everything before "1 INTRODUCTION" or "{section_title.upper()}"
-   - Start from the actual content, not the header
-   - DO NOT truncate - extract the COMPLETE section
-
-3. STOP extracting when you reach the NEXT section. Signs of the next section:
-   - Headers like "Related Work", "Background", "Methodology", "2", "2.1", "2 RELATED WORK", etc.
-   - Numbered sections that are NOT part of {section_title}
-
-4. Do NOT include:
-   - The section header itself (e.g., "1 INTRODUCTION", "INTRODUCTION")
-   - Any content from Abstract or previous sections
-   - Any content from sections that come after {section_title}
-   - Metadata, author information, or formatting artifacts
-
-5. The {section_title} section typically contains:
-   - Introduction to the topic
-   - Background and motivation
-   - Problem statement
-   - Research objectives
-   - Paper contributions or overview
-
-6. **IMPORTANT: Handle text wrapping from PDF extraction:**
-   - The extracted text may have unwanted line breaks in the middle of paragraphs and sentences
-   - Words may be broken across lines (e.g., "research op-" on one line followed by "portunities" on the next)
-   - Sentences may be broken across multiple lines
-   - You must reconstruct proper paragraphs by:
-     a. Joining broken words that are split across line breaks (e.g., "op-" + "portunities" → "opportunities")
-     b. Merging lines that belong to the same sentence (end lines with a hyphen or no punctuation should connect to next line)
-     c. Preserving only intentional paragraph breaks (double newlines or clear paragraph boundaries)
-     d. Ensuring sentences flow naturally without mid-sentence line breaks
-     e. Adding appropriate spacing between sentences within paragraphs
-   - The final output should have clean, readable paragraphs with proper sentence boundaries
+        try:
+            response_text = self._generate_with_models(self._paper_context(text), _section_query(section_title),
+                                                       stop_re=_section_end_re(section_title.lower()),
+                                                       cache_context=cache_context)
+            if response_text:
+                return self._clean_ai_section(response_text, text, section_title)
+        except Exception as e:
+            print(f"Warning: AI extraction failed: {e}")
+            print("  Falling back to rule-based extraction")
+            return self._extract_section_by_title(text, section_title)
+        
+        return ""
+    
+    def _extract_sections_with_ai(self, text: str, section_titles: List[str], pdf_path: str) -> Dict[str, str]:
+        """
+        Use AI API to extract several sections, requested together as one JSON object.
+        
+        Sections are requested in groups of up to _MAX_SECTIONS_PER_REQUEST. If a
+        group's response is not the expected JSON object, its sections are extracted
+        one request at a time instead, as is a single section.
+        
+        Args:
+            text: Full text extracted from PDF
+            section_titles: Titles of the sections to extract
+            pdf_path: Path to PDF file (for context)
+            
+        Returns:
+            Dictionary mapping section titles to extracted content ("" if not found)
+        """
+        if not self.gemini_client:
+            return {}
+        
+        paper_context = self._paper_context(text)
+        # A context cache only pays off if the paper text is sent more than once
+        cache_context = len(section_titles) > _MAX_SECTIONS_PER_REQUEST
+        sections: Dict[str, str] = {}
+        for start in range(0, len(section_titles), _MAX_SECTIONS_PER_REQUEST):
+            batch = section_titles[start:start + _MAX_SECTIONS_PER_REQUEST]
+            if len(batch) == 1:
+                sections[batch[0]] = self._extract_section_with_ai(text, batch[0], pdf_path, cache_context)
+                continue
+            
+            schema = {
+                "type": "object",
+                "properties": {section_title: {"type": "string"} for section_title in batch},
+                "required": batch,
+            }
+            
+            parsed = None
+            try:
+                response_text = self._generate_with_models(
+                    paper_context, _sections_query(batch),
+                    max_output_tokens=_SECTION_OUTPUT_TOKENS * len(batch),
+                    response_schema=schema,
+                    cache_context=cache_context
+                )
+                if response_text:
+                    parsed = _parse_sections_response(response_text)
+            except Exception as e:
+                print(f"Warning: AI extraction failed: {e}")
+            
+            if parsed is None:
+                print("  Extracting the sections one at a time")
+                for section_title in batch:
+                    sections[section_title] = self._extract_section_with_ai(text, section_title, pdf_path,
+                                                                            cache_context=True)
+                continue
+            
+            for section_title in batch:
+                content = parsed.get(section_title, "")
+                sections[section_title] = self._clean_ai_section(content, text, section_title) if content.strip() else ""
+        
+        return sections
+    
+    def _paper_context(self, text: str) -> str:
+        """
+        Build the stable part of an AI extraction prompt: the instructions and the paper text.
+        
+        Everything up to the paper text is the same for every section of a paper, so
+        sibling requests share a long prompt prefix; only the short query differs.
+        """
+        # The text may run past the budget by part of its last page
+        text_to_analyze = text[:_AI_TEXT_BUDGET] if len(text) > _AI_TEXT_BUDGET else text
+        
+        return f"""{_SECTION_EXTRACTION_INSTRUCTIONS}
 
 Here is the paper text:
 
-{text_to_analyze}
-
-Extract and return ONLY the COMPLETE {section_title} section content with proper paragraph formatting.
-- Start from the first meaningful sentence after "1 INTRODUCTION" or "{section_title.upper()}" header.
-- End when the next major section begins (typically "2" or "Related Work" or similar).
-- Fix all text wrapping issues: join broken words, merge sentence fragments, and format as clean paragraphs.
-- DO NOT truncate the content - extract the ENTIRE section."""
-
-        try:
-            # Try gemini-2.0-flash-exp first, then fallback to gemini-2.5-flash
-            model_name = "gemini-2.0-flash-exp"
+{text_to_analyze}"""
+    
+    def _generate_with_models(self, paper_context: str, query: str,
+                              max_output_tokens: int = _SECTION_OUTPUT_TOKENS,
+                              response_schema: Optional[Dict] = None,
+                              stop_re: Optional[Pattern] = None, cache_context: bool = False) -> str:
+        """Send an extraction request, trying gemini-2.0-flash-exp first and then gemini-2.5-flash."""
+        # gemini-2.0-flash-exp cannot produce more than _SECTION_OUTPUT_TOKENS tokens
+        models = ["gemini-2.5-flash"]
+        if max_output_tokens <= _SECTION_OUTPUT_TOKENS:
+            models.insert(0, "gemini-2.0-flash-exp")
+        
+        for model_name in models[:-1]:
             try:
-                response = self.gemini_client.models.generate_content(
-                    model=model_name,
-                    contents=prompt,
-                    config={"max_output_tokens": 8192}
-                )
+                return self._generate_with_paper(model_name, paper_context, query,
+                                                 max_output_tokens, response_schema, stop_re, cache_context)
             except Exception:
-                # Fallback to gemini-2.5-flash
-                model_name = "gemini-2.5-flash"
-                response = self.gemini_client.models.generate_content(
-                    model=model_name,
-                    contents=prompt,
-                    config={"max_output_tokens": 8192}
-                )
+                # Fallback to the next model
+                pass
+        return self._generate_with_paper(models[-1], paper_context, query,
+                                         max_output_tokens, response_schema, stop_re, cache_context)
+    
+    def _clean_ai_section(self, section_content: str, text: str, section_title: str) -> str:
+        """
+        Clean up an AI-extracted section, falling back to rule-based extraction if it is very short.
+        
+        Args:
+            section_content: Section text returned by the AI
+            text: Full text extracted from PDF
+            section_title: Title of the section
             
-            if response and hasattr(response, 'text') and response.text:
-                section_content = response.text.strip()
-                
-                # Clean up any AI-added explanations
-                cleanup_patterns = [
-                    rf'^The\s+{re.escape(section_title)}\s+section\s+is:?\s*',
-                    rf'^Here\s+is\s+the\s+{re.escape(section_title)}\s+section:?\s*',
-                    r'^The\s+extracted\s+content:?\s*',
-                ]
-                for pattern in cleanup_patterns:
-                    section_content = re.sub(pattern, '', section_content, flags=re.IGNORECASE)
-                section_content = section_content.strip()
-                
-                # If result is too short, fallback to rule-based
-                if not section_content or len(section_content) < 100:
-                    print(f"Warning: AI extraction returned very short content ({len(section_content)} chars)")
-                    print("  Falling back to rule-based extraction")
-                    rule_based_content = self._extract_section_by_title(text, section_title)
-                    # Use the longer result
-                    if len(rule_based_content) > len(section_content):
-                        return rule_based_content
-                    return section_content
-                
-                return section_content
-        except Exception as e:
-            print(f"Warning: AI extraction failed: {e}")
+        Returns:
+            Section content
+        """
+        section_content = section_content.strip()
+        
+        # Clean up any AI-added explanations
+        section_content = _ai_cleanup_re(section_title).sub('', section_content, count=1).strip()
+        
+        # If result is too short, fallback to rule-based
+        if not section_content or len(section_content) < 100:
+            print(f"Warning: AI extraction returned very short content ({len(section_content)} chars)")
             print("  Falling back to rule-based extraction")
-            return self._extract_section_by_title(text, section_title)
+            rule_based_content = self._extract_section_by_title(text, section_title)
+            # Use the longer result
+            if len(rule_based_content) > len(section_content):
+                return rule_based_content
         
-        return ""
+        return section_content
+    
+    def _generate_with_paper(self, model: str, paper_context: str, query: str,
+                             max_output_tokens: int = _SECTION_OUTPUT_TOKENS,
+                             response_schema: Optional[Dict] = None,
+                             stop_re: Optional[Pattern] = None, cache_context: bool = False) -> str:
+        """
+        Send a section extraction request to Gemini.
+        
+        The instructions and paper text are the same for every section of a paper, so
+        when several requests share them (cache_context) they are stored in an explicit
+        context cache (once per paper and model; extract_sections deletes it) and only
+        the section query is sent with each request. Otherwise, or if the cache cannot
+        be used, the full prompt is sent inline.
+        
+        Args:
+            model: Gemini model name
+            paper_context: Extraction instructions followed by the paper text
+            query: Section-specific request that follows the paper text
+            max_output_tokens: Output token limit
+            response_schema: Optional JSON schema the response must match
+            stop_re: If given, stream the response and stop at the first complete
+                     line matching this MULTILINE pattern (the line is dropped)
+            cache_context: Whether other requests will reuse paper_context
+            
+        Returns:
+            Response text ("" if empty)
+        """
+        config: Dict[str, object] = {"max_output_tokens": max_output_tokens}
+        if response_schema:
+            config["response_mime_type"] = "application/json"
+            config["response_schema"] = response_schema
+        cache_name = None
+        if cache_context:
+            cache_name = gemini_context_cache_name(self.gemini_client, self._context_caches, model, paper_context)
+        if cache_name:
+            config["cached_content"] = cache_name
+            contents = query
+        else:
+            contents = f"{paper_context}\n\n{query}"
+        
+        if stop_re is None:
+            response = self.gemini_client.models.generate_content(model=model, contents=contents, config=config)
+            return getattr(response, 'text', None) or ""
+        
+        stream = self.gemini_client.models.generate_content_stream(model=model, contents=contents, config=config)
+        parts = []
+        offset = 0
+        pending = ""
+        for chunk in stream:
+            chunk_text = getattr(chunk, 'text', None) or ""
+            parts.append(chunk_text)
+            pending += chunk_text
+            # Only complete lines are checked; the last line may still be growing
+            lines_end = pending.rfind('\n')
+            if lines_end < 0:
+                continue
+            match = stop_re.search(pending, 0, lines_end)
+            if match:
+                return "".join(parts)[:offset + _line_start(pending, match.start())]
+            offset += lines_end + 1
+            pending = pending[lines_end + 1:]
+        return "".join(parts)
     
     def _get_common_section_titles(self) -> List[str]:
         """Get common academic paper section titles."""
-        return [
-            "Abstract",
-            "Introduction",
-            "Related Work",
-            "Literature Review",
-            "Background",
-            "Methodology",
-            "Methods",
-            "Approach",
-            "Results",
-            "Findings",
-            "Discussion",
-            "Evaluation",
-            "Experiments",
-            "Conclusion",
-            "Conclusions",
-            "Future Work",
-            "Acknowledgments",
-            "References",
-            "Bibliography"
-        ]
+        return list(_COMMON_SECTION_TITLES)
     
     def _extract_section_by_title(self, text: str, section_title: str) -> str:
         """
@@ -424,126 +1135,51 @@ Extract and return ONLY the COMPLETE {section_title} section content with proper
         Returns:
             Extracted content of the section as a string, or empty string if not found
         """
-        lines = text.split('\n')
-        
-        # Create patterns to match section headers
-        patterns = [
-            rf'^\s*{re.escape(section_title)}\s*:?\s*$',
-            rf'^\s*\d+\.?\s*{re.escape(section_title)}\s*:?\s*$',
-            rf'^\s*\d+\.\d+\.?\s*{re.escape(section_title)}\s*:?\s*$',
-            rf'^\s*\d+\.\d+\.\d+\.?\s*{re.escape(section_title)}\s*:?\s*$',
-            rf'^\s*{re.escape(section_title.upper())}\s*:?\s*$',
-            rf'^\s*\d+\.?\s*{re.escape(section_title.upper())}\s*:?\s*$',
-            rf'^\s*#{1,3}\s*{re.escape(section_title)}\s*:?\s*$',
-        ]
-        
-        # Find the section header
-        section_start_pos = None
-        for i, line in enumerate(lines):
-            line_stripped = line.strip()
-            for pattern in patterns:
-                if re.match(pattern, line_stripped, re.IGNORECASE):
-                    section_start_pos = i
-                    break
-            if section_start_pos is not None:
-                break
-        
-        # If not found at start of line, search for section title anywhere in the line
-        if section_start_pos is None:
-            anywhere_patterns = [
-                rf'\b\d+\s+{re.escape(section_title.upper())}\b',
-                rf'\b\d+\.\s+{re.escape(section_title.upper())}\b',
-                rf'\b\d+\s+{re.escape(section_title)}\b',
-                rf'\b\d+\.\s+{re.escape(section_title)}\b',
-                rf'\b{re.escape(section_title.upper())}\b',
-            ]
-            
-            for i, line in enumerate(lines):
-                line_stripped = line.strip()
-                for pattern in anywhere_patterns:
-                    match = re.search(pattern, line_stripped, re.IGNORECASE)
-                    if match:
-                        match_end = match.end()
-                        if match_end >= len(line_stripped) - 2:
-                            section_start_pos = i + 1
-                        else:
-                            section_start_pos = i
-                        break
-                if section_start_pos is not None:
+        # Find the section header: the first line that is exactly the header...
+        header = _section_start_re(section_title).search(text)
+        if header is not None:
+            start = _line_start(text, header.start())
+        else:
+            # ...otherwise the first line containing the title (e.g., "... 1 INTRODUCTION")
+            anywhere = _section_anywhere_re(section_title).search(text)
+            if anywhere is None:
+                return ""
+            start = _line_start(text, anywhere.start())
+            line_stripped = text[start:_line_end(text, start)].strip()
+            # The first pattern (in order) that matches decides where the header ends
+            for pattern in _compiled_anywhere_patterns(section_title):
+                match = pattern.search(line_stripped)
+                if match:
+                    if match.end() >= len(line_stripped) - 2:
+                        # Header ends the line: the section starts on the next line
+                        start = _line_end(text, start) + 1
+                        if start > len(text):
+                            return ""
                     break
         
-        if section_start_pos is None:
-            return ""
-        
         # Find the next section or end of document
-        common_sections = self._get_common_section_titles()
-        section_end_pos = len(lines)
+        end = _find_section_end(text, start, section_title.lower())
         
-        for i in range(section_start_pos + 1, len(lines)):
-            line_stripped = lines[i].strip()
-            
-            for common_section in common_sections:
-                if common_section.lower() == section_title.lower():
-                    continue
-                
-                common_patterns = [
-                    rf'^\s*{re.escape(common_section)}\s*:?\s*$',
-                    rf'^\s*\d+\.?\s*{re.escape(common_section)}\s*:?\s*$',
-                    rf'^\s*\d+\.\d+\.?\s*{re.escape(common_section)}\s*:?\s*$',
-                    rf'^\s*{re.escape(common_section.upper())}\s*:?\s*$',
-                ]
-                
-                for pattern in common_patterns:
-                    if re.match(pattern, line_stripped, re.IGNORECASE):
-                        section_end_pos = i
-                        break
-                
-                if section_end_pos < len(lines):
-                    break
-            
-            if section_end_pos < len(lines):
-                break
-            
-            if i > section_start_pos + 3:
-                numbered_pattern = r'^\s*\d+\.?\s+[A-Z]'
-                if re.match(numbered_pattern, line_stripped):
-                    word_count = len(line_stripped.split())
-                    if word_count < 10:
-                        section_end_pos = i
-                        break
-        
-        # Extract section content
-        section_lines = lines[section_start_pos:section_end_pos]
-        section_content = '\n'.join(section_lines).strip()
-        
-        # Remove the header line itself if it appears at the start
-        header_pattern = rf'^{re.escape(section_title)}.*?\n'
-        section_content = re.sub(header_pattern, '', section_content, flags=re.IGNORECASE | re.MULTILINE)
+        # Extract section content (end is the start of the next section's line)
+        raw_content = text[start:end - 1]
+        first_line_end = raw_content.find('\n')
+        first_line = raw_content if first_line_end < 0 else raw_content[:first_line_end]
         
-        numbered_header_pattern = rf'^\d+\.?\s*{re.escape(section_title)}.*?\n'
-        section_content = re.sub(numbered_header_pattern, '', section_content, flags=re.IGNORECASE | re.MULTILINE)
+        header_pattern, first_line_patterns = _compiled_header_removal_patterns(section_title)
         
         # If section title appears mid-line in first line, extract text after it
-        first_line = section_lines[0] if section_lines else ""
-        for pattern in [
-            rf'.*?\d+\s+{re.escape(section_title.upper())}\s*(.*)$',
-            rf'.*?\d+\.\s+{re.escape(section_title.upper())}\s*(.*)$',
-            rf'.*?{re.escape(section_title.upper())}\s*(.*)$',
-        ]:
-            match = re.search(pattern, first_line, re.IGNORECASE)
+        for pattern in first_line_patterns:
+            match = pattern.search(first_line)
             if match:
                 remaining_text = match.group(1).strip()
                 if remaining_text:
-                    section_lines[0] = remaining_text
-                    section_content = '\n'.join(section_lines).strip()
-                else:
-                    if len(section_lines) > 1:
-                        section_content = '\n'.join(section_lines[1:]).strip()
+                    return (remaining_text + raw_content[len(first_line):]).strip()
+                if first_line_end >= 0:
+                    return raw_content[first_line_end + 1:].strip()
                 break
         
-        section_content = section_content.strip()
-        
-        return section_content
+        # Remove the header line itself if it appears at the start
+        return header_pattern.sub('', raw_content.strip()).strip()
     
     def get_extraction_history(self) -> List[Dict]:
         """Get history of all extractions."""
@@ -563,6 +1199,8 @@ def main():
                        help='Base output directory (default: extracted_sections)')
     parser.add_argument('--no-ai', action='store_true',
                        help='Disable AI-powered extraction (use rule-based)')
+    parser.add_argument('--cache', action='store_true',
+                       help='Reuse sections extracted before from the same (unchanged) PDF')
     
     args = parser.parse_args()
     
@@ -570,7 +1208,8 @@ def main():
     api_key = os.getenv("GEMINI_API_KEY") if not args.no_ai else None
     
     # Extract sections
-    extractor = PlainTextExtractor(output_base_dir=args.output_dir, use_ai=not args.no_ai)
+    extractor = PlainTextExtractor(output_base_dir=args.output_dir, use_ai=not args.no_ai,
+                                   use_cache=args.cache)
     try:
         extractor.extract_all_sections(
             pdf_path=args.pdf_path,
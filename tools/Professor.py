@@ -15,7 +15,8 @@ class Professor:
     def __init__(self, global_memory_file: str = "global_memory.txt",
                  api_provider: str = "gemini",
                  gemini_api_key: Optional[str] = None,
-                 openai_api_key: Optional[str] = None):
+                 openai_api_key: Optional[str] = None,
+                 prompt_cache=None):
         """
         Initialize Professor utility.
         
@@ -24,6 +25,7 @@ class Professor:
             api_provider: "gemini" or "openai" (default: "gemini")
             gemini_api_key: Optional Gemini API key
             openai_api_key: Optional OpenAI API key
+            prompt_cache: Optional PromptCache for repeated to-do list requests
         """
         self.global_memory_file = Path(global_memory_file)
         self.professor = ProfessorFeedbackAgent(
@@ -31,7 +33,8 @@ class Professor:
             expertise="Academic Writing",
             api_provider=api_provider,
             gemini_api_key=gemini_api_key,
-            openai_api_key=openai_api_key
+            openai_api_key=openai_api_key,
+            prompt_cache=prompt_cache
         )
     
     def load_global_memory(self) -> str:
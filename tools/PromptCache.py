@@ -0,0 +1,334 @@
+"""
+Prompt Cache
+SQLite-backed response cache for AI requests.
+
+Exact-match lookups are keyed by sha256(prompt) and the generation arguments
+(CachedAIWrapper adds the provider and model). An optional semantic tier
+(requires sentence-transformers) also returns a cached response when a new
+prompt is nearly identical to a cached one.
+
+A separate structural tier remembers source -> result pairs of a fixed
+transformation (e.g., plain text -> LaTeX), per provider and model, so a caller
+can start from the result for the most similar earlier source instead of
+converting from scratch.
+
+Usage:
+    from tools.PromptCache import PromptCache
+
+    cache = PromptCache("projects/MyProject/Intermediate/prompt_cache.sqlite")
+    ai_wrapper = cache.wrap(CloudAIWrapper())
+    text = ai_wrapper.generate(prompt)   # second identical call is served from the cache
+"""
+
+import json
+import math
+import difflib
+import sqlite3
+import hashlib
+import threading
+from array import array
+from pathlib import Path
+from typing import Optional, Callable, Dict, Any, List, Tuple, Union, Iterator
+
+# Try to import sentence-transformers for the optional semantic tier
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+# Keyword arguments that only affect request routing, not the response
+_ROUTING_KWARGS = ("prompt_cache_key", "stable_prefix_chars")
+
+
+class PromptCache:
+    """Exact-match (and optionally semantic) cache of prompt -> response."""
+
+    def __init__(self, db_path: Union[str, Path],
+                 semantic: bool = False,
+                 similarity_threshold: float = 0.97,
+                 embedding_model: str = "all-MiniLM-L6-v2"):
+        """
+        Initialize Prompt Cache.
+
+        Args:
+            db_path: Path to the SQLite database file (created if missing)
+            semantic: Also match near-identical prompts by embedding similarity
+                      (requires sentence-transformers; default: False)
+            similarity_threshold: Minimum cosine similarity for a semantic hit (default: 0.97)
+            embedding_model: sentence-transformers model used for the semantic tier
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.similarity_threshold = similarity_threshold
+        self.embedding_model = embedding_model
+        self._encoder = None
+        self._lock = threading.Lock()
+
+        self.semantic = semantic
+        if semantic and not SENTENCE_TRANSFORMERS_AVAILABLE:
+            print("Warning: sentence-transformers not installed. Semantic caching disabled. Install with: pip install sentence-transformers")
+            self.semantic = False
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, embedding BLOB, "
+            "created_at TEXT DEFAULT CURRENT_TIMESTAMP)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS conversions ("
+            "key TEXT PRIMARY KEY, source TEXT NOT NULL, result TEXT NOT NULL, "
+            "provider TEXT NOT NULL DEFAULT '', model TEXT NOT NULL DEFAULT '', "
+            "created_at TEXT DEFAULT CURRENT_TIMESTAMP)"
+        )
+        # Databases created before conversions were scoped lack these columns; their
+        # rows keep the empty provider and model, so scoped lookups never return them
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(conversions)")}
+        for column in ("provider", "model"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE conversions ADD COLUMN {column} TEXT NOT NULL DEFAULT ''")
+        self._conn.commit()
+
+    def get(self, prompt: str, **kwargs) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            prompt: Prompt text
+            **kwargs: Generation arguments (e.g., model); part of the cache key
+
+        Returns:
+            Cached response, or None on a miss
+        """
+        key = self._make_key(prompt, kwargs)
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        if row:
+            return row[0]
+
+        if self.semantic and not self._generation_kwargs(kwargs):
+            return self._semantic_lookup(prompt)
+        return None
+
+    def set(self, prompt: str, response: str, **kwargs):
+        """
+        Store a response.
+
+        Args:
+            prompt: Prompt text
+            response: Response to cache (empty responses are not stored)
+            **kwargs: Generation arguments (e.g., model); part of the cache key
+        """
+        if not response:
+            return
+
+        key = self._make_key(prompt, kwargs)
+        embedding = None
+        if self.semantic and not self._generation_kwargs(kwargs):
+            embedding = array('f', self._embed(prompt)).tobytes()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, embedding) VALUES (?, ?, ?)",
+                (key, response, embedding)
+            )
+            self._conn.commit()
+
+    def get_or_set(self, prompt: str, generate_fn: Callable[..., str], **kwargs) -> str:
+        """
+        Return the cached response for a prompt, calling generate_fn on a miss.
+
+        Args:
+            prompt: Prompt text
+            generate_fn: Called as generate_fn(prompt, **kwargs) on a cache miss
+            **kwargs: Generation arguments passed to generate_fn
+
+        Returns:
+            Cached or freshly generated response
+        """
+        cached = self.get(prompt, **kwargs)
+        if cached is not None:
+            return cached
+
+        response = generate_fn(prompt, **kwargs)
+        self.set(prompt, response, **kwargs)
+        return response
+
+    def wrap(self, ai_wrapper: Any) -> "CachedAIWrapper":
+        """
+        Wrap a CloudAIWrapper so generate() and agenerate() go through this cache.
+
+        Responses are cached per provider and model, so switching either one
+        does not serve the other's responses.
+
+        Args:
+            ai_wrapper: CloudAIWrapper (or any object with generate/agenerate,
+                        get_provider and get_model)
+
+        Returns:
+            CachedAIWrapper that behaves like ai_wrapper
+        """
+        return CachedAIWrapper(ai_wrapper, self)
+
+    def set_conversion(self, source: str, result: str, provider: str = "", model: str = ""):
+        """
+        Remember the result of converting source (structural tier).
+
+        Args:
+            source: Input of the transformation (e.g., a plain-text paragraph)
+            result: Its converted form (e.g., the LaTeX version); empty results are not stored
+            provider: AI provider that produced result
+            model: Model that produced result
+        """
+        if not source or not result:
+            return
+
+        key = hashlib.sha256(f"{provider}\0{model}\0{source}".encode('utf-8')).hexdigest()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO conversions (key, source, result, provider, model) VALUES (?, ?, ?, ?, ?)",
+                (key, source, result, provider, model)
+            )
+            self._conn.commit()
+
+    def similar_conversion(self, source: str, min_ratio: float = 0.8, limit: int = 50,
+                           provider: str = "", model: str = "") -> Optional[Tuple[str, str]]:
+        """
+        Find the stored conversion whose source is most similar to a new source.
+
+        Args:
+            source: New input of the transformation
+            min_ratio: Minimum difflib similarity ratio for a match (default: 0.8)
+            limit: Number of most recent conversions to compare against (default: 50)
+            provider: Only consider conversions produced by this AI provider
+            model: Only consider conversions produced by this model
+
+        Returns:
+            Tuple of (previous_source, previous_result), or None if nothing is similar enough
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, result FROM conversions WHERE provider = ? AND model = ? "
+                "ORDER BY rowid DESC LIMIT ?",
+                (provider, model, limit)
+            ).fetchall()
+
+        best: Tuple[float, Optional[Tuple[str, str]]] = (min_ratio, None)
+        matcher = difflib.SequenceMatcher(autojunk=False)
+        matcher.set_seq2(source)
+        for previous_source, previous_result in rows:
+            if previous_source == source:
+                return previous_source, previous_result
+            matcher.set_seq1(previous_source)
+            # The quick upper bounds rule out most candidates before the full comparison
+            if matcher.real_quick_ratio() < best[0] or matcher.quick_ratio() < best[0]:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= best[0]:
+                best = (ratio, (previous_source, previous_result))
+        return best[1]
+
+    def clear(self):
+        """Remove all cached responses and conversions."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.execute("DELETE FROM conversions")
+            self._conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _generation_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the kwargs that can change the response (drops routing-only arguments)."""
+        return {k: v for k, v in kwargs.items() if k not in _ROUTING_KWARGS}
+
+    def _make_key(self, prompt: str, kwargs: Dict[str, Any]) -> str:
+        """Build the exact-match key: sha256 of the prompt and its generation arguments."""
+        payload = prompt
+        generation_kwargs = self._generation_kwargs(kwargs)
+        if generation_kwargs:
+            payload += "\0" + json.dumps(generation_kwargs, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _embed(self, text: str) -> List[float]:
+        """Embed text as a unit-length vector (loads the model on first use)."""
+        if self._encoder is None:
+            self._encoder = SentenceTransformer(self.embedding_model)
+        vector = [float(x) for x in self._encoder.encode(text)]
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+    def _semantic_lookup(self, prompt: str) -> Optional[str]:
+        """Return the response of the most similar cached prompt above the threshold."""
+        query = self._embed(prompt)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT response, embedding FROM responses WHERE embedding IS NOT NULL"
+            ).fetchall()
+
+        best: Tuple[float, Optional[str]] = (self.similarity_threshold, None)
+        for response, blob in rows:
+            stored = array('f')
+            stored.frombytes(blob)
+            if len(stored) != len(query):
+                continue
+            similarity = sum(a * b for a, b in zip(query, stored))
+            if similarity >= best[0]:
+                best = (similarity, response)
+        return best[1]
+
+
+class CachedAIWrapper:
+    """CloudAIWrapper proxy whose generate()/agenerate() calls are cached."""
+
+    def __init__(self, ai_wrapper: Any, cache: PromptCache):
+        self.wrapped = ai_wrapper
+        self.cache = cache
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        """Generate content, serving repeated prompts from the cache."""
+        key_kwargs = self._key_kwargs(kwargs)
+        cached = self.cache.get(prompt, **key_kwargs)
+        if cached is not None:
+            return cached
+
+        response = self.wrapped.generate(prompt, **kwargs)
+        self.cache.set(prompt, response, **key_kwargs)
+        return response
+
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        """Async version of generate."""
+        key_kwargs = self._key_kwargs(kwargs)
+        cached = self.cache.get(prompt, **key_kwargs)
+        if cached is not None:
+            return cached
+
+        response = await self.wrapped.agenerate(prompt, **kwargs)
+        self.cache.set(prompt, response, **key_kwargs)
+        return response
+
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Stream content; a cached response is yielded as a single chunk."""
+        key_kwargs = self._key_kwargs(kwargs)
+        cached = self.cache.get(prompt, **key_kwargs)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
+        for chunk in self.wrapped.generate_stream(prompt, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+        self.cache.set(prompt, ''.join(chunks).strip(), **key_kwargs)
+
+    def _key_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the cache key arguments: the request's kwargs plus the provider and model serving it."""
+        return dict(kwargs, provider=self.wrapped.get_provider(),
+                    model=kwargs.get("model") or self.wrapped.get_model())
+
+    def __getattr__(self, name: str):
+        # Everything else (switch_provider, get_provider, ...) goes to the wrapped object
+        return getattr(self.wrapped, name)
@@ -0,0 +1,192 @@
+"""
+Rate Limiter
+Keeps concurrent async AI requests under a provider's request and token limits.
+
+Requests draw from two leaky buckets (requests per minute and tokens per
+minute) that refill continuously, at most max_concurrent requests run at
+once, and failed requests are retried with exponential backoff if the error
+is transient (rate limits, server errors, timeouts; see is_retriable_error).
+
+Usage:
+    from tools.RateLimiter import RateLimiter
+
+    limiter = RateLimiter(max_concurrent=10, rpm=500, tpm=200_000)
+    text = await limiter.run(ai_wrapper.agenerate, prompt,
+                             tokens=RateLimiter.estimate_tokens(prompt))
+
+A RateLimiter must only be used from one event loop.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Optional, Tuple, Type, Union
+
+# HTTP statuses worth retrying: request timeout, conflict, rate limit (5xx are added below)
+_RETRIABLE_STATUSES = (408, 409, 429)
+
+RetryOn = Union[Callable[[BaseException], bool], Type[BaseException], Tuple[Type[BaseException], ...]]
+
+
+def is_retriable_error(error: BaseException) -> bool:
+    """
+    Whether a failed request is worth retrying: rate limits, server errors, timeouts
+    and dropped connections are; authentication failures, bad requests, a missing
+    API or file, and other errors are not.
+    
+    Checks, in order: a boolean `retriable` attribute (set by CloudAIWrapper errors),
+    the HTTP status of SDK errors (`status_code`, or `code` for google-genai), the
+    error type, and then the error it was raised from.
+    
+    Args:
+        error: Exception raised by the request
+        
+    Returns:
+        True if the request should be retried
+    """
+    while error is not None:
+        retriable = getattr(error, 'retriable', None)
+        if isinstance(retriable, bool):
+            return retriable
+        
+        status = getattr(error, 'status_code', None)
+        if not isinstance(status, int):
+            status = getattr(error, 'code', None)
+        if isinstance(status, int) and 100 <= status < 600:
+            return status in _RETRIABLE_STATUSES or status >= 500
+        
+        if isinstance(error, (TimeoutError, ConnectionError, asyncio.TimeoutError)):
+            return True
+        # SDK timeout/connection errors (e.g., openai.APITimeoutError, httpx.ConnectError)
+        name = type(error).__name__
+        if 'Timeout' in name or 'Connect' in name or 'RateLimit' in name:
+            return True
+        
+        error = error.__cause__
+    return False
+
+
+class RateLimiter:
+    """Leaky-bucket limiter for async AI requests with retries."""
+
+    def __init__(self, max_concurrent: int = 10,
+                 rpm: int = 500,
+                 tpm: int = 200_000,
+                 max_attempts: int = 5,
+                 backoff: float = 1.0,
+                 max_backoff: float = 60.0,
+                 retry_on: Optional[RetryOn] = None):
+        """
+        Initialize Rate Limiter.
+
+        Args:
+            max_concurrent: Maximum number of requests in flight (default: 10)
+            rpm: Requests per minute allowed by the provider (default: 500)
+            tpm: Tokens per minute allowed by the provider (default: 200,000)
+            max_attempts: Attempts per request before the error is raised (default: 5)
+            backoff: Delay before the first retry in seconds; doubles on each retry (default: 1.0)
+            max_backoff: Upper bound for the retry delay in seconds (default: 60.0)
+            retry_on: Which errors are retried: a predicate called with the exception, or an
+                      exception type (or tuple of types); other errors are raised at once
+                      (default: is_retriable_error)
+        """
+        if max_concurrent < 1 or rpm < 1 or tpm < 1 or max_attempts < 1:
+            raise ValueError("max_concurrent, rpm, tpm and max_attempts must be at least 1")
+
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        if retry_on is None:
+            retry_on = is_retriable_error
+        elif isinstance(retry_on, (type, tuple)):
+            exception_types = retry_on
+            
+            def retry_on(error: BaseException) -> bool:
+                return isinstance(error, exception_types)
+        self.retry_on = retry_on
+
+        self.available_request_capacity = float(rpm)
+        self.available_token_capacity = float(tpm)
+        self._last_update = time.monotonic()
+
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._capacity_lock = asyncio.Lock()
+
+    @staticmethod
+    def estimate_tokens(prompt: str, completion_tokens: int = 1024) -> int:
+        """
+        Rough token cost of a request (about four characters per token plus the expected completion).
+
+        Args:
+            prompt: Prompt text
+            completion_tokens: Tokens reserved for the response (default: 1024)
+
+        Returns:
+            Estimated number of tokens
+        """
+        return len(prompt) // 4 + completion_tokens
+
+    async def acquire(self, tokens: int = 0):
+        """
+        Wait until one request and the given number of tokens are available, then take them.
+
+        Args:
+            tokens: Estimated token cost of the request (capped at tpm)
+        """
+        tokens = min(tokens, self.tpm)
+        while True:
+            async with self._capacity_lock:
+                self._replenish()
+                if self.available_request_capacity >= 1 and self.available_token_capacity >= tokens:
+                    self.available_request_capacity -= 1
+                    self.available_token_capacity -= tokens
+                    return
+
+                # Time until both buckets have refilled enough
+                wait = max(
+                    (1 - self.available_request_capacity) * 60.0 / self.rpm,
+                    (tokens - self.available_token_capacity) * 60.0 / self.tpm,
+                )
+            await asyncio.sleep(wait)
+
+    async def run(self, func: Callable[..., Awaitable[Any]], *args,
+                  tokens: int = 0, max_attempts: Optional[int] = None, **kwargs) -> Any:
+        """
+        Call an async function within the limits, retrying transient failures with exponential backoff.
+
+        Args:
+            func: Async function to call (e.g., ai_wrapper.agenerate)
+            *args, **kwargs: Arguments passed through to func
+            tokens: Estimated token cost of one call (see estimate_tokens)
+            max_attempts: Override the limiter's max_attempts for this call
+
+        Returns:
+            Whatever func returns
+
+        Raises:
+            The error raised by func if it is not retriable (see retry_on), or the last
+            error once all attempts have failed
+        """
+        attempts = max_attempts or self.max_attempts
+        for attempt in range(1, attempts + 1):
+            async with self._semaphore:
+                await self.acquire(tokens)
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    if attempt == attempts or not self.retry_on(e):
+                        raise
+                    delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+                    print(f"Warning: Request failed ({e}); retrying in {delay:.1f}s (attempt {attempt}/{attempts})")
+            await asyncio.sleep(delay)
+
+    def _replenish(self):
+        """Refill both buckets for the time elapsed since the last update."""
+        now = time.monotonic()
+        elapsed = now - self._last_update
+        self._last_update = now
+        self.available_request_capacity = min(
+            self.rpm, self.available_request_capacity + self.rpm * elapsed / 60.0)
+        self.available_token_capacity = min(
+            self.tpm, self.available_token_capacity + self.tpm * elapsed / 60.0)
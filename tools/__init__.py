@@ -2,11 +2,39 @@
 Tools package for Research Paper Writing Agents
 """
 
-from .CloudAIWrapper import CloudAIWrapper
-from .PlainTextExtractor import PlainTextExtractor
-from .PaperAnalyzer import PaperAnalyzer
+import sys
+import types
+import importlib
+
+from .CloudAIWrapper import CloudAIWrapper, get_ai_wrapper, AIProviderError, ResponseSchemaError
 from .ProjectCreator import ProjectCreator
-from .Professor import Professor
+from .PromptCache import PromptCache
+from .RateLimiter import RateLimiter
+
+# Tools with heavy imports (PDF libraries, the feedback agent and its SDKs) are imported
+# on first use, so importing one tool (e.g., tools.MemoryManager from Writer) does not load them
+_LAZY_TOOLS = ('PlainTextExtractor', 'PaperAnalyzer', 'Professor')
+
+
+def __getattr__(name):
+    if name not in _LAZY_TOOLS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Importing the submodule binds the class through _ToolsModule.__setattr__
+    importlib.import_module(f"{__name__}.{name}")
+    return globals()[name]
+
+
+class _ToolsModule(types.ModuleType):
+    """The tools package; each lazy tool shares its name with the submodule that defines it."""
+
+    def __setattr__(self, name, value):
+        # Importing e.g. tools.Professor binds the submodule as an attribute of the package;
+        # keep exporting the class instead, as the eager imports did
+        if name in _LAZY_TOOLS and isinstance(value, types.ModuleType):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
 
-__all__ = ['CloudAIWrapper', 'PlainTextExtractor', 'PaperAnalyzer', 'ProjectCreator', 'Professor']
+sys.modules[__name__].__class__ = _ToolsModule
 
+__all__ = ['CloudAIWrapper', 'get_ai_wrapper', 'AIProviderError', 'ResponseSchemaError', 'PlainTextExtractor', 'PaperAnalyzer', 'ProjectCreator', 'Professor', 'PromptCache', 'RateLimiter']
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Unit tests for CloudAIWrapper (offline: SDK clients are replaced with stubs)
+"""
+
+import unittest
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.CloudAIWrapper import OpenAIProvider, AIProviderError, ResponseSchemaError, _provider_error
+
+
+class TestOpenAIProvider(unittest.TestCase):
+    """Test cases for OpenAIProvider"""
+
+    def _provider(self):
+        provider = object.__new__(OpenAIProvider)
+        provider.api_key = "test-key"
+        provider._async_client_for_loop = None
+        return provider
+
+    def test_async_client_per_event_loop(self):
+        """Test that each event loop gets its own async client"""
+        fake_openai = SimpleNamespace(AsyncOpenAI=lambda api_key: object())
+        provider = self._provider()
+
+        async def clients():
+            return provider._async_client(), provider._async_client()
+
+        with mock.patch.dict(sys.modules, {"openai": fake_openai}):
+            first, again = asyncio.run(clients())
+            second, _ = asyncio.run(clients())
+
+        self.assertIs(first, again)
+        self.assertIsNot(first, second)
+
+
+
+class TestProviderErrors(unittest.TestCase):
+    """Test cases for provider error wrapping"""
+
+    def _sdk_error(self, status_code, message):
+        error = Exception(message)
+        error.status_code = status_code
+        return error
+
+    def test_schema_rejection(self):
+        """Test that only a bad request about the schema becomes a ResponseSchemaError"""
+        rejected = _provider_error("OpenAI", self._sdk_error(400, "Invalid parameter: response_format"), True)
+        self.assertIsInstance(rejected, ResponseSchemaError)
+        self.assertEqual(rejected.status_code, 400)
+
+        for error, schema_requested in ((self._sdk_error(429, "Rate limit reached"), True),
+                                        (self._sdk_error(503, "response_format backend unavailable"), True),
+                                        (self._sdk_error(400, "Invalid parameter: response_format"), False)):
+            wrapped = _provider_error("OpenAI", error, schema_requested)
+            self.assertNotIsInstance(wrapped, ResponseSchemaError)
+            self.assertIsInstance(wrapped, AIProviderError)
+            self.assertIsInstance(wrapped, ValueError)
+            self.assertEqual(wrapped.status_code, error.status_code)
+
+
+if __name__ == "__main__":
+    unittest.main()
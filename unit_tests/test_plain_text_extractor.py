@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Unit tests for PlainTextExtractor (rule-based extraction; PDF parsing is replaced with canned text)
+"""
+
+import unittest
+import os
+import sys
+import json
+import tempfile
+import shutil
+import importlib
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools import PlainTextExtractor
+
+PAPER_TEXT = """A Paper About Caching
+Abstract
+Caching is studied.
+1 Introduction
+Caches reduce latency.
+They also reduce cost.
+2 Related Work
+Prior systems cache too.
+5 Conclusion
+Caching helps.
+"""
+
+
+class TestPlainTextExtractor(unittest.TestCase):
+    """Test cases for PlainTextExtractor"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.pdf_path = os.path.join(self.temp_dir, "paper.pdf")
+        Path(self.pdf_path).write_bytes(b"%PDF-1.4\n")
+        self.parses = 0
+
+    def tearDown(self):
+        """Clean up after tests"""
+        shutil.rmtree(self.temp_dir)
+
+    def _extractor(self, **kwargs):
+        extractor = PlainTextExtractor(output_base_dir=os.path.join(self.temp_dir, "out"), use_ai=False, **kwargs)
+
+        def fake_extract_text(pdf_path, max_pages=None, char_budget=None):
+            self.parses += 1
+            return PAPER_TEXT
+        extractor._extract_text_from_pdf = fake_extract_text
+        return extractor
+
+    def test_extract_section_by_title(self):
+        """Test that a section ends at the next section header"""
+        extractor = self._extractor()
+        self.assertEqual(extractor._extract_section_by_title(PAPER_TEXT, "Introduction"),
+                         "Caches reduce latency.\nThey also reduce cost.")
+        self.assertEqual(extractor._extract_section_by_title(PAPER_TEXT, "Related Work"),
+                         "Prior systems cache too.")
+        self.assertEqual(extractor._extract_section_by_title(PAPER_TEXT, "Evaluation"), "")
+
+    def test_sections_share_one_parse(self):
+        """Test that sections of the same PDF reuse its extracted text"""
+        extractor = self._extractor()
+        extractor.extract_section(self.pdf_path, "Related Work")
+        extractor.extract_section(self.pdf_path, "Conclusion")
+        self.assertEqual(self.parses, 1)
+
+    def test_section_cache(self):
+        """Test that the persistent cache serves sections of an unchanged PDF"""
+        first = self._extractor(use_cache=True)
+        content = first.extract_section(self.pdf_path, "Related Work")
+        first.section_cache.close()
+
+        second = self._extractor(use_cache=True)
+        self.assertEqual(second.extract_section(self.pdf_path, "Related Work"), content)
+        self.assertEqual(self.parses, 1)
+
+        # A modified PDF is parsed again
+        Path(self.pdf_path).write_bytes(b"%PDF-1.4\n% changed\n")
+        second.extract_section(self.pdf_path, "Related Work")
+        self.assertEqual(self.parses, 2)
+        second.section_cache.close()
+
+    def test_extract_section_from_pdfs(self):
+        """Test that several PDFs are processed concurrently and missing ones are reported as None"""
+        other_pdf = os.path.join(self.temp_dir, "other.pdf")
+        Path(other_pdf).write_bytes(b"%PDF-1.4\n% other\n")
+        missing_pdf = os.path.join(self.temp_dir, "missing.pdf")
+
+        results = self._extractor().extract_section_from_pdfs([self.pdf_path, other_pdf, missing_pdf],
+                                                             "Related Work", max_concurrent=2)
+        self.assertEqual(list(results), [self.pdf_path, other_pdf, missing_pdf])
+        self.assertEqual(results[self.pdf_path], "Prior systems cache too.")
+        self.assertEqual(results[other_pdf], "Prior systems cache too.")
+        self.assertIsNone(results[missing_pdf])
+
+    def test_ai_stream_stops_at_next_section(self):
+        """Test that a streamed section stops at the header of the next section"""
+        intro = "Caches reduce latency for most requests. " * 5
+        chunks = [intro[:50], intro[50:] + "\n2 Rel", "ated Work\n", "Prior systems cache too.\n"]
+        consumed = []
+
+        def generate_content_stream(model, contents, config):
+            for chunk in chunks:
+                consumed.append(chunk)
+                yield SimpleNamespace(text=chunk)
+
+        extractor = self._extractor()
+        extractor.gemini_client = SimpleNamespace(models=SimpleNamespace(generate_content_stream=generate_content_stream))
+        extractor.use_ai = True
+
+        self.assertEqual(extractor.extract_section(self.pdf_path, "Introduction"), intro.strip())
+        self.assertEqual(len(consumed), 3)
+
+    def test_sections_batched_into_one_request(self):
+        """Test that AI extraction asks for several sections in one JSON request"""
+        requests = []
+        sections = {
+            "Introduction": "Caches reduce latency. " * 10,
+            "Related Work": "Prior systems cache too. " * 10,
+            "Evaluation": "",
+        }
+
+        def generate_content(model, contents, config):
+            requests.append(config)
+            return SimpleNamespace(text=json.dumps(sections))
+
+        extractor = self._extractor()
+        extractor.gemini_client = SimpleNamespace(models=SimpleNamespace(generate_content=generate_content))
+        extractor.use_ai = True
+
+        result = extractor.extract_sections(self.pdf_path, list(sections))
+        self.assertEqual(result, {title: content.strip() for title, content in sections.items() if content})
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(requests[0]["response_schema"]["required"], list(sections))
+
+    def test_context_cache_lifecycle(self):
+        """Test that the paper is cached only for a served, non-experimental model and only when reused"""
+        created, deleted, cached_requests = [], [], []
+
+        def create(model, config):
+            created.append(model)
+            return SimpleNamespace(name=f"cachedContents/{len(created)}")
+
+        def generate_content(model, contents, config):
+            if model.endswith("-exp"):
+                raise RuntimeError("model unavailable")
+            cached_requests.append(config.get("cached_content"))
+            return SimpleNamespace(text="{}")
+
+        extractor = self._extractor()
+        extractor._extract_text_from_pdf = lambda pdf_path, max_pages=None, char_budget=None: PAPER_TEXT * 50
+        extractor.gemini_client = SimpleNamespace(
+            models=SimpleNamespace(generate_content=generate_content),
+            caches=SimpleNamespace(create=create, delete=lambda name: deleted.append(name)))
+        extractor.use_ai = True
+
+        # One request: nothing to share the paper text with
+        extractor.extract_sections(self.pdf_path, ["Introduction", "Related Work"])
+        self.assertEqual(created, [])
+
+        # Two requests: one cache for the serving model, deleted afterwards
+        extractor.extract_sections(self.pdf_path, ["Abstract", "Introduction", "Related Work", "Method",
+                                                   "Evaluation", "Discussion", "Limitations", "Conclusion"])
+        self.assertEqual(created, ["gemini-2.5-flash"])
+        self.assertEqual(cached_requests, [None] + ["cachedContents/1"] * 2)
+        self.assertEqual(deleted, ["cachedContents/1"])
+        self.assertEqual(extractor._context_caches, {})
+
+
+    def test_page_text_falls_back_to_normal_layout(self):
+        """Test that a page whose pdfplumber internals are missing is still extracted"""
+        extractor_module = importlib.import_module("tools.PlainTextExtractor")
+
+        class Page:
+            pdf = SimpleNamespace()  # no rsrcmgr/laparams
+            page_number = 1
+            page_obj = None
+
+            def extract_text(self):
+                return "Page text"
+
+        with mock.patch.object(extractor_module, "_TextOnlyAggregator", object):
+            self.assertEqual(extractor_module._page_text(Page()), "Page text")
+
+
+if __name__ == "__main__":
+    unittest.main()
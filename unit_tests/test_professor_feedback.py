@@ -4,7 +4,9 @@ Unit tests for Professor Feedback Agent
 """
 
 import unittest
+import asyncio
 import os
+import re
 import sys
 import tempfile
 import shutil
@@ -102,6 +104,145 @@ class TestProfessorFeedbackAgent(unittest.TestCase):
         self.assertIn("section_feedback", feedback)
         self.assertIn("grade_estimate", feedback)
 
+    def test_areview_paper(self):
+        """Test that the concurrent review matches the sequential one"""
+        professor = ProfessorFeedbackAgent(name="Test Professor")
+        paper = {
+            "Introduction": "Introduction content here.",
+            "Methodology": "Our method uses data and analysis.",
+            "Conclusion": "Conclusion content here."
+        }
+        self.assertEqual(asyncio.run(professor.areview_paper(paper, "Test Topic")),
+                         professor.review_paper(paper, "Test Topic"))
+
+    def test_next_todo_number(self):
+        """Test that a new entry is numbered after the highest entry, whichever end it is at"""
+        professor = ProfessorFeedbackAgent(name="Test Professor")
+        history_file = os.path.join(self.temp_dir, "TodoHistory.txt")
+        separator = "=" * 80
+
+        def entry(num, body):
+            return (f"{separator}\nTODO LIST #{num}\nTimestamp: 2024-01-01 00:00:00\n"
+                    f"Heuristics File: h.txt\nWriting History File: w.txt\n{separator}\n\n{body}\n\n")
+
+        # Appended order, with a large last entry so its header is outside the first tail window
+        with open(history_file, 'w', encoding='utf-8') as f:
+            f.write(entry(1, "Old items") + entry(2, "New items\n" * 1000))
+        self.assertEqual(professor._next_todo_number(history_file, window=128), (3, True))
+        with open(history_file, 'r', encoding='utf-8') as f:
+            self.assertIn("New items", professor._extract_latest_todo_list(f.read())["todo_list"])
+
+        # Older files have the latest entry first
+        with open(history_file, 'w', encoding='utf-8') as f:
+            f.write(entry(5, "New items") + entry(4, "Old items").rstrip("\n"))
+        self.assertEqual(professor._next_todo_number(history_file, window=128), (6, False))
+
+    def test_extract_latest_todo_list(self):
+        """Test that each entry ends at the next separator, even with empty header fields"""
+        professor = ProfessorFeedbackAgent(name="Test Professor")
+        separator = "=" * 80
+        content = (f"{separator}\nTODO LIST #1\nTimestamp: 2024-01-01 00:00:00\n"
+                   f"Heuristics File:\nWriting History File: w.txt\n{separator}\n\n1. Old item\n\n"
+                   f"{separator}\nTODO LIST #2\nTimestamp: 2024-01-02 00:00:00\n"
+                   f"Heuristics File: h.txt\nWriting History File: w.txt\n{separator}\n\n1. New item\n")
+
+        latest = professor._extract_latest_todo_list(content)
+        self.assertEqual(latest["todo_num"], "2")
+        self.assertEqual(latest["todo_list"], "1. New item")
+        self.assertEqual(professor._extract_latest_todo_list(content.split(f"{separator}\nTODO LIST #2")[0]),
+                         {"todo_num": "1", "timestamp": "2024-01-01 00:00:00", "heuristics_file": "",
+                          "writinghistory_file": "w.txt", "todo_list": "1. Old item"})
+
+    def test_cached_todo_list(self):
+        """Test that identical heuristics and writing reuse the cached to-do list"""
+        from tools.PromptCache import PromptCache
+
+        cache = PromptCache(os.path.join(self.temp_dir, "prompt_cache.sqlite"))
+        professor = ProfessorFeedbackAgent(name="Test Professor", prompt_cache=cache)
+        calls = []
+
+        def generate(heuristics, writing):
+            calls.append(writing)
+            return f"1. Revise: {writing}"
+
+        professor._generate_todo_list_with_ai = generate
+        self.assertEqual(professor._cached_todo_list("Be clear.", "Draft one."), "1. Revise: Draft one.")
+        self.assertEqual(professor._cached_todo_list("Be clear.", "Draft one."), "1. Revise: Draft one.")
+        self.assertEqual(professor._cached_todo_list("Be clear.", "Draft two."), "1. Revise: Draft two.")
+        self.assertEqual(calls, ["Draft one.", "Draft two."])
+        cache.close()
+
+    def test_read_latest_writing(self):
+        """Test that the memory-mapped read matches extracting from the decoded history"""
+        professor = ProfessorFeedbackAgent(name="Test Professor")
+        history_file = os.path.join(self.temp_dir, "writinghistory.txt")
+        separator = "=" * 80
+        histories = [
+            f"{separator}\nREVISION #2\nTimestamp: now\n{separator}\n\nNewest draft\n\n"
+            f"{separator}\nREVISION #1\nTimestamp: then\n{separator}\n\nOldest draft\n",
+            f"\r\n{separator}\r\nTimestamp: now\r\nPlain draft\r\n{separator}\r\n",
+            "   \n",
+        ]
+        for history in histories:
+            with open(history_file, 'w', encoding='utf-8', newline='') as f:
+                f.write(history)
+            with open(history_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            expected = professor._extract_latest_writing(content) if content.strip() else None
+            self.assertEqual(professor._read_latest_writing(history_file), expected)
+        self.assertIsNone(professor._read_latest_writing(history_file))
+
+    def test_generate_feedback_batch(self):
+        """Test that batch jobs sharing an output file get distinct, ordered entries"""
+        professor = ProfessorFeedbackAgent(name="Test Professor")
+        professor.api_available = True
+        professor._generate_todo_list_with_ai = lambda heuristics, writing: f"1. Revise: {writing}"
+
+        separator = "=" * 80
+        heuristics_file = os.path.join(self.temp_dir, "heuristics.txt")
+        output_file = os.path.join(self.temp_dir, "TodoHistory.txt")
+        with open(heuristics_file, 'w', encoding='utf-8') as f:
+            f.write("Be clear.")
+        jobs = []
+        for i in range(4):
+            history_file = os.path.join(self.temp_dir, f"writinghistory{i}.txt")
+            with open(history_file, 'w', encoding='utf-8') as f:
+                f.write(f"{separator}\nREVISION #1\nTimestamp: now\n{separator}\n\nDraft {i}.\n")
+            jobs.append((heuristics_file, history_file, output_file))
+
+        results = professor.generate_feedback_batch(jobs, max_concurrent=2)
+        self.assertEqual([r["todo_list"] for r in results], [f"1. Revise: Draft {i}." for i in range(4)])
+        with open(output_file, 'r', encoding='utf-8') as f:
+            numbers = sorted(int(n) for n in re.findall(r'^TODO LIST #(\d+)$', f.read(), re.MULTILINE))
+        self.assertEqual(numbers, [1, 2, 3, 4])
+
+    def test_stream_todo_list(self):
+        """Test that a streamed to-do list goes through the partial file and is appended once complete"""
+        class FakeChunk:
+            def __init__(self, text):
+                self.text = text
+
+        partial_sizes = []
+        output_file = os.path.join(self.temp_dir, "TodoHistory.txt")
+
+        class FakeModels:
+            def generate_content_stream(self, model, contents):
+                for text in ["1. Tighten ", "the **introduction**"]:
+                    yield FakeChunk(text)
+                    partial_sizes.append(os.path.getsize(output_file + ".partial"))
+
+        professor = ProfessorFeedbackAgent(name="Test Professor", stream_output=True)
+        professor.api_provider = "gemini"
+        professor.api_model = type("FakeClient", (), {"models": FakeModels()})()
+        chunks = []
+        professor.on_stream_chunk = chunks.append
+
+        todo_list = professor._cached_todo_list("Be clear.", "Draft.", partial_file=output_file + ".partial")
+        self.assertEqual(todo_list, "1. Tighten the introduction")
+        self.assertEqual(chunks, ["1. Tighten ", "the **introduction**"])
+        self.assertEqual(partial_sizes, [11, 31])
+        self.assertFalse(os.path.exists(output_file + ".partial"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Unit tests for PromptCache
+"""
+
+import unittest
+import asyncio
+import sys
+import tempfile
+import shutil
+import sqlite3
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.PromptCache import PromptCache
+
+
+class FakeAIWrapper:
+    """Stand-in for CloudAIWrapper that counts calls."""
+
+    def __init__(self, provider="fake"):
+        self.provider = provider
+        self.calls = 0
+
+    def generate(self, prompt, **kwargs):
+        self.calls += 1
+        return f"response to {prompt}" if self.provider == "fake" else f"from {self.provider}"
+
+    async def agenerate(self, prompt, **kwargs):
+        return self.generate(prompt, **kwargs)
+
+    def get_provider(self):
+        return self.provider
+
+    def get_model(self):
+        return f"{self.provider}-model"
+
+
+class TestPromptCache(unittest.TestCase):
+    """Test cases for PromptCache"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = PromptCache(Path(self.temp_dir) / "Intermediate" / "prompt_cache.sqlite")
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.cache.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_get_set(self):
+        """Test exact-match lookups"""
+        self.assertIsNone(self.cache.get("prompt"))
+        self.cache.set("prompt", "answer")
+        self.assertEqual(self.cache.get("prompt"), "answer")
+        self.assertIsNone(self.cache.get("prompt", model="gpt-4"))
+        # Routing-only arguments do not change the key
+        self.assertEqual(self.cache.get("prompt", prompt_cache_key="MyProject"), "answer")
+
+    def test_empty_response_not_cached(self):
+        """Test that empty responses are not stored"""
+        self.cache.set("prompt", "")
+        self.assertIsNone(self.cache.get("prompt"))
+
+    def test_wrap(self):
+        """Test that a wrapped AI wrapper only calls through on a miss"""
+        fake = FakeAIWrapper()
+        wrapper = self.cache.wrap(fake)
+
+        self.assertEqual(wrapper.generate("a"), "response to a")
+        self.assertEqual(wrapper.generate("a"), "response to a")
+        self.assertEqual(asyncio.run(wrapper.agenerate("a")), "response to a")
+        self.assertEqual(fake.calls, 1)
+
+        asyncio.run(wrapper.agenerate("b"))
+        self.assertEqual(fake.calls, 2)
+        self.assertEqual(wrapper.get_provider(), "fake")
+
+    def test_wrap_keyed_by_provider_and_model(self):
+        """Test that providers and models sharing one database do not get each other's responses"""
+        gemini = self.cache.wrap(FakeAIWrapper("gemini"))
+        openai = self.cache.wrap(FakeAIWrapper("openai"))
+
+        self.assertEqual(gemini.generate("a"), "from gemini")
+        self.assertEqual(openai.generate("a"), "from openai")
+        self.assertEqual(gemini.generate("a"), "from gemini")
+        self.assertEqual(gemini.wrapped.calls, 1)
+
+        # Naming the default model explicitly is the same request
+        self.assertEqual(gemini.generate("a", model="gemini-model"), "from gemini")
+        self.assertEqual(gemini.wrapped.calls, 1)
+        gemini.generate("a", model="gemini-other")
+        self.assertEqual(gemini.wrapped.calls, 2)
+
+    def test_similar_conversion(self):
+        """Test the structural tier for source -> result conversions"""
+        self.cache.set_conversion("Caching cuts latency by 50%.", "Caching cuts latency by 50\\%.")
+        self.cache.set_conversion("Something else entirely.", "Something else entirely.")
+
+        self.assertEqual(self.cache.similar_conversion("Caching cuts latency by 50%."),
+                         ("Caching cuts latency by 50%.", "Caching cuts latency by 50\\%."))
+        self.assertEqual(self.cache.similar_conversion("Caching cuts latency by 60%.")[0],
+                         "Caching cuts latency by 50%.")
+        self.assertIsNone(self.cache.similar_conversion("Unrelated sentence about GPUs."))
+
+    def test_conversions_scoped_by_provider_and_model(self):
+        """Test that a conversion is only reused for the provider and model that produced it"""
+        self.cache.set_conversion("Caching cuts latency by 50%.", "gemini latex", provider="gemini", model="m")
+        self.cache.set_conversion("Caching cuts latency by 50%.", "openai latex", provider="openai", model="m")
+
+        self.assertEqual(self.cache.similar_conversion("Caching cuts latency by 50%.", provider="gemini", model="m")[1],
+                         "gemini latex")
+        self.assertEqual(self.cache.similar_conversion("Caching cuts latency by 60%.", provider="openai", model="m")[1],
+                         "openai latex")
+        self.assertIsNone(self.cache.similar_conversion("Caching cuts latency by 50%.", provider="gemini", model="x"))
+
+    def test_unscoped_conversions_table_upgraded(self):
+        """Test that a database from before scoped conversions opens and ignores its old rows"""
+        db_path = Path(self.temp_dir) / "old.sqlite"
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("CREATE TABLE conversions (key TEXT PRIMARY KEY, source TEXT NOT NULL, "
+                     "result TEXT NOT NULL, created_at TEXT DEFAULT CURRENT_TIMESTAMP)")
+        conn.execute("INSERT INTO conversions (key, source, result) VALUES ('k', 'Old text.', 'old latex')")
+        conn.commit()
+        conn.close()
+
+        cache = PromptCache(db_path)
+        try:
+            self.assertIsNone(cache.similar_conversion("Old text.", provider="gemini", model="m"))
+            cache.set_conversion("Old text.", "new latex", provider="gemini", model="m")
+            self.assertEqual(cache.similar_conversion("Old text.", provider="gemini", model="m")[1], "new latex")
+        finally:
+            cache.close()
+
+    def test_persistence(self):
+        """Test that cached responses survive reopening the database"""
+        self.cache.set("prompt", "answer")
+        reopened = PromptCache(self.cache.db_path)
+        try:
+            self.assertEqual(reopened.get("prompt"), "answer")
+        finally:
+            reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
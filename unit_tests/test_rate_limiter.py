@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Unit tests for RateLimiter
+"""
+
+import unittest
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.RateLimiter import RateLimiter, is_retriable_error
+
+
+class StatusError(Exception):
+    """SDK-style error carrying an HTTP status"""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test cases for RateLimiter"""
+
+    def test_retries_with_backoff(self):
+        """Test that failed calls are retried until they succeed"""
+        calls = []
+
+        async def flaky(value):
+            calls.append(value)
+            if len(calls) < 3:
+                raise StatusError(429)
+            return value
+
+        async def run():
+            limiter = RateLimiter(backoff=0.001)
+            return await limiter.run(flaky, "ok")
+
+        self.assertEqual(asyncio.run(run()), "ok")
+        self.assertEqual(len(calls), 3)
+
+    def test_gives_up_after_max_attempts(self):
+        """Test that the last error is raised once all attempts fail"""
+        async def failing():
+            raise ValueError("down")
+
+        async def run():
+            limiter = RateLimiter(max_attempts=2, backoff=0.001)
+            await limiter.run(failing)
+
+        with self.assertRaises(ValueError):
+            asyncio.run(run())
+
+    def test_non_retriable_errors(self):
+        """Test that errors that cannot succeed on retry are raised at once"""
+        calls = []
+
+        async def failing(error):
+            calls.append(error)
+            raise error
+
+        async def run(error, **kwargs):
+            limiter = RateLimiter(backoff=0.001, **kwargs)
+            await limiter.run(failing, error)
+
+        for error in (StatusError(401), ValueError("Gemini API is not available"), FileNotFoundError("x")):
+            calls.clear()
+            with self.assertRaises(type(error)):
+                asyncio.run(run(error))
+            self.assertEqual(len(calls), 1)
+
+        # retry_on also accepts exception types
+        calls.clear()
+        with self.assertRaises(KeyError):
+            asyncio.run(run(KeyError("x"), max_attempts=3, retry_on=(KeyError,)))
+        self.assertEqual(len(calls), 3)
+
+    def test_is_retriable_error(self):
+        """Test the default retry classification"""
+        self.assertTrue(is_retriable_error(StatusError(429)))
+        self.assertTrue(is_retriable_error(StatusError(503)))
+        self.assertTrue(is_retriable_error(TimeoutError()))
+        self.assertFalse(is_retriable_error(StatusError(400)))
+        self.assertFalse(is_retriable_error(ValueError("bad")))
+
+        # Wrapped errors are classified by the error they were raised from
+        try:
+            try:
+                raise StatusError(500)
+            except StatusError as e:
+                raise ValueError("API error") from e
+        except ValueError as wrapped:
+            self.assertTrue(is_retriable_error(wrapped))
+
+    def test_request_capacity(self):
+        """Test that requests beyond the per-minute capacity wait for it to refill"""
+        async def run():
+            limiter = RateLimiter(rpm=600)  # refills one request every 0.1s
+            limiter.available_request_capacity = 1
+            start = time.monotonic()
+            await limiter.acquire()
+            await limiter.acquire()
+            return time.monotonic() - start
+
+        self.assertGreaterEqual(asyncio.run(run()), 0.08)
+
+    def test_max_concurrent(self):
+        """Test that no more than max_concurrent calls run at once"""
+        active = [0, 0]  # current, peak
+
+        async def call():
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+            await asyncio.sleep(0.01)
+            active[0] -= 1
+
+        async def run():
+            limiter = RateLimiter(max_concurrent=2)
+            await asyncio.gather(*[limiter.run(call) for _ in range(6)])
+
+        asyncio.run(run())
+        self.assertEqual(active[1], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
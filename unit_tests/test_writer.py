@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Unit tests for Writer (offline: the AI wrapper is replaced with a stub)
+"""
+
+import unittest
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import shutil
+import subprocess
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.Writer import Writer, PARAGRAPH_RESPONSE_SCHEMA
+from tools.CloudAIWrapper import AIProviderError, ResponseSchemaError
+from tools.RateLimiter import RateLimiter
+
+
+class StubAIWrapper:
+    """Returns canned responses and records the prompts it receives."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts = []
+        self.kwargs = []
+
+    def generate(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        self.kwargs.append(kwargs)
+        return self.responses.pop(0)
+
+    async def agenerate(self, prompt, **kwargs):
+        return self.generate(prompt, **kwargs)
+
+
+class TestWriter(unittest.TestCase):
+    """Test cases for Writer"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+
+        self.writer = Writer(project_path="TestProject")
+        self.writer.memory_manager.save_temp_memory(str(self.writer.temp_memory_file), {
+            "Writing Context": ["Introduction of a systems paper"],
+            "Topic Sentence": ["Caching reduces latency."],
+            "Bullet Points": ["Hit rates are high", "Misses are cheap"],
+            "Current Paragraph": ["Caching is good. {Be more specific.}"],
+            "Revision Feedback": [],
+        })
+        self.writer.memory_manager.save_project_memory(str(self.writer.project_memory_file), {
+            "Key Ideas": ["Latency matters"],
+            "Previous Content": [],
+        })
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.writer.close()
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.temp_dir)
+
+    def _stub(self, *responses):
+        stub = StubAIWrapper(responses)
+        self.writer.ai_wrapper = stub
+        return stub
+
+    def test_convert_to_latex(self):
+        """Test that special characters are escaped exactly once"""
+        self.assertEqual(
+            self.writer._convert_to_latex("50% of a_b & {c} ~ \\"),
+            "50\\% of a\\_b \\& \\{c\\} \\textasciitilde{} \\textbackslash{}"
+        )
+
+    def test_extract_inline_comments(self):
+        """Test inline comment extraction"""
+        text, comments = self.writer._extract_inline_comments("First. Second one {Shorten it.} here.")
+        self.assertEqual(text, "First. Second one here.")
+        self.assertEqual(comments, [{"comment": "Shorten it.", "target_sentence": "Second one"}])
+
+    def test_new_paragraph_single_request(self):
+        """Test that a JSON response yields both versions from one request"""
+        stub = self._stub(json.dumps({"plain_text": "Caching helps.", "latex": "Caching helps."}))
+        result = self.writer.new_paragraph()
+
+        self.assertEqual(result, {"plain_text": "Caching helps.", "latex": "Caching helps."})
+        self.assertEqual(len(stub.prompts), 1)
+        temp_memory = self.writer.memory_manager.load_temp_memory(str(self.writer.temp_memory_file))
+        self.assertEqual(temp_memory["Output"], ["Caching helps."])
+
+    def test_new_paragraph_plain_response_fallback(self):
+        """Test that a non-JSON response falls back to a separate LaTeX request"""
+        self.writer.use_ai_latex = True
+        stub = self._stub("Caching helps 50% of requests.", "Caching helps 50\\% of requests.")
+        result = self.writer.new_paragraph()
+
+        self.assertEqual(result["plain_text"], "Caching helps 50% of requests.")
+        self.assertEqual(len(stub.prompts), 2)
+
+    def test_ai_latex_skipped_for_plain_prose(self):
+        """Test that text without LaTeX special characters needs no conversion request"""
+        self.writer.use_ai_latex = True
+        stub = self._stub("Caching helps.")
+        result = self.writer.new_paragraph()
+
+        self.assertEqual(result["latex"], "Caching helps.")
+        self.assertEqual(len(stub.prompts), 1)
+
+    def test_new_paragraph_plain_response_local_latex(self):
+        """Test that without use_ai_latex a non-JSON response is escaped locally"""
+        stub = self._stub("Caching helps 50% of requests.")
+        result = self.writer.new_paragraph()
+
+        self.assertEqual(result["latex"], "Caching helps 50\\% of requests.")
+        self.assertEqual(len(stub.prompts), 1)
+
+    def test_ai_latex_disabled_after_failure(self):
+        """Test that a failed LaTeX request falls back locally and is not retried per paragraph"""
+        class FailingLatexStub(StubAIWrapper):
+            def generate(self, prompt, **kwargs):
+                if prompt.startswith("Convert"):
+                    self.prompts.append(prompt)
+                    raise ValueError("rate limited")
+                return super().generate(prompt, **kwargs)
+
+        self.writer.use_ai_latex = True
+        stub = FailingLatexStub(["Caching helps 50% of requests.", "Caching helps."])
+        self.writer.ai_wrapper = stub
+
+        self.assertEqual(self.writer.new_paragraph()["latex"], "Caching helps 50\\% of requests.")
+        self.assertFalse(self.writer.use_ai_latex)
+        self.writer.new_paragraph()
+        self.assertEqual(len(stub.prompts), 3)
+
+    def test_ai_latex_kept_after_transient_failure(self):
+        """Test that a timeout or server error only affects the current paragraph"""
+        class TransientLatexStub(StubAIWrapper):
+            def generate(self, prompt, **kwargs):
+                if prompt.startswith("Convert"):
+                    self.prompts.append(prompt)
+                    raise AIProviderError("OpenAI API error: Service Unavailable", 503)
+                return super().generate(prompt, **kwargs)
+
+        self.writer.use_ai_latex = True
+        stub = TransientLatexStub(["Caching helps 50% of requests.", "Caching helps 60% of requests."])
+        self.writer.ai_wrapper = stub
+
+        self.assertEqual(self.writer.new_paragraph()["latex"], "Caching helps 50\\% of requests.")
+        self.assertTrue(self.writer.use_ai_latex)
+        self.writer.new_paragraph()
+        self.assertEqual(len(stub.prompts), 4)
+
+    def test_stable_prefix_hint(self):
+        """Test that requests mark where the per-request part of the prompt starts"""
+        stub = self._stub(json.dumps({"plain_text": "Caching helps.", "latex": "Caching helps."}))
+        self.writer.new_paragraph()
+
+        prefix_chars = stub.kwargs[0]["stable_prefix_chars"]
+        self.assertIn("Latency matters", stub.prompts[0][:prefix_chars])
+        self.assertTrue(stub.prompts[0][prefix_chars:].startswith("===== Writing Context ====="))
+
+    def test_stream_output(self):
+        """Test that a streamed paragraph is requested as plain text and saved as it arrives"""
+        partial_file = self.writer.output_plaintext.with_name(self.writer.output_plaintext.name + ".partial")
+        seen = []
+
+        class StreamingStub(StubAIWrapper):
+            def generate_stream(self, prompt, **kwargs):
+                self.prompts.append(prompt)
+                for chunk in ("Caching ", "helps."):
+                    yield chunk
+                    seen.append(partial_file.read_text(encoding="utf-8"))
+
+        stub = StreamingStub([])
+        self.writer.ai_wrapper = stub
+        self.writer.stream_output = True
+        result = self.writer.new_paragraph()
+
+        self.assertNotIn("plain_text", stub.prompts[0])
+        self.assertNotIn("latex", stub.prompts[0])
+        self.assertIn("Return only the finalized paragraph", stub.prompts[0])
+        self.assertEqual(seen, ["Caching ", "Caching helps."])
+        self.assertEqual(result, {"plain_text": "Caching helps.", "latex": "Caching helps."})
+        self.assertEqual(self.writer.output_plaintext.read_text(encoding="utf-8").strip(), "Caching helps.")
+        self.assertFalse(partial_file.exists())
+
+    def test_structured_output_fallback(self):
+        """Test that the schema is requested and dropped after the provider rejects it"""
+        class RejectingStub(StubAIWrapper):
+            def generate(self, prompt, **kwargs):
+                if "response_schema" in kwargs:
+                    raise ResponseSchemaError("OpenAI API error: response_format not supported", 400)
+                return super().generate(prompt, **kwargs)
+
+        response = json.dumps({"plain_text": "Caching helps.", "latex": "Caching helps."})
+        stub = self._stub(response)
+        self.writer.new_paragraph()
+        self.assertEqual(stub.kwargs[0]["response_schema"], PARAGRAPH_RESPONSE_SCHEMA)
+
+        stub = RejectingStub([response, response])
+        self.writer.ai_wrapper = stub
+        self.assertEqual(self.writer.new_paragraph()["plain_text"], "Caching helps.")
+        self.writer.new_paragraph()
+        self.assertEqual(len(stub.prompts), 2)
+        self.assertNotIn("response_schema", stub.kwargs[1])
+
+    def test_transient_error_keeps_structured_output(self):
+        """Test that a transient error is retried and does not disable the schema"""
+        class FlakyStub(StubAIWrapper):
+            # Fails the first request after kwargs is cleared
+            def generate(self, prompt, **kwargs):
+                if not self.kwargs:
+                    self.kwargs.append(kwargs)
+                    raise AIProviderError("Gemini API error: 429 RESOURCE_EXHAUSTED", 429)
+                return super().generate(prompt, **kwargs)
+
+        response = json.dumps({"plain_text": "Caching helps.", "latex": "Caching helps."})
+        stub = FlakyStub([response, response])
+        self.writer.ai_wrapper = stub
+
+        # Without a rate limiter (sync mode) the error is raised
+        with self.assertRaises(AIProviderError):
+            self.writer.new_paragraph()
+        self.assertTrue(self.writer._structured_output)
+
+        # With one, the request is retried with the schema
+        stub.kwargs.clear()
+        results = asyncio.run(self.writer.generate_many([{}], rate_limiter=RateLimiter(backoff=0.001)))
+        self.assertEqual(results[0]["plain_text"], "Caching helps.")
+        self.assertTrue(self.writer._structured_output)
+        self.assertEqual([k.get("response_schema") for k in stub.kwargs], [PARAGRAPH_RESPONSE_SCHEMA] * 2)
+
+    def test_revise_paragraph_versions(self):
+        """Test that revisions are numbered consecutively"""
+        response = json.dumps({"plain_text": "Caching cuts latency.", "latex": "Caching cuts latency."})
+        self._stub(response, response)
+
+        self.assertEqual(self.writer.revise_paragraph()["version"], 1)
+        self.assertEqual(self.writer.revise_paragraph()["version"], 2)
+
+        # A new Writer picks up numbering from the existing history
+        writer = Writer(project_path="TestProject")
+        self.assertEqual(writer._get_next_version_number(), 3)
+
+    def test_revise_many(self):
+        """Test that concurrent revisions return results in task order with distinct versions"""
+        self._stub(*[json.dumps({"plain_text": f"Revision {i}.", "latex": f"Revision {i}."}) for i in range(3)])
+        tasks = [{"Current Paragraph": [f"Paragraph {i}."], "Revision Feedback": ["Tighten it."]} for i in range(3)]
+
+        results = asyncio.run(self.writer.revise_many(tasks))
+        self.assertEqual(sorted(result["version"] for result in results), [1, 2, 3])
+        self.assertEqual(len({result["plain_text"] for result in results}), 3)
+
+    def test_new_paragraphs(self):
+        """Test the rate-limited batch entry point"""
+        self._stub(*[json.dumps({"plain_text": f"Paragraph {i}.", "latex": f"Paragraph {i}."}) for i in range(3)])
+        results = self.writer.new_paragraphs([{"Topic Sentence": [f"Topic {i}."]} for i in range(3)], max_concurrent=2)
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(len({result["plain_text"] for result in results}), 3)
+
+    def test_history_recreated_after_removal(self):
+        """Test that appends reopen WritingHistory.txt if it is removed between runs"""
+        response = json.dumps({"plain_text": "Caching helps.", "latex": "Caching helps."})
+        self._stub(response, response)
+
+        self.writer.new_paragraph()
+        self.writer.writing_history_file.unlink()
+        self.writer.new_paragraph()
+        self.assertIn("Caching helps.", self.writer.writing_history_file.read_text(encoding='utf-8'))
+
+    def test_read_latest_todo(self):
+        """Test that only the newest TodoHistory.txt entry is read"""
+        separator = "=" * 80
+        self.writer.todo_history_file.parent.mkdir(parents=True, exist_ok=True)
+        self.writer.todo_history_file.write_text(
+            f"{separator}\nTODO LIST #2\n{separator}\n\nNewest items\n\n"
+            f"{separator}\nTODO LIST #1\n{separator}\n\nOldest items\n\n",
+            encoding='utf-8'
+        )
+
+        latest = self.writer._read_latest_todo()
+        self.assertIn("Newest items", latest)
+        self.assertNotIn("TODO LIST #1", latest)
+
+        # New entries are appended, so the latest one can also be last
+        self.writer.todo_history_file.write_text(
+            f"{separator}\nTODO LIST #1\n{separator}\n\nOldest items\n\n"
+            f"{separator}\nTODO LIST #2\n{separator}\n\nNewest items\n\n",
+            encoding='utf-8'
+        )
+        latest = self.writer._read_latest_todo()
+        self.assertTrue(latest.startswith(f"{separator}\nTODO LIST #2"))
+        self.assertNotIn("Oldest items", latest)
+
+    def test_tail_prompts(self):
+        """Test that the prompt log returns the most recent prompts first"""
+        self.writer._save_prompt("first prompt", mode="NewParagraph")
+        self.writer._save_prompt("second prompt", mode="ReviseParagraph")
+
+        prompts = self.writer.tail_prompts(2)
+        self.assertEqual([p["prompt"] for p in prompts], ["second prompt", "first prompt"])
+        self.assertEqual(prompts[0]["mode"], "ReviseParagraph")
+
+    def test_list_prompts_index(self):
+        """Test that indexed and full-log reads of the prompt log agree"""
+        for i in range(5):
+            self.writer._save_prompt(f"prompt {i}\nline two", mode="NewParagraph" if i % 2 else "ReviseParagraph")
+
+        indexed = self.writer.list_prompts(limit=3)
+        self.assertEqual([p["prompt"] for p in indexed], ["prompt 4\nline two", "prompt 3\nline two", "prompt 2\nline two"])
+        self.assertEqual([p["prompt"] for p in self.writer.list_prompts(limit=5, mode="NewParagraph")],
+                         ["prompt 3\nline two", "prompt 1\nline two"])
+
+        # Without the index the log is parsed in full
+        self.writer.prompt_index_file.unlink()
+        self.assertEqual(self.writer.list_prompts(limit=3), indexed)
+
+
+class TestAgentsPackage(unittest.TestCase):
+    """Test cases for the agents package"""
+
+    def test_import_does_not_load_root_agents(self):
+        """Test that importing agents (and Writer) leaves the root-level agents unloaded"""
+        # A fresh interpreter: other tests have already imported these modules
+        code = ("import sys, agents; "
+                "print(','.join(m for m in ('professor_feedback', 'style_analyzer', 'student_writer') "
+                "if m in sys.modules))")
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=str(Path(__file__).parent.parent), check=True)
+        self.assertEqual(result.stdout.strip(), "")
+
+        # They are still available on first access
+        import agents
+        self.assertEqual(agents.ProfessorFeedbackAgent.__module__, "professor_feedback")
+
+
+if __name__ == "__main__":
+    unittest.main()